@@ -3,9 +3,9 @@ import os
 import sys
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
@@ -13,6 +13,11 @@ from slowapi.errors import RateLimitExceeded
 # Add the 'src' directory to the Python path to allow module imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+from src.app.backends import backends_health, shutdown_backends, start_backends
+from src.app.cache import transcript_cache
+from src.app.clients import client_pool, close_http_client
+from src.app.jobs import router as jobs_router
+from src.app.metrics import router as metrics_router
 from src.app.security import limiter
 from src.app.tasks import shutdown_scheduler, start_scheduler
 from src.app.transcription import router as transcription_router
@@ -27,11 +32,21 @@ logging.basicConfig(
 async def lifespan(app: FastAPI):  # type: ignore
     """
     Manages the application's lifespan events.
-    Starts the cleanup scheduler on startup and shuts it down on exit.
+    Starts the local transcription backend, if requests may use it, before
+    starting the cleanup scheduler. It runs on the event loop's thread before
+    anything has used a thread pool, so its workers are forked before any
+    other threads exist. On exit, the scheduler and backends are stopped,
+    closing pooled OpenAI clients, the shared HTTP connection pool and the
+    transcript cache last.
     """
+    start_backends()
     start_scheduler()
     yield
     shutdown_scheduler()
+    shutdown_backends()
+    await client_pool.close()
+    await close_http_client()
+    transcript_cache.close()
 
 
 app = FastAPI(
@@ -59,8 +74,10 @@ app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)  # ty
 static_dir = os.path.join(os.path.dirname(__file__), "..", "static")
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
-# Include the transcription API router
+# Include the transcription API routers
 app.include_router(transcription_router)
+app.include_router(jobs_router)
+app.include_router(metrics_router)
 
 
 @app.get("/", response_class=HTMLResponse)
@@ -70,4 +87,17 @@ async def read_root() -> HTMLResponse:
         with open(os.path.join(static_dir, "index.html")) as f:
             return HTMLResponse(content=f.read())
     except FileNotFoundError:
-        return HTMLResponse(content="<h1>UI files not found</h1>", status_code=500)
\ No newline at end of file
+        return HTMLResponse(content="<h1>UI files not found</h1>", status_code=500)
+
+
+@app.get("/health")
+async def health() -> JSONResponse:
+    """Reports whether the app and its started transcription backends are healthy."""
+    backends = await backends_health()
+    healthy = all(backend["status"] == "ok" for backend in backends.values())
+    return JSONResponse(
+        status_code=status.HTTP_200_OK
+        if healthy
+        else status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"status": "ok" if healthy else "unhealthy", "backends": backends},
+    )
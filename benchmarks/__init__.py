@@ -0,0 +1,5 @@
+"""
+Benchmarks for the transcription service.
+
+These scripts are run manually and are not part of the test suite.
+"""
@@ -0,0 +1,80 @@
+"""
+Compare transcription concurrency of the thread-offloaded sync client against
+the native AsyncOpenAI client on the shared connection pool.
+
+The sync path holds one default-executor thread per in-flight request, so its
+throughput is capped at min(32, cpu + 4) / latency. The async path is bounded
+only by the pool's connection limit. The adaptive concurrency limiter is
+opened to each level's concurrency, so its start window isn't what's measured.
+
+Usage:
+    python -m benchmarks.bench_async_client [--latency 0.25] [--concurrency 8 32 128]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from openai import OpenAI  # noqa: E402
+
+from benchmarks.mock_whisper import MockWhisperServer, create_mock_app  # noqa: E402
+from src.app.clients import (  # noqa: E402
+    close_http_client,
+    create_async_client,
+    limiter_for,
+)
+from src.app.transcription import transcribe_file  # noqa: E402
+
+
+async def run_batch(client: object, file_path: str, concurrency: int) -> float:
+    """Transcribe the same file `concurrency` times at once and return requests/s."""
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(transcribe_file(client, file_path, "en") for _ in range(concurrency))  # type: ignore[arg-type]
+    )
+    return concurrency / (time.perf_counter() - start)
+
+
+async def main(latency: float, levels: list[int]) -> None:
+    executor_cap = min(32, (os.cpu_count() or 1) + 4)
+    print(
+        f"Mock latency: {latency * 1000:.0f} ms, default executor cap: {executor_cap}"
+    )
+    print(f"{'concurrency':>12} {'sync req/s':>12} {'async req/s':>12} {'ideal':>8}")
+
+    with (
+        MockWhisperServer(create_mock_app(latency)) as server,
+        tempfile.NamedTemporaryFile(suffix=".mp3") as audio,
+    ):
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        audio.write(b"\xff\xfb\x90\x00" * 1024)
+        audio.flush()
+
+        sync_client = OpenAI(api_key="sk-benchmark")
+        async_client = create_async_client("sk-benchmark")
+        # Both clients use the same key, so they share one limiter
+        limiter = limiter_for(async_client)
+        for concurrency in levels:
+            limiter.limit = limiter.max_limit = float(concurrency)
+            sync_rate = await run_batch(sync_client, audio.name, concurrency)
+            async_rate = await run_batch(async_client, audio.name, concurrency)
+            ideal = concurrency / latency
+            print(
+                f"{concurrency:>12} {sync_rate:>12.1f} {async_rate:>12.1f} {ideal:>8.1f}"
+            )
+
+        sync_client.close()
+        await close_http_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--latency", type=float, default=0.25)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32, 64, 128])
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.concurrency))
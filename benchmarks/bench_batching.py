@@ -0,0 +1,123 @@
+"""
+Measure how micro-batching trades latency for throughput on a CPU engine.
+
+Items arrive as a Poisson stream and go through the same MicroBatcher the
+local backend uses, in front of a simulated engine with a fixed cost per
+forward pass (--overhead) plus a smaller cost per item in the batch
+(--per-item), running at most --workers batches at a time. Every combination
+of --batch-size and --wait-ms is reported; batch size 1 is the unbatched
+baseline.
+
+Usage:
+    python -m benchmarks.bench_batching [--items 400] [--rate 200]
+        [--batch-size 1 4 8 16] [--wait-ms 2 10 25]
+        [--overhead 0.02] [--per-item 0.004] [--workers 2]
+
+For the real engine, run the load test with --backend local and its
+--batch-size / --batch-wait-ms options.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.load_test import percentile  # noqa: E402
+from src.app.batching import MicroBatcher  # noqa: E402
+
+
+async def simulate(
+    items: int,
+    rate: float,
+    batch_size: int,
+    wait_ms: float,
+    overhead: float,
+    per_item: float,
+    workers: int,
+    seed: int = 0,
+) -> Dict[str, float]:
+    """Push items through a batcher and return throughput, latency and batch size."""
+    engine = asyncio.Semaphore(workers)
+    batch_sizes: List[int] = []
+
+    async def run_batch(batch: List[int]) -> List[int]:
+        async with engine:
+            batch_sizes.append(len(batch))
+            await asyncio.sleep(overhead + per_item * len(batch))
+        return batch
+
+    batcher: MicroBatcher[int, int] = MicroBatcher(
+        run_batch, batch_size, wait_ms / 1000, max_concurrency=workers
+    )
+    rng = random.Random(seed)
+    latencies: List[float] = []
+
+    async def one(item: int) -> None:
+        start = time.perf_counter()
+        await batcher.submit(item)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    tasks = []
+    for item in range(items):
+        tasks.append(asyncio.create_task(one(item)))
+        await asyncio.sleep(rng.expovariate(rate))
+    await asyncio.gather(*tasks)
+    duration = time.perf_counter() - start
+
+    return {
+        "items_per_s": items / duration,
+        "latency_p50_ms": percentile(latencies, 0.50) * 1000,
+        "latency_p95_ms": percentile(latencies, 0.95) * 1000,
+        "mean_batch": sum(batch_sizes) / len(batch_sizes),
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    capacity = args.workers / (args.overhead + args.per_item)
+    print(
+        f"Arrival rate: {args.rate:.0f}/s, unbatched engine capacity: {capacity:.0f}/s"
+    )
+    print(
+        f"{'batch':>6} {'wait ms':>8} {'items/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'mean batch':>11}"
+    )
+    for batch_size in args.batch_size:
+        # The wait time only matters when batches can hold more than one item
+        for wait_ms in args.wait_ms if batch_size > 1 else [0.0]:
+            result = await simulate(
+                args.items,
+                args.rate,
+                batch_size,
+                wait_ms,
+                args.overhead,
+                args.per_item,
+                args.workers,
+                args.seed,
+            )
+            print(
+                f"{batch_size:>6} {wait_ms:>8.0f} {result['items_per_s']:>9.1f} "
+                f"{result['latency_p50_ms']:>8.1f} {result['latency_p95_ms']:>8.1f} "
+                f"{result['mean_batch']:>11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=400)
+    parser.add_argument("--rate", type=float, default=200.0, help="items per second")
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[1, 4, 8, 16])
+    parser.add_argument("--wait-ms", type=float, nargs="+", default=[2.0, 10.0, 25.0])
+    parser.add_argument(
+        "--overhead", type=float, default=0.02, help="seconds per batch"
+    )
+    parser.add_argument(
+        "--per-item", type=float, default=0.004, help="seconds per item"
+    )
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(main(parser.parse_args()))
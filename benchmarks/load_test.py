@@ -0,0 +1,314 @@
+"""
+Load test the transcription API against the local mock Whisper server.
+
+The app in api/index.py is started with uvicorn in a child process, pointed at
+the mock server through OPENAI_BASE_URL, and sent batches of synthetic MP3s on
+/transcribe. Throughput, latency percentiles and the app's peak RSS are
+reported, written as JSON and compared against a stored baseline.
+
+Usage:
+    python -m benchmarks.load_test [--requests 200] [--concurrency 16]
+        [--files 4] [--size 256KB] [--latency 0.25 --distribution lognormal]
+        [--error-rate 0.01] [--rate-limit-rate 0.01] [--backend openai]
+        [--batch-size 8 --batch-wait-ms 10]
+        [--output results.json] [--baseline benchmarks/baseline.json]
+        [--update-baseline] [--app-log app.log]
+
+Exits with status 1 if any metric regressed beyond --tolerance.
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import math
+import os
+import platform
+import resource
+import subprocess  # nosec B404
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.mock_whisper import (  # noqa: E402
+    DISTRIBUTIONS,
+    MockWhisperServer,
+    _free_port,
+    create_mock_app,
+)
+from benchmarks.synth import make_batch, parse_size  # noqa: E402
+
+ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Compared metrics and whether a higher value is better
+COMPARED_METRICS = {
+    "throughput_rps": True,
+    "latency_p50_ms": False,
+    "latency_p95_ms": False,
+    "latency_p99_ms": False,
+    "peak_rss_mb": False,
+}
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of values, or 0 if there are none."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def child_peak_rss_mb() -> float:
+    """Return the peak RSS of the largest waited-for child process, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class AppServer:
+    """Runs api.index:app with uvicorn in a child process."""
+
+    def __init__(self, env: Dict[str, str], log_path: str = os.devnull) -> None:
+        self.port = _free_port()
+        self._env = env
+        self._log_path = log_path
+        self._process: Optional[subprocess.Popen] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "AppServer":
+        log_file = open(self._log_path, "ab")
+        self._process = subprocess.Popen(  # nosec B603
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "api.index:app",
+                "--host",
+                "127.0.0.1",
+                "--port",
+                str(self.port),
+                "--log-level",
+                "warning",
+                "--no-access-log",
+            ],
+            cwd=ROOT_DIR,
+            env=self._env,
+            stdout=log_file,
+            stderr=log_file,
+        )
+        # The child keeps its own handle to the log
+        log_file.close()
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self._process.poll() is not None:
+                raise RuntimeError("The app exited before it started serving")
+            try:
+                httpx.get(f"{self.base_url}/metrics", timeout=1.0)
+                return self
+            except httpx.TransportError:
+                time.sleep(0.1)
+        raise RuntimeError("Timed out waiting for the app to start")
+
+    def __exit__(self, *exc_info: object) -> None:
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait(timeout=30)
+
+
+async def drive(
+    base_url: str,
+    requests: int,
+    concurrency: int,
+    files: int,
+    sizes: List[int],
+    backend: str = "openai",
+) -> Dict[str, Any]:
+    """Send the batches with bounded concurrency and collect per-request results."""
+    latencies: List[float] = []
+    statuses: collections.Counter = collections.Counter()
+    next_request = iter(range(requests))
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        for seed in next_request:
+            # Unique seeds keep every file a transcript cache miss
+            batch = make_batch(sizes, files, seed)
+            start = time.perf_counter()
+            try:
+                response = await client.post(
+                    "/transcribe",
+                    data={"language": "en", "backend": backend},
+                    headers={"Authorization": "Bearer sk-benchmark"},
+                    files=[
+                        ("files", (name, content, "audio/mpeg"))
+                        for name, content in batch
+                    ],
+                )
+                statuses[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+                continue
+            if response.status_code == 200:
+                latencies.append(time.perf_counter() - start)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=base_url, limits=limits, timeout=300
+    ) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        duration = time.perf_counter() - start
+
+    return {
+        "duration_s": round(duration, 3),
+        "statuses": dict(statuses),
+        "throughput_rps": round(len(latencies) / duration, 3),
+        "files_per_s": round(len(latencies) * files / duration, 3),
+        "latency_p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "latency_p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run one load test and return its results."""
+    mock_app = create_mock_app(
+        latency=args.latency,
+        distribution=args.distribution,
+        spread=args.spread,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    with (
+        MockWhisperServer(mock_app) as mock,
+        tempfile.TemporaryDirectory() as cache_dir,
+    ):
+        env = dict(
+            os.environ,
+            OPENAI_BASE_URL=mock.base_url,
+            CACHE_DIR=cache_dir,
+            # Read by slowapi; the per-IP limits would reject the benchmark
+            RATELIMIT_ENABLED="false",
+            ALLOWED_BACKENDS=args.backend,
+            LOCAL_BATCH_SIZE=str(args.batch_size),
+            LOCAL_BATCH_WAIT_MS=str(args.batch_wait_ms),
+        )
+        with AppServer(env, args.app_log) as app:
+            results = asyncio.run(
+                drive(
+                    app.base_url,
+                    args.requests,
+                    args.concurrency,
+                    args.files,
+                    args.size,
+                    args.backend,
+                )
+            )
+    results["peak_rss_mb"] = round(child_peak_rss_mb(), 1)
+    results["mock_statuses"] = {
+        str(k): v for k, v in mock_app.state.status_counts.items()
+    }
+    results["config"] = {
+        key: value
+        for key, value in vars(args).items()
+        if key not in ("output", "baseline", "update_baseline", "tolerance", "app_log")
+    }
+    results["platform"] = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+    return results
+
+
+def compare(
+    results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """Print results next to the baseline and return the metrics that regressed."""
+    regressions = []
+    print(f"{'metric':>16} {'baseline':>10} {'current':>10} {'change':>8}")
+    for metric, higher_is_better in COMPARED_METRICS.items():
+        current = results[metric]
+        previous = baseline.get(metric)
+        if not previous:
+            print(f"{metric:>16} {'-':>10} {current:>10} {'-':>8}")
+            continue
+        change = (current - previous) / previous
+        worse = -change if higher_is_better else change
+        flag = "  REGRESSED" if worse > tolerance else ""
+        print(f"{metric:>16} {previous:>10} {current:>10} {change:>+8.1%}{flag}")
+        if flag:
+            regressions.append(metric)
+    if baseline.get("config") != results.get("config"):
+        print("Warning: the baseline was recorded with a different configuration")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--files", type=int, default=4, help="files per request")
+    parser.add_argument("--size", type=parse_size, nargs="+", default=[256 * 1024])
+    parser.add_argument("--latency", type=float, default=0.25, help="median seconds")
+    parser.add_argument("--distribution", choices=DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--spread", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--backend",
+        choices=["openai", "local", "mock"],
+        default="openai",
+        help="transcription backend; only openai calls the mock Whisper server",
+    )
+    parser.add_argument(
+        "--batch-size", type=int, default=8, help="local backend micro-batch size"
+    )
+    parser.add_argument(
+        "--batch-wait-ms", type=float, default=10.0, help="local backend batch wait"
+    )
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--app-log", default=os.devnull, help="file for the app's logs")
+    args = parser.parse_args()
+
+    results = run(args)
+    with open(args.output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Statuses: {results['statuses']}, mock: {results['mock_statuses']}")
+    print(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(
+            f"No baseline at {args.baseline}; rerun with --update-baseline to record one"
+        )
+        return
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    if compare(results, baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+A local stand-in for the OpenAI transcription endpoint.
+
+The server accepts the same multipart request as /v1/audio/transcriptions and
+answers after a delay drawn from a configurable latency distribution, so
+benchmarks can measure client-side behaviour without network noise or API cost.
+A fraction of requests can fail with 500s or be rate limited with 429s that
+carry the same Retry-After and x-ratelimit-* headers as the real API.
+"""
+
+import asyncio
+import collections
+import random
+import socket
+import threading
+import time
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI, Form, UploadFile
+from fastapi.responses import JSONResponse
+
+# Supported shapes for the per-request latency; `latency` is always the median
+DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+class LatencyModel:
+    """Draws per-request delays from a distribution with the given median."""
+
+    def __init__(
+        self,
+        median: float,
+        distribution: str = "fixed",
+        spread: float = 0.5,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.median = median
+        self.distribution = distribution
+        # Half-width as a fraction of the median for "uniform", sigma for "lognormal"
+        self.spread = spread
+        self._rng = rng or random.Random()  # nosec B311
+
+    def sample(self) -> float:
+        """Return the delay for one request, in seconds."""
+        if self.distribution == "uniform":
+            low = self.median * (1 - self.spread)
+            high = self.median * (1 + self.spread)
+            return max(0.0, self._rng.uniform(low, high))
+        if self.distribution == "exponential":
+            # Median of an exponential distribution is ln(2) / rate
+            return self._rng.expovariate(0.6931471805599453 / self.median)
+        if self.distribution == "lognormal":
+            return self._rng.lognormvariate(0.0, self.spread) * self.median
+        return self.median
+
+
+def _error(
+    status_code: int, message: str, error_type: str, headers: dict
+) -> JSONResponse:
+    """Build an error response in the OpenAI API format."""
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"message": message, "type": error_type, "code": None}},
+        headers=headers,
+    )
+
+
+def create_mock_app(
+    latency: float = 0.25,
+    distribution: str = "fixed",
+    spread: float = 0.5,
+    error_rate: float = 0.0,
+    rate_limit_rate: float = 0.0,
+    retry_after: float = 1.0,
+    seed: Optional[int] = None,
+) -> FastAPI:
+    """
+    Create a FastAPI app that mimics the Whisper transcription endpoint.
+    error_rate and rate_limit_rate are the fractions of requests answered with
+    a 500 or a 429 instead of a transcript. Response status counts are kept in
+    app.state.status_counts.
+    """
+    app = FastAPI()
+    rng = random.Random(seed)  # nosec B311
+    latency_model = LatencyModel(latency, distribution, spread, rng)
+    status_counts: collections.Counter = collections.Counter()
+    app.state.status_counts = status_counts
+
+    @app.post("/v1/audio/transcriptions")
+    async def transcriptions(
+        file: UploadFile, model: str = Form(...), language: Optional[str] = Form(None)
+    ) -> object:
+        content = await file.read()
+        roll = rng.random()
+        if roll < rate_limit_rate:
+            status_counts[429] += 1
+            # Rate limited requests are rejected before any processing
+            return _error(
+                429,
+                "Rate limit reached for requests",
+                "requests",
+                {
+                    "retry-after": f"{retry_after:g}",
+                    "x-ratelimit-remaining-requests": "0",
+                    "x-ratelimit-reset-requests": f"{retry_after:g}s",
+                },
+            )
+
+        await asyncio.sleep(latency_model.sample())
+        if roll < rate_limit_rate + error_rate:
+            status_counts[500] += 1
+            return _error(
+                500,
+                "The server had an error processing your request",
+                "server_error",
+                {},
+            )
+
+        status_counts[200] += 1
+        return {"text": f"{len(content)} bytes transcribed with {model}"}
+
+    return app
+
+
+def _free_port() -> int:
+    """Ask the OS for an unused local TCP port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+class MockWhisperServer:
+    """Runs the mock app with uvicorn in a background thread."""
+
+    def __init__(self, app: FastAPI, port: Optional[int] = None) -> None:
+        self.port = port or _free_port()
+        config = uvicorn.Config(
+            app, host="127.0.0.1", port=self.port, log_level="warning", backlog=4096
+        )
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        """The base URL to pass to OpenAI clients."""
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    def __enter__(self) -> "MockWhisperServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._server.should_exit = True
+        self._thread.join()
@@ -0,0 +1,80 @@
+"""
+Generate synthetic MP3 files for benchmarks.
+
+Files are made of valid MPEG-1 Layer III frame headers (128 kbps, 44.1 kHz)
+followed by seeded random payload, so they pass upload validation, are split
+by the frame chunker like real recordings, and never collide in the
+transcript cache unless the same seed is reused.
+
+Usage:
+    python -m benchmarks.synth OUTPUT_DIR [--count 10] [--size 1MB 25MB] [--seed 0]
+"""
+
+import argparse
+import os
+import random
+import re
+from typing import List, Tuple
+
+# MPEG-1 Layer III, no CRC, 128 kbps, 44.1 kHz, no padding, joint stereo
+FRAME_HEADER = b"\xff\xfb\x90\x40"
+FRAME_LENGTH = 144 * 128000 // 44100  # 417 bytes, header included
+FRAME_SECONDS = 1152 / 44100
+
+_SIZE_UNITS = {"": 1, "B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3}
+
+
+def parse_size(value: str) -> int:
+    """Parse a size such as "512", "256KB" or "1.5MB" into bytes."""
+    match = re.fullmatch(r"\s*([\d.]+)\s*([KMG]?B?)\s*", value.upper())
+    if match is None:
+        raise ValueError(f"Invalid size: {value!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def make_mp3(size: int, seed: int = 0) -> bytes:
+    """Return an MP3 of whole frames, as close to size bytes as possible."""
+    rng = random.Random(seed)
+    frame_count = max(1, size // FRAME_LENGTH)
+    payload = rng.getrandbits(8 * frame_count * (FRAME_LENGTH - 4)).to_bytes(
+        frame_count * (FRAME_LENGTH - 4), "little"
+    )
+    step = FRAME_LENGTH - 4
+    return b"".join(
+        FRAME_HEADER + payload[offset : offset + step]
+        for offset in range(0, len(payload), step)
+    )
+
+
+def make_batch(sizes: List[int], count: int, seed: int = 0) -> List[Tuple[str, bytes]]:
+    """
+    Return count (filename, content) pairs, cycling through the given sizes.
+    Every file gets its own seed, so no two files in a batch are identical.
+    """
+    return [
+        (
+            f"synthetic_{seed}_{index:04d}.mp3",
+            make_mp3(sizes[index % len(sizes)], seed * count + index),
+        )
+        for index in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("output_dir")
+    parser.add_argument("--count", type=int, default=10)
+    parser.add_argument("--size", type=parse_size, nargs="+", default=[1024**2])
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    for filename, content in make_batch(args.size, args.count, args.seed):
+        with open(os.path.join(args.output_dir, filename), "wb") as file:
+            file.write(content)
+        seconds = len(content) // FRAME_LENGTH * FRAME_SECONDS
+        print(f"{filename}: {len(content)} bytes, {seconds:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+import logging
+import os
+import shutil
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional, Type
+
+from src.app.config import (
+    ARTIFACT_STORE,
+    S3_BUCKET,
+    S3_ENDPOINT_URL,
+    S3_MAX_CONCURRENCY,
+    S3_MULTIPART_CHUNK_SIZE,
+    S3_MULTIPART_THRESHOLD,
+    S3_PREFIX,
+    TEMP_DIR,
+)
+
+try:
+    import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.exceptions import ClientError
+except ImportError:  # pragma: no cover - optional dependency
+    boto3 = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Workers store each file's transcript under this name inside the job's run
+RESULTS_DIRNAME = "results"
+
+
+class ArtifactNotFoundError(Exception):
+    """Raised when an artifact doesn't exist, for instance because it expired."""
+
+
+class ArtifactStoreUnavailableError(Exception):
+    """Raised when an artifact store is unknown or can't run here."""
+
+
+def artifact_key(run_id: str, name: str) -> str:
+    """Return the key of one of a run's artifacts."""
+    return f"{run_id}/{name}"
+
+
+def result_key(run_id: str, index: int) -> str:
+    """Return the key of the transcript of a job's file."""
+    return artifact_key(run_id, f"{RESULTS_DIRNAME}/{index}.txt")
+
+
+class ArtifactStore(ABC):
+    """
+    Keeps the artifacts of queued jobs, their uploads and transcripts, under
+    keys of the form "<run id>/<name>". The web tier stores uploads and serves
+    transcripts through it and queue workers read uploads and store
+    transcripts, so with a shared store any replica can serve any job.
+    Inline runs don't use it: they are transcribed in the process that
+    received them, so their uploads stay in their run directory.
+    """
+
+    name: str
+    # Whether artifacts live in the run directories under TEMP_DIR, which the
+    # run cleanup deletes; other stores are swept by expire_artifacts
+    on_local_disk = False
+
+    @abstractmethod
+    def put(self, key: str, data: bytes) -> None:
+        """Store data under key, replacing any artifact there."""
+
+    @abstractmethod
+    def upload(self, key: str, path: str) -> None:
+        """Store the contents of a local file under key."""
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        """Return an artifact, or raise ArtifactNotFoundError."""
+
+    @abstractmethod
+    def download(self, key: str, path: str) -> str:
+        """
+        Make an artifact readable as a local file, written to path unless the
+        store already keeps it on disk, and return the file's path.
+        """
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Whether an artifact is stored under key."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete an artifact; deleting one that doesn't exist is not an error."""
+
+    @abstractmethod
+    def delete_run(self, run_id: str) -> None:
+        """Delete every artifact of a run."""
+
+    @abstractmethod
+    def list_runs(self) -> Dict[str, float]:
+        """Return the runs that have artifacts, with when each was last modified."""
+
+
+class LocalArtifactStore(ArtifactStore):
+    """
+    Stores artifacts as files under root, TEMP_DIR by default, so a run's
+    artifacts sit in its run directory. Only processes on this host see them.
+    """
+
+    name = "local"
+    on_local_disk = True
+
+    def __init__(self, root: str = TEMP_DIR) -> None:
+        self.root = root
+
+    def path(self, key: str) -> str:
+        """Return the file an artifact is stored in."""
+        root = os.path.abspath(self.root)
+        path = os.path.abspath(os.path.join(root, *key.split("/")))
+        if os.path.commonpath([root, path]) != root:
+            raise ValueError(f"Artifact key {key!r} is outside the store")
+        return path
+
+    def _replace(self, key: str, write: Callable[[str], Any]) -> None:
+        """Write an artifact next to its file and move it into place, so readers never see part of it."""
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        write(temp_path)
+        os.replace(temp_path, path)
+
+    def put(self, key: str, data: bytes) -> None:
+        def write(temp_path: str) -> None:
+            with open(temp_path, "wb") as file:
+                file.write(data)
+
+        self._replace(key, write)
+
+    def upload(self, key: str, path: str) -> None:
+        # Uploads are saved into their run directory, which is where they belong
+        if os.path.abspath(path) == self.path(key):
+            return
+        self._replace(key, lambda temp_path: shutil.copyfile(path, temp_path))
+
+    def get(self, key: str) -> bytes:
+        try:
+            with open(self.path(key), "rb") as file:
+                return file.read()
+        except FileNotFoundError:
+            raise ArtifactNotFoundError(key) from None
+
+    def download(self, key: str, path: str) -> str:
+        stored = self.path(key)
+        if not os.path.exists(stored):
+            raise ArtifactNotFoundError(key)
+        return stored
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def delete_run(self, run_id: str) -> None:
+        shutil.rmtree(self.path(run_id), ignore_errors=True)
+
+    def list_runs(self) -> Dict[str, float]:
+        runs: Dict[str, float] = {}
+        if not os.path.isdir(self.root):
+            return runs
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        runs[entry.name] = entry.stat(follow_symlinks=False).st_mtime
+                except FileNotFoundError:
+                    continue
+        return runs
+
+
+class S3ArtifactStore(ArtifactStore):
+    """
+    Stores artifacts as objects under prefix in an S3-compatible bucket, which
+    every replica and worker can reach. Large files are uploaded and
+    downloaded in parts, several at a time.
+    """
+
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: str = S3_BUCKET,
+        prefix: str = S3_PREFIX,
+        endpoint_url: Optional[str] = S3_ENDPOINT_URL,
+        multipart_threshold: int = S3_MULTIPART_THRESHOLD,
+        multipart_chunksize: int = S3_MULTIPART_CHUNK_SIZE,
+        max_concurrency: int = S3_MAX_CONCURRENCY,
+        client: Any = None,
+    ) -> None:
+        if boto3 is None:
+            raise ArtifactStoreUnavailableError(
+                "The s3 artifact store requires boto3 (pip install boto3)"
+            )
+        if not bucket:
+            raise ArtifactStoreUnavailableError(
+                "The s3 artifact store requires S3_BUCKET"
+            )
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = (
+            client
+            if client is not None
+            else boto3.client("s3", endpoint_url=endpoint_url)
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=max_concurrency,
+        )
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    @staticmethod
+    def _is_missing(error: "ClientError") -> bool:
+        return error.response.get("Error", {}).get("Code") in (
+            "404",
+            "NoSuchKey",
+            "NotFound",
+        )
+
+    def put(self, key: str, data: bytes) -> None:
+        self.client.put_object(Bucket=self.bucket, Key=self._object_key(key), Body=data)
+
+    def upload(self, key: str, path: str) -> None:
+        self.client.upload_file(
+            path, self.bucket, self._object_key(key), Config=self.transfer_config
+        )
+
+    def get(self, key: str) -> bytes:
+        try:
+            response = self.client.get_object(
+                Bucket=self.bucket, Key=self._object_key(key)
+            )
+        except ClientError as e:
+            if self._is_missing(e):
+                raise ArtifactNotFoundError(key) from None
+            raise
+        data: bytes = response["Body"].read()
+        return data
+
+    def download(self, key: str, path: str) -> str:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        try:
+            self.client.download_file(
+                self.bucket, self._object_key(key), path, Config=self.transfer_config
+            )
+        except ClientError as e:
+            if self._is_missing(e):
+                raise ArtifactNotFoundError(key) from None
+            raise
+        return path
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._object_key(key))
+        except ClientError as e:
+            if self._is_missing(e):
+                return False
+            raise
+        return True
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._object_key(key))
+
+    def delete_run(self, run_id: str) -> None:
+        paginator = self.client.get_paginator("list_objects_v2")
+        pages = paginator.paginate(
+            Bucket=self.bucket, Prefix=self._object_key(artifact_key(run_id, ""))
+        )
+        for page in pages:
+            # A listing page holds at most 1000 keys, as many as one delete call takes
+            objects = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+            if objects:
+                self.client.delete_objects(
+                    Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True}
+                )
+
+    def list_runs(self) -> Dict[str, float]:
+        runs: Dict[str, float] = {}
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=self.prefix):
+            for item in page.get("Contents", []):
+                run_id = item["Key"][len(self.prefix) :].split("/", 1)[0]
+                modified = item["LastModified"].timestamp()
+                runs[run_id] = max(modified, runs.get(run_id, 0.0))
+        return runs
+
+
+ARTIFACT_STORES: Dict[str, Type[ArtifactStore]] = {
+    LocalArtifactStore.name: LocalArtifactStore,
+    S3ArtifactStore.name: S3ArtifactStore,
+}
+
+
+def open_artifact_store(name: str = ARTIFACT_STORE) -> ArtifactStore:
+    """Create the artifact store configured by name, with its settings from the environment."""
+    if name not in ARTIFACT_STORES:
+        raise ArtifactStoreUnavailableError(f"Unknown artifact store: {name}")
+    return ARTIFACT_STORES[name]()
+
+
+artifact_store = open_artifact_store()
@@ -0,0 +1,389 @@
+import asyncio
+import logging
+import os
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple, Type, Union
+
+from openai import AsyncOpenAI, OpenAI
+
+from src.app.batching import MicroBatcher
+from src.app.clients import client_pool, limiter_for
+from src.app.concurrency import AIMDLimiter, limiters
+from src.app.config import (
+    ALLOWED_BACKENDS,
+    LOCAL_BATCH_SIZE,
+    LOCAL_BATCH_WAIT_MS,
+    LOCAL_WHISPER_COMPUTE_TYPE,
+    LOCAL_WHISPER_CPU_THREADS,
+    LOCAL_WHISPER_MAX_TASKS_PER_CHILD,
+    LOCAL_WHISPER_MODEL,
+    LOCAL_WHISPER_PROCESSES,
+    LOCAL_WHISPER_WORKERS,
+    MOCK_BACKEND_LATENCY,
+    TRANSCRIPTION_BACKEND,
+    TRANSCRIPTION_MODEL,
+)
+from src.app.modelpool import (
+    ModelWorkerPool,
+    fork_available,
+    run_inference,
+    silent_wav,
+    transcribe_batch,
+)
+
+try:
+    from faster_whisper import WhisperModel
+except ImportError:  # pragma: no cover - optional dependency
+    WhisperModel = None
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class BackendUnavailableError(Exception):
+    """Raised when a backend is unknown, not allowed or can't run here."""
+
+
+class TranscriptionBackend(ABC):
+    """
+    A speech-to-text engine. Every backend is called through the same
+    concurrency limiter, retry policy and metrics in transcribe_chunk.
+    """
+
+    # Short name used in requests and configuration
+    name: str
+    # Identifies the model in the transcript cache key
+    model: str
+    # Admits calls to this backend; shared by all requests using the same engine
+    limiter: AIMDLimiter
+    # Whether requests must carry an OpenAI API key
+    requires_api_key = False
+
+    @abstractmethod
+    async def transcribe(self, file_path: str, language: str) -> str:
+        """Transcribe one audio file small enough for the engine."""
+
+    async def aclose(self) -> None:
+        """Release anything held for the request that opened the backend."""
+        return None
+
+
+class OpenAIBackend(TranscriptionBackend):
+    """Transcribes with the OpenAI Whisper API using a (pooled) client."""
+
+    name = "openai"
+    requires_api_key = True
+
+    def __init__(
+        self,
+        client: Union[OpenAI, AsyncOpenAI],
+        model: str = TRANSCRIPTION_MODEL,
+        pooled: bool = False,
+    ) -> None:
+        self.client = client
+        self.model = model
+        self.limiter = limiter_for(client)
+        self._pooled = pooled
+
+    async def transcribe(self, file_path: str, language: str) -> str:
+        """Sends the file to the transcription endpoint and returns its text."""
+        with open(file_path, "rb") as audio_file:
+            if isinstance(self.client, AsyncOpenAI):
+                transcription = await self.client.audio.transcriptions.create(
+                    model=self.model,
+                    file=audio_file,
+                    language=language,
+                )
+            else:
+                transcription = await asyncio.to_thread(
+                    self.client.audio.transcriptions.create,
+                    model=self.model,
+                    file=audio_file,
+                    language=language,
+                )
+
+        # Check transcription result
+        if transcription is None:
+            error_msg = "Received None transcription result from OpenAI API"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        if not hasattr(transcription, "text"):
+            error_msg = "Transcription result missing 'text' attribute"
+            logger.error(error_msg)
+            raise ValueError(error_msg)
+
+        return str(transcription.text)
+
+    async def aclose(self) -> None:
+        """Returns the leased client to the pool."""
+        if self._pooled:
+            self._pooled = False
+            await client_pool.release(self.client)  # type: ignore[arg-type]
+
+
+class MockBackend(TranscriptionBackend):
+    """Returns canned transcripts; for development, demos and load tests."""
+
+    name = "mock"
+    model = "mock"
+
+    def __init__(
+        self, latency: float = MOCK_BACKEND_LATENCY, text: Optional[str] = None
+    ) -> None:
+        self.latency = latency
+        self.text = text
+        self.limiter = limiters.get("mock")
+
+    async def transcribe(self, file_path: str, language: str) -> str:
+        """Waits for the configured latency and returns a transcript."""
+        await asyncio.sleep(self.latency)
+        if self.text is not None:
+            return self.text
+        size = os.path.getsize(file_path)
+        return f"Mock {language} transcription of {os.path.basename(file_path)} ({size} bytes)"
+
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """
+    Transcribes on this machine's CPU with faster-whisper (CTranslate2), using
+    int8 quantization by default. The model is loaded once and shared by all
+    requests; at most `workers` files are transcribed at a time.
+
+    With `processes` enabled (and where fork is available), inference runs in
+    a pool of pre-warmed worker processes forked after the model is loaded, so
+    they share its weights; otherwise it runs on threads in this process.
+
+    With a batch_size above 1, files and chunks arriving together are
+    micro-batched: up to batch_size of them, or as many as arrive within
+    batch_wait_ms of the first, are transcribed in one forward pass.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        model_size: str = LOCAL_WHISPER_MODEL,
+        compute_type: str = LOCAL_WHISPER_COMPUTE_TYPE,
+        cpu_threads: int = LOCAL_WHISPER_CPU_THREADS,
+        workers: int = LOCAL_WHISPER_WORKERS,
+        processes: bool = LOCAL_WHISPER_PROCESSES,
+        max_tasks_per_child: int = LOCAL_WHISPER_MAX_TASKS_PER_CHILD,
+        batch_size: int = LOCAL_BATCH_SIZE,
+        batch_wait_ms: float = LOCAL_BATCH_WAIT_MS,
+    ) -> None:
+        if WhisperModel is None:
+            raise BackendUnavailableError(
+                "The local backend requires faster-whisper (pip install faster-whisper)"
+            )
+        self.model_size = model_size
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.workers = workers
+        self.model = f"faster-whisper-{model_size}-{compute_type}"
+        self.batcher: Optional[MicroBatcher[Tuple[str, str], str]] = None
+        if batch_size > 1:
+            self.batcher = MicroBatcher(
+                self._run_batch,
+                batch_size,
+                batch_wait_ms / 1000,
+                max_concurrency=workers,
+            )
+        # A fixed window: a CPU engine has no rate limit to probe for. Each
+        # worker takes a whole batch at a time, so admit enough to fill them
+        window = workers * max(1, batch_size)
+        self.limiter = AIMDLimiter(
+            initial=window, min_limit=window, max_limit=window, label="local"
+        )
+        self.pool: Optional[ModelWorkerPool] = None
+        if processes and fork_available():
+            self.pool = ModelWorkerPool(self._load_model, workers, max_tasks_per_child)
+        self._engine: Any = None
+        self._lock = threading.Lock()
+
+    def _load_model(self) -> Any:
+        logger.info(f"Loading local Whisper model {self.model}")
+        return WhisperModel(
+            self.model_size,
+            device="cpu",
+            compute_type=self.compute_type,
+            cpu_threads=self.cpu_threads,
+            # Each worker process runs one transcription at a time
+            num_workers=1 if self.pool is not None else self.workers,
+        )
+
+    def _get_engine(self) -> Any:
+        """Load the model on first use."""
+        with self._lock:
+            if self._engine is None:
+                self._engine = self._load_model()
+            return self._engine
+
+    def _warm_up(self) -> None:
+        run_inference(self._get_engine(), silent_wav(), "en")
+
+    def load(self) -> None:
+        """Load the model without running inference or forking any workers."""
+        if self.pool is not None:
+            self.pool.load()
+        else:
+            self._get_engine()
+
+    def start(self) -> None:
+        """
+        Load the model and run a warmup inference before the first request.
+        Blocks, and forks the worker processes, so it must run on the main
+        thread before the process starts any other threads.
+        """
+        if self.pool is not None:
+            self.pool.start()
+        else:
+            self._warm_up()
+
+    async def health(self) -> Dict[str, Any]:
+        """Report whether the engine is loaded and, for a pool, whether it responds."""
+        if self.pool is not None:
+            return await self.pool.health()
+        return {
+            "status": "ok" if self._engine is not None else "stopped",
+            "processes": 0,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, if any."""
+        if self.pool is not None:
+            self.pool.close()
+
+    async def _run_batch(
+        self, items: List[Tuple[str, str]]
+    ) -> List[Union[str, Exception]]:
+        if self.pool is not None:
+            return await self.pool.transcribe_batch(items)
+        return await asyncio.to_thread(transcribe_batch, self._get_engine(), items)
+
+    async def transcribe(self, file_path: str, language: str) -> str:
+        """Runs CPU-bound inference in a worker process or thread."""
+        if self.batcher is not None:
+            return await self.batcher.submit((file_path, language))
+        if self.pool is not None:
+            return await self.pool.transcribe(file_path, language)
+        return await asyncio.to_thread(
+            run_inference, self._get_engine(), file_path, language
+        )
+
+
+# Backends selectable by name, per deployment or per request
+BACKENDS: Dict[str, Type[TranscriptionBackend]] = {
+    OpenAIBackend.name: OpenAIBackend,
+    MockBackend.name: MockBackend,
+    LocalWhisperBackend.name: LocalWhisperBackend,
+}
+
+# Backends without per-request state are created once and shared
+_shared_backends: Dict[str, TranscriptionBackend] = {}
+
+
+def resolve_backend_name(requested: Optional[str]) -> str:
+    """Return the backend a request should use, rejecting unknown or disallowed ones."""
+    name = (requested or TRANSCRIPTION_BACKEND).strip().lower()
+    if name not in BACKENDS:
+        raise BackendUnavailableError(f"Unknown transcription backend: {name}")
+    if name != TRANSCRIPTION_BACKEND and name not in ALLOWED_BACKENDS:
+        raise BackendUnavailableError(
+            f"Transcription backend {name} is not enabled on this server"
+        )
+    return name
+
+
+async def open_backend(name: str, api_key: Optional[str]) -> TranscriptionBackend:
+    """
+    Return a backend for one request. OpenAI backends lease a pooled client for
+    the API key, so every backend must be closed with aclose() when done.
+    """
+    if name == OpenAIBackend.name:
+        if not api_key:
+            raise BackendUnavailableError("The OpenAI backend requires an API key")
+        client = await client_pool.acquire(api_key)
+        return OpenAIBackend(client, pooled=True)
+
+    return _shared_backend(name)
+
+
+def _shared_backend(name: str) -> TranscriptionBackend:
+    """Return the process-wide instance of a backend without per-request state."""
+    backend = _shared_backends.get(name)
+    if backend is None:
+        backend = BACKENDS[name]()
+        _shared_backends[name] = backend
+    return backend
+
+
+def _local_backend() -> Optional[LocalWhisperBackend]:
+    """
+    Return the local engine if requests may use it. The engine being
+    unavailable is fatal only when it is the default backend.
+    """
+    name = LocalWhisperBackend.name
+    if name != TRANSCRIPTION_BACKEND and name not in ALLOWED_BACKENDS:
+        return None
+    try:
+        backend = _shared_backend(name)
+    except BackendUnavailableError as e:
+        if name == TRANSCRIPTION_BACKEND:
+            raise
+        logger.warning(f"Local backend not started: {e}")
+        return None
+    return backend if isinstance(backend, LocalWhisperBackend) else None
+
+
+def load_backends() -> None:
+    """
+    Load the local engine's model, if requests may use it, without starting
+    it. Processes forked afterwards, such as the queue's worker processes,
+    inherit the model and share its weights copy-on-write instead of each
+    loading their own; start_backends then only forks their inference workers.
+    """
+    backend = _local_backend()
+    if backend is not None:
+        backend.load()
+
+
+def start_backends() -> None:
+    """
+    Start the local engine if requests may use it, loading its model unless
+    it is already loaded and forking its workers. Call it before the process
+    starts any threads, as the web tier's lifespan and the queue worker do;
+    the workers are never started on demand.
+    """
+    backend = _local_backend()
+    if backend is not None:
+        backend.start()
+
+
+def shutdown_backends() -> None:
+    """Stop shared backends that hold worker processes."""
+    for backend in _shared_backends.values():
+        if isinstance(backend, LocalWhisperBackend):
+            backend.shutdown()
+    _shared_backends.clear()
+
+
+async def backends_health() -> Dict[str, Any]:
+    """Report the health of every backend started in this process."""
+    health: Dict[str, Any] = {}
+    for name, backend in _shared_backends.items():
+        if isinstance(backend, LocalWhisperBackend):
+            health[name] = await backend.health()
+        else:
+            health[name] = {"status": "ok"}
+    return health
+
+
+def as_backend(
+    client: Union[OpenAI, AsyncOpenAI, TranscriptionBackend],
+) -> TranscriptionBackend:
+    """Wrap a bare OpenAI client in a backend; backends are returned as they are."""
+    if isinstance(client, TranscriptionBackend):
+        return client
+    return OpenAIBackend(client)
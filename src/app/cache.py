@@ -0,0 +1,144 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from src.app.config import CACHE_DIR, CACHE_MAX_BYTES
+from src.app.metrics import CACHE_ERRORS, CACHE_HITS, CACHE_MISSES
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class TranscriptCache:
+    """
+    A persistent transcript cache keyed by audio content hash, language and model.
+    Entries are stored in SQLite and the least recently used ones are evicted
+    once the stored text exceeds max_bytes.
+    The cache is best-effort: database errors are logged and treated as a
+    miss or a skipped store, never failing the transcription. Hits only read;
+    their access times are written with the next store or on close.
+    """
+
+    def __init__(self, path: str, max_bytes: int = CACHE_MAX_BYTES) -> None:
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+        # Access times of hits not yet written to the database, by key
+        self._accessed: Dict[str, float] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use, creating the schema if needed."""
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS transcripts ("
+                "key TEXT PRIMARY KEY, text TEXT NOT NULL, "
+                "size INTEGER NOT NULL, last_access REAL NOT NULL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS transcripts_last_access "
+                "ON transcripts (last_access)"
+            )
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    @staticmethod
+    def make_key(content_hash: str, language: str, model: str) -> str:
+        """Build the cache key for a transcription request."""
+        return f"{content_hash}:{language}:{model}"
+
+    def get(self, content_hash: str, language: str, model: str) -> Optional[str]:
+        """Return a cached transcript and mark it as recently used, or None."""
+        key = self.make_key(content_hash, language, model)
+        with self._lock:
+            try:
+                row = (
+                    self._connect()
+                    .execute("SELECT text FROM transcripts WHERE key = ?", (key,))
+                    .fetchone()
+                )
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Transcript cache lookup failed: {e}")
+                CACHE_ERRORS.inc()
+                return None
+            if row is None:
+                self.misses += 1
+                CACHE_MISSES.inc()
+                return None
+            self._accessed[key] = time.time()
+            self.hits += 1
+            CACHE_HITS.inc()
+            return str(row[0])
+
+    def put(self, content_hash: str, language: str, model: str, text: str) -> None:
+        """Store a transcript, evicting least recently used entries over the limit."""
+        size = len(text.encode())
+        if size > self.max_bytes:
+            return
+        key = self.make_key(content_hash, language, model)
+        with self._lock:
+            try:
+                connection = self._connect()
+                self._flush_accessed(connection)
+                connection.execute(
+                    "INSERT OR REPLACE INTO transcripts (key, text, size, last_access) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, text, size, time.time()),
+                )
+                self._evict(connection)
+                connection.commit()
+            except (sqlite3.Error, OSError) as e:
+                logger.warning(f"Failed to store transcript in cache: {e}")
+
+    def _flush_accessed(self, connection: sqlite3.Connection) -> None:
+        """Write the access times of recent hits, so eviction sees them."""
+        if self._accessed:
+            connection.executemany(
+                "UPDATE transcripts SET last_access = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._accessed.items()],
+            )
+            self._accessed.clear()
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        """Delete the oldest entries until the total size fits in max_bytes."""
+        total = connection.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM transcripts"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in connection.execute(
+            "SELECT key, size FROM transcripts ORDER BY last_access"
+        ).fetchall():
+            connection.execute("DELETE FROM transcripts WHERE key = ?", (key,))
+            total -= size
+            evicted += 1
+            if total <= self.max_bytes:
+                break
+        logger.info(f"Evicted {evicted} transcripts from cache")
+
+    def close(self) -> None:
+        """Write pending access times and close the database connection."""
+        with self._lock:
+            if self._connection is not None:
+                try:
+                    self._flush_accessed(self._connection)
+                    self._connection.commit()
+                except sqlite3.Error as e:
+                    logger.warning(
+                        f"Failed to write transcript cache access times: {e}"
+                    )
+                self._connection.close()
+                self._connection = None
+
+
+transcript_cache = TranscriptCache(os.path.join(CACHE_DIR, "transcripts.sqlite3"))
@@ -0,0 +1,213 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from functools import partial
+from typing import AsyncIterator, Callable, Dict, List, Optional, Union
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, OpenAI
+
+from src.app.concurrency import AIMDLimiter, limiters
+from src.app.config import (
+    CLIENT_POOL_SIZE,
+    CLIENT_POOL_TTL,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Shared connection pool used by every AsyncOpenAI client in this process
+_transport: Optional[httpx.AsyncHTTPTransport] = None
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """
+    Routes requests through the shared pool; closing it leaves the pool open.
+    Every response is passed to on_response, if given, before it is returned.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        on_response: Optional[Callable[[httpx.Response], None]] = None,
+    ) -> None:
+        self._transport = transport
+        self._on_response = on_response
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._transport.handle_async_request(request)
+        if self._on_response is not None:
+            self._on_response(response)
+        return response
+
+    async def aclose(self) -> None:
+        pass
+
+
+def build_transport() -> httpx.AsyncHTTPTransport:
+    """Create an HTTP transport with the configured connection pool limits."""
+    limits = httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncHTTPTransport(limits=limits)
+
+
+def get_transport() -> httpx.AsyncHTTPTransport:
+    """Return the shared HTTP transport, creating it on first use."""
+    global _transport
+    if _transport is None:
+        _transport = build_transport()
+        logger.info(
+            f"Created shared HTTP pool (max connections: {HTTP_MAX_CONNECTIONS}, "
+            f"keep-alive: {HTTP_MAX_KEEPALIVE_CONNECTIONS})"
+        )
+    return _transport
+
+
+def create_async_client(api_key: str) -> AsyncOpenAI:
+    """
+    Create an AsyncOpenAI client that sends requests through the shared pool.
+    Closing the client releases it without closing the pooled connections.
+    The SDK's own retries are disabled; see src.app.retry. Rate limit headers
+    on responses feed the key's concurrency limiter.
+    """
+    transport = _SharedTransport(
+        get_transport(), on_response=partial(limiters.observe, fingerprint(api_key))
+    )
+    http_client = DefaultAsyncHttpxClient(transport=transport)
+    return AsyncOpenAI(api_key=api_key, http_client=http_client, max_retries=0)
+
+
+async def close_http_client() -> None:
+    """Closes the shared HTTP transport and its pooled connections."""
+    global _transport
+    if _transport is not None:
+        await _transport.aclose()
+        _transport = None
+        logger.info("Shared HTTP pool closed.")
+
+
+# Random per-process salt so API key fingerprints can't be reversed or reused
+_FINGERPRINT_SALT = os.urandom(16)
+
+
+def fingerprint(api_key: str) -> str:
+    """Return a salted hash that identifies an API key without storing it."""
+    return hmac.new(_FINGERPRINT_SALT, api_key.encode(), hashlib.sha256).hexdigest()
+
+
+def limiter_for(client: Union[OpenAI, AsyncOpenAI]) -> AIMDLimiter:
+    """Return the concurrency limiter for a client's API key."""
+    api_key = getattr(client, "api_key", None)
+    # Clients without a real key (such as test doubles) share one limiter
+    return limiters.get(fingerprint(api_key) if isinstance(api_key, str) else "")
+
+
+@dataclass
+class _PooledClient:
+    """A cached client with its lease count and last use time."""
+
+    client: AsyncOpenAI
+    last_used: float = field(default_factory=time.monotonic)
+    leases: int = 0
+    evicted: bool = False
+
+
+class ClientPool:
+    """
+    A bounded LRU cache of AsyncOpenAI clients keyed by API key fingerprint.
+    Clients idle for longer than ttl seconds expire, and evicted clients are
+    closed once their last lease is released.
+    """
+
+    def __init__(self, max_size: int = CLIENT_POOL_SIZE, ttl: float = CLIENT_POOL_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clients: "OrderedDict[str, _PooledClient]" = OrderedDict()
+        self._leased: Dict[int, _PooledClient] = {}
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+    async def acquire(self, api_key: str) -> AsyncOpenAI:
+        """Return a client for the API key, reusing a cached one when possible."""
+        now = time.monotonic()
+        evicted = self._evict_expired(now)
+
+        key = fingerprint(api_key)
+        entry = self._clients.get(key)
+        if entry is None:
+            entry = _PooledClient(create_async_client(api_key))
+            self._clients[key] = entry
+            while len(self._clients) > self.max_size:
+                _, oldest = self._clients.popitem(last=False)
+                evicted.append(oldest)
+        else:
+            self._clients.move_to_end(key)
+
+        entry.last_used = now
+        entry.leases += 1
+        self._leased[id(entry.client)] = entry
+        await self._close_evicted(evicted)
+        return entry.client
+
+    async def release(self, client: AsyncOpenAI) -> None:
+        """Return a leased client to the pool, closing it if it was evicted."""
+        entry = self._leased.get(id(client))
+        if entry is None:
+            return
+        entry.leases -= 1
+        entry.last_used = time.monotonic()
+        if entry.leases == 0:
+            del self._leased[id(client)]
+            if entry.evicted:
+                await self._close_evicted([entry])
+
+    @asynccontextmanager
+    async def lease(self, api_key: str) -> AsyncIterator[AsyncOpenAI]:
+        """Lease a client for the duration of a with block."""
+        client = await self.acquire(api_key)
+        try:
+            yield client
+        finally:
+            await self.release(client)
+
+    async def close(self) -> None:
+        """Evicts every cached client and closes those that are not leased."""
+        evicted = list(self._clients.values())
+        self._clients.clear()
+        await self._close_evicted(evicted)
+
+    def _evict_expired(self, now: float) -> List[_PooledClient]:
+        """Remove clients idle for longer than the TTL and return them."""
+        expired = [
+            key
+            for key, entry in self._clients.items()
+            if entry.leases == 0 and now - entry.last_used > self.ttl
+        ]
+        return [self._clients.pop(key) for key in expired]
+
+    async def _close_evicted(self, entries: List[_PooledClient]) -> None:
+        """Close evicted clients that are no longer leased."""
+        for entry in entries:
+            entry.evicted = True
+        idle = [entry for entry in entries if entry.leases == 0]
+        if idle:
+            await asyncio.gather(
+                *(entry.client.close() for entry in idle), return_exceptions=True
+            )
+            logger.info(f"Closed {len(idle)} evicted OpenAI clients")
+
+
+client_pool = ClientPool()
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Optional
+
+import httpx
+from openai import APIStatusError, APITimeoutError
+
+from src.app.config import (
+    CLIENT_POOL_SIZE,
+    CONCURRENCY_DECREASE,
+    CONCURRENCY_INCREASE,
+    CONCURRENCY_INITIAL,
+    CONCURRENCY_MAX,
+    CONCURRENCY_MIN,
+)
+from src.app.metrics import CONCURRENCY_IN_FLIGHT, CONCURRENCY_LIMIT
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+def is_overload(error: BaseException) -> bool:
+    """Check whether an error means the provider is saturated (429 or timeout)."""
+    # The retry deadline cancels slow calls with a plain TimeoutError long
+    # before the SDK's own timeout fires, so both count
+    if isinstance(error, (APITimeoutError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code == 429
+
+
+class AIMDLimiter:
+    """
+    An adaptive concurrency limit for calls made with one API key.
+    The window grows by `increase` per window of successful calls (additive
+    increase) and is multiplied by `decrease` on a 429 or timeout
+    (multiplicative decrease). Only calls started after the last decrease
+    can trigger another one, so a burst of 429s shrinks the window once.
+    """
+
+    def __init__(
+        self,
+        initial: float = CONCURRENCY_INITIAL,
+        min_limit: float = CONCURRENCY_MIN,
+        max_limit: float = CONCURRENCY_MAX,
+        increase: float = CONCURRENCY_INCREASE,
+        decrease: float = CONCURRENCY_DECREASE,
+        label: Optional[str] = None,
+    ) -> None:
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease = decrease
+        self.in_flight = 0
+        self.label = label
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_decrease = float("-inf")
+        self._update_metrics()
+
+    @property
+    def window(self) -> int:
+        """The number of calls currently allowed in flight."""
+        return max(int(self.min_limit), int(self.limit))
+
+    @property
+    def idle(self) -> bool:
+        """Whether no call is in flight or waiting."""
+        return self.in_flight == 0 and not self._waiters
+
+    async def acquire(self) -> None:
+        """Wait until a call may start; waiting calls start in arrival order."""
+        if not self._waiters and self.in_flight < self.window:
+            self.in_flight += 1
+            self._update_metrics()
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # The slot is reserved for us by _wake before the waiter is resolved
+            await waiter
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # Woken but cancelled before running; hand the slot on
+                self.in_flight -= 1
+                self._wake()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self, started: float, error: Optional[BaseException] = None) -> None:
+        """Finish a call started at `started`, adjusting the window by its outcome."""
+        self.in_flight -= 1
+        if error is None:
+            self.limit = min(self.max_limit, self.limit + self.increase / self.limit)
+        elif is_overload(error) and started > self._last_decrease:
+            self.limit = max(self.min_limit, self.limit * self.decrease)
+            self._last_decrease = time.monotonic()
+            logger.warning(
+                f"Provider overloaded, concurrency window cut to {self.window}"
+            )
+        self._wake()
+
+    def observe(self, headers: httpx.Headers) -> None:
+        """Never allow more calls in flight than the provider says remain."""
+        remaining = headers.get("x-ratelimit-remaining-requests")
+        if remaining is None:
+            return
+        try:
+            remaining_requests = int(remaining)
+        except ValueError:
+            return
+        if remaining_requests < self.limit:
+            self.limit = max(self.min_limit, float(remaining_requests))
+            self._update_metrics()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold a slot for one call, recording whether it succeeded."""
+        await self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        except BaseException as e:
+            self.release(started, e)
+            raise
+        self.release(started)
+
+    def _wake(self) -> None:
+        """Wake as many waiters as there are free slots."""
+        while self._waiters and self.in_flight < self.window:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+        self._update_metrics()
+
+    def _update_metrics(self) -> None:
+        if self.label is not None:
+            CONCURRENCY_LIMIT.labels(self.label).set(self.window)
+            CONCURRENCY_IN_FLIGHT.labels(self.label).set(self.in_flight)
+
+
+class LimiterRegistry:
+    """
+    Concurrency limiters keyed by API key fingerprint, so each key adapts to
+    its own rate limits. Idle limiters beyond max_size are dropped, least
+    recently used first.
+    """
+
+    def __init__(self, max_size: int = CLIENT_POOL_SIZE) -> None:
+        self.max_size = max_size
+        self._limiters: "OrderedDict[str, AIMDLimiter]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._limiters)
+
+    def get(self, key: str) -> AIMDLimiter:
+        """Return the limiter for a key fingerprint, creating it if needed."""
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            # Label by a short prefix; the fingerprint is already salted per process
+            limiter = AIMDLimiter(label=key[:12] or "default")
+            self._limiters[key] = limiter
+            self._evict()
+        else:
+            self._limiters.move_to_end(key)
+        return limiter
+
+    def observe(self, key: str, response: httpx.Response) -> None:
+        """Feed rate limit headers from a response to the key's limiter."""
+        limiter = self._limiters.get(key)
+        if limiter is not None:
+            limiter.observe(response.headers)
+
+    def _evict(self) -> None:
+        """Drop the least recently used idle limiters beyond max_size."""
+        idle = [key for key, limiter in self._limiters.items() if limiter.idle]
+        for key in idle[: max(0, len(self._limiters) - self.max_size)]:
+            limiter = self._limiters.pop(key)
+            CONCURRENCY_LIMIT.remove(limiter.label)
+            CONCURRENCY_IN_FLIGHT.remove(limiter.label)
+
+
+limiters = LimiterRegistry()
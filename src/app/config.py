@@ -2,4 +2,149 @@ import os
 
 # Configuration constants
 MAX_FILE_SIZE = 100 * 1024 * 1024  # 100 MB in bytes
-TEMP_DIR = "/tmp/transcriber_runs"
\ No newline at end of file
+TEMP_DIR = "/tmp/transcriber_runs"
+# Uploads are copied to disk in chunks of this size so memory stays flat per file
+UPLOAD_CHUNK_SIZE = int(os.environ.get("UPLOAD_CHUNK_SIZE", 1024 * 1024))  # 1 MB
+# Connection pool shared by all outbound transcription calls
+HTTP_MAX_CONNECTIONS = int(os.environ.get("HTTP_MAX_CONNECTIONS", 256))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(
+    os.environ.get("HTTP_MAX_KEEPALIVE_CONNECTIONS", 64)
+)
+HTTP_KEEPALIVE_EXPIRY = float(os.environ.get("HTTP_KEEPALIVE_EXPIRY", 30.0))  # seconds
+# OpenAI clients are cached per API key fingerprint and reused across requests
+CLIENT_POOL_SIZE = int(os.environ.get("CLIENT_POOL_SIZE", 128))
+CLIENT_POOL_TTL = float(os.environ.get("CLIENT_POOL_TTL", 10 * 60))  # seconds idle
+# The Whisper API rejects uploads over 25 MB, so longer files are split at MP3
+# frame boundaries into chunks below these limits and transcribed in parallel
+CHUNK_MAX_BYTES = int(os.environ.get("CHUNK_MAX_BYTES", 24 * 1024 * 1024))  # 24 MB
+CHUNK_MAX_SECONDS = (
+    float(os.environ["CHUNK_MAX_SECONDS"])
+    if os.environ.get("CHUNK_MAX_SECONDS")
+    else None
+)
+# Model used for every transcription; part of the transcript cache key
+TRANSCRIPTION_MODEL = "whisper-1"
+# Transcripts are cached by audio hash, language and model so re-uploads skip the API
+CACHE_DIR = os.environ.get("CACHE_DIR", "/tmp/transcriber_cache")  # nosec B108
+CACHE_MAX_BYTES = int(os.environ.get("CACHE_MAX_BYTES", 256 * 1024 * 1024))  # 256 MB
+# Transient API errors (429, 5xx, timeouts) are retried with jittered exponential
+# backoff; no file is retried for longer than RETRY_DEADLINE seconds in total
+RETRY_MAX_ATTEMPTS = int(os.environ.get("RETRY_MAX_ATTEMPTS", 5))
+RETRY_BASE_DELAY = float(os.environ.get("RETRY_BASE_DELAY", 0.5))  # seconds
+RETRY_MAX_DELAY = float(os.environ.get("RETRY_MAX_DELAY", 20.0))  # seconds
+RETRY_DEADLINE = float(os.environ.get("RETRY_DEADLINE", 120.0))  # seconds
+# Outbound calls per API key are limited by an adaptive (AIMD) window that grows
+# by CONCURRENCY_INCREASE per window of successes and shrinks by the
+# CONCURRENCY_DECREASE factor on a 429 or timeout
+CONCURRENCY_INITIAL = float(os.environ.get("CONCURRENCY_INITIAL", 8))
+CONCURRENCY_MIN = float(os.environ.get("CONCURRENCY_MIN", 1))
+CONCURRENCY_MAX = float(os.environ.get("CONCURRENCY_MAX", 64))
+CONCURRENCY_INCREASE = float(os.environ.get("CONCURRENCY_INCREASE", 1.0))
+CONCURRENCY_DECREASE = float(os.environ.get("CONCURRENCY_DECREASE", 0.5))
+# How often a streaming /transcribe response checks whether its client has gone
+DISCONNECT_POLL_INTERVAL = float(
+    os.environ.get("DISCONNECT_POLL_INTERVAL", 1.0)
+)  # seconds
+# Engine used when a request doesn't name one: "openai", "local" (faster-whisper
+# on this machine's CPU) or "mock"; requests may pick any of ALLOWED_BACKENDS,
+# which is only the default backend unless configured
+TRANSCRIPTION_BACKEND = (
+    os.environ.get("TRANSCRIPTION_BACKEND", "openai").strip().lower()
+)
+ALLOWED_BACKENDS = [
+    name.strip().lower()
+    for name in os.environ.get("ALLOWED_BACKENDS", TRANSCRIPTION_BACKEND).split(",")
+    if name.strip()
+]
+# The local backend loads this Whisper model once, quantized to int8 by default;
+# 0 CPU threads lets CTranslate2 choose, and at most LOCAL_WHISPER_WORKERS files
+# are transcribed at a time
+LOCAL_WHISPER_MODEL = os.environ.get("LOCAL_WHISPER_MODEL", "base")
+LOCAL_WHISPER_COMPUTE_TYPE = os.environ.get("LOCAL_WHISPER_COMPUTE_TYPE", "int8")
+LOCAL_WHISPER_CPU_THREADS = int(os.environ.get("LOCAL_WHISPER_CPU_THREADS", 0))
+LOCAL_WHISPER_WORKERS = int(os.environ.get("LOCAL_WHISPER_WORKERS", 2))
+# Seconds the mock backend takes per file
+MOCK_BACKEND_LATENCY = float(os.environ.get("MOCK_BACKEND_LATENCY", 0.0))
+# The local backend runs inference in LOCAL_WHISPER_WORKERS processes forked
+# after the model is loaded, so they share its weights copy-on-write; each is
+# replaced after LOCAL_WHISPER_MAX_TASKS_PER_CHILD files to bound fragmentation
+LOCAL_WHISPER_PROCESSES = os.environ.get("LOCAL_WHISPER_PROCESSES", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+LOCAL_WHISPER_MAX_TASKS_PER_CHILD = int(
+    os.environ.get("LOCAL_WHISPER_MAX_TASKS_PER_CHILD", 200)
+)
+# Files and chunks sent to the local backend together are transcribed in
+# batches of up to LOCAL_BATCH_SIZE, waiting at most LOCAL_BATCH_WAIT_MS for a
+# batch to fill; a size of 1 turns batching off
+LOCAL_BATCH_SIZE = int(os.environ.get("LOCAL_BATCH_SIZE", 8))
+LOCAL_BATCH_WAIT_MS = float(os.environ.get("LOCAL_BATCH_WAIT_MS", 10.0))
+# With JOB_QUEUE enabled, /jobs only saves uploads and enqueues the job in a
+# SQLite queue; separate `python -m src.app.worker` processes run it
+JOB_QUEUE_ENABLED = os.environ.get("JOB_QUEUE", "false").lower() in ("1", "true", "yes")
+JOB_QUEUE_PATH = os.environ.get("JOB_QUEUE_PATH", "/tmp/transcriber_queue/jobs.sqlite3")  # nosec B108
+# Workers lease jobs for this long and renew the lease while they run; a job
+# whose worker stops renewing is retried by another, up to QUEUE_MAX_ATTEMPTS
+QUEUE_VISIBILITY_TIMEOUT = float(
+    os.environ.get("QUEUE_VISIBILITY_TIMEOUT", 60.0)
+)  # seconds
+QUEUE_MAX_ATTEMPTS = int(os.environ.get("QUEUE_MAX_ATTEMPTS", 3))
+QUEUE_POLL_INTERVAL = float(os.environ.get("QUEUE_POLL_INTERVAL", 0.5))  # seconds
+# Worker processes started by src.app.worker, and jobs each runs at a time
+WORKER_PROCESSES = int(os.environ.get("WORKER_PROCESSES", 2))
+WORKER_CONCURRENCY = int(os.environ.get("WORKER_CONCURRENCY", 4))
+# Job event streams send a comment this often while nothing happens, so
+# proxies don't close them as idle
+EVENTS_HEARTBEAT_INTERVAL = float(
+    os.environ.get("EVENTS_HEARTBEAT_INTERVAL", 15.0)
+)  # seconds
+# Expired run directories are found through an index of deadlines, swept this
+# often; the full scan of the runs directory, which also catches directories
+# left by crashed processes, runs at startup and every RUN_RECONCILE_INTERVAL
+RUN_EXPIRY_SWEEP_INTERVAL = float(
+    os.environ.get("RUN_EXPIRY_SWEEP_INTERVAL", 10.0)
+)  # seconds
+RUN_RECONCILE_INTERVAL = float(
+    os.environ.get("RUN_RECONCILE_INTERVAL", 15 * 60.0)
+)  # seconds
+# New runs are refused with 503 while the volume holding TEMP_DIR would be
+# more than STORAGE_HIGH_WATERMARK full once every admitted upload is written;
+# under pressure, finished runs are evicted until it is at most
+# STORAGE_LOW_WATERMARK full
+STORAGE_HIGH_WATERMARK = float(os.environ.get("STORAGE_HIGH_WATERMARK", 0.85))
+STORAGE_LOW_WATERMARK = float(os.environ.get("STORAGE_LOW_WATERMARK", 0.70))
+STORAGE_RETRY_AFTER = int(os.environ.get("STORAGE_RETRY_AFTER", 30))  # seconds
+# Expired run directories are deleted on CLEANUP_DELETE_WORKERS threads of
+# their own, starting at most CLEANUP_MAX_DELETES_PER_SECOND deletions a second
+CLEANUP_DELETE_WORKERS = int(os.environ.get("CLEANUP_DELETE_WORKERS", 2))
+CLEANUP_MAX_DELETES_PER_SECOND = float(
+    os.environ.get("CLEANUP_MAX_DELETES_PER_SECOND", 20.0)
+)
+# How often event loop lag is sampled
+LOOP_LAG_INTERVAL = float(os.environ.get("LOOP_LAG_INTERVAL", 0.5))  # seconds
+# Artifacts of queued jobs, their uploads and transcripts, are kept in
+# ARTIFACT_STORE: "local" (the run directories under TEMP_DIR, one host) or
+# "s3" (any S3-compatible service, shared by every replica and worker).
+# Stores outside TEMP_DIR are swept every ARTIFACT_EXPIRY_INTERVAL seconds.
+# Inline runs are transcribed where they were received and stay in TEMP_DIR.
+ARTIFACT_STORE = os.environ.get("ARTIFACT_STORE", "local").strip().lower()
+ARTIFACT_EXPIRY_INTERVAL = float(
+    os.environ.get("ARTIFACT_EXPIRY_INTERVAL", 60.0)
+)  # seconds
+# The s3 store keeps artifacts under S3_PREFIX in S3_BUCKET; set S3_ENDPOINT_URL
+# for services other than AWS, such as MinIO. Credentials come from the usual
+# AWS environment variables or config files
+S3_BUCKET = os.environ.get("S3_BUCKET", "")
+S3_PREFIX = os.environ.get("S3_PREFIX", "transcriber-runs/")
+S3_ENDPOINT_URL = os.environ.get("S3_ENDPOINT_URL") or None
+# Uploads larger than S3_MULTIPART_THRESHOLD are sent in parts of
+# S3_MULTIPART_CHUNK_SIZE, S3_MAX_CONCURRENCY at a time
+S3_MULTIPART_THRESHOLD = int(
+    os.environ.get("S3_MULTIPART_THRESHOLD", 8 * 1024 * 1024)
+)  # 8 MB
+S3_MULTIPART_CHUNK_SIZE = int(
+    os.environ.get("S3_MULTIPART_CHUNK_SIZE", 8 * 1024 * 1024)
+)  # 8 MB
+S3_MAX_CONCURRENCY = int(os.environ.get("S3_MAX_CONCURRENCY", 8))
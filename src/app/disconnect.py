@@ -0,0 +1,27 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from starlette.requests import Request
+
+from src.app.config import DISCONNECT_POLL_INTERVAL
+from src.app.metrics import CLIENT_DISCONNECTS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+async def watch_disconnect(
+    request: Request,
+    on_disconnect: Callable[[], Awaitable[None]],
+    interval: float = DISCONNECT_POLL_INTERVAL,
+) -> None:
+    """
+    Poll the request until its client disconnects, then run on_disconnect.
+    Meant to run as a task alongside a long response; cancel it to stop watching.
+    """
+    while not await request.is_disconnected():
+        await asyncio.sleep(interval)
+    logger.warning(f"Client disconnected from {request.url.path}")
+    CLIENT_DISCONNECTS.inc()
+    await on_disconnect()
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from src.app.artifacts import artifact_store, result_key
+from src.app.config import EVENTS_HEARTBEAT_INTERVAL, QUEUE_POLL_INTERVAL
+from src.app.runs import (
+    EVENT_FINISHED,
+    FILE_DONE,
+    FILE_PENDING,
+    RUN_PROCESSING,
+    Run,
+)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Sent while nothing happens; lines starting with a colon are comments in SSE
+HEARTBEAT = b": keepalive\n\n"
+
+
+def format_event(
+    event: str, data: Dict[str, Any], event_id: Optional[int] = None
+) -> bytes:
+    """Encode one Server-Sent Event."""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    # json.dumps escapes newlines, so the data always fits on one line
+    lines.append(f"data: {json.dumps(data)}")
+    return ("\n".join(lines) + "\n\n").encode()
+
+
+def parse_last_event_id(value: Optional[str]) -> int:
+    """Return how many events a reconnecting client has already seen."""
+    try:
+        return max(0, int(value)) if value else 0
+    except ValueError:
+        return 0
+
+
+async def stream_run_events(
+    run: Run, seen: int = 0, heartbeat: float = EVENTS_HEARTBEAT_INTERVAL
+) -> AsyncIterator[bytes]:
+    """
+    Stream a run's progress events after the first `seen`, ending once the
+    run has finished. Event ids count from 1, so a client that reconnects
+    with its Last-Event-ID picks up where it left off.
+    """
+    while True:
+        if not await run.wait_for_events(seen, heartbeat):
+            yield HEARTBEAT
+            continue
+        for event in run.events[seen:]:
+            seen += 1
+            yield format_event(event["event"], event["data"], seen)
+            if event["event"] == EVENT_FINISHED:
+                return
+
+
+async def stream_queued_events(
+    get_job: Callable[[], Optional[Dict[str, Any]]],
+    poll_interval: float = QUEUE_POLL_INTERVAL,
+    heartbeat: float = EVENTS_HEARTBEAT_INTERVAL,
+) -> AsyncIterator[bytes]:
+    """
+    Stream the progress of a job run by a queue worker, which is only known
+    from the queue, by polling it for state changes. The stream starts with
+    the job's current state, so reconnecting clients get no ids to resume
+    from. A job that expires while streamed ends the stream.
+    """
+    reported: Dict[int, str] = {}
+    last_sent = time.monotonic()
+    while True:
+        # get_job queries SQLite, which mustn't block the loop once per client
+        job = await asyncio.to_thread(get_job)
+        if job is None:
+            return
+        for job_file in job["files"]:
+            if job_file["status"] in (FILE_PENDING, reported.get(job_file["index"])):
+                continue
+            reported[job_file["index"]] = job_file["status"]
+            data = {
+                key: job_file[key]
+                for key in ("index", "filename", "output_filename", "error")
+            }
+            if job_file["status"] == FILE_DONE:
+                key = result_key(job["id"], job_file["index"])
+                data["text"] = (
+                    await asyncio.to_thread(artifact_store.get, key)
+                ).decode()
+            yield format_event(job_file["status"], data)
+            last_sent = time.monotonic()
+
+        if job["status"] != RUN_PROCESSING:
+            yield format_event(
+                EVENT_FINISHED, {"status": job["status"], "error": job["error"]}
+            )
+            return
+        if time.monotonic() - last_sent >= heartbeat:
+            yield HEARTBEAT
+            last_sent = time.monotonic()
+        await asyncio.sleep(poll_interval)
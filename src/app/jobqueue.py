@@ -0,0 +1,277 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set
+
+from src.app.config import JOB_QUEUE_PATH, QUEUE_MAX_ATTEMPTS
+from src.app.runs import RUN_DONE, RUN_FAILED, RUN_PROCESSING
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Queue states; finished jobs use the run states
+JOB_QUEUED = "queued"
+JOB_LEASED = "leased"
+
+
+@dataclass
+class QueuedJob:
+    """A job claimed from the queue by a worker."""
+
+    id: str
+    run_path: str
+    language: str
+    backend: str
+    api_key: Optional[str]
+    # Per-file state as in Run.to_dict, plus the saved path, artifact key and SHA-256
+    files: List[Dict[str, Any]]
+    attempts: int
+
+
+class JobQueue:
+    """
+    A durable job queue in SQLite (WAL mode), shared by the web tier and the
+    worker processes on one host. Workers claim jobs by leasing them for a
+    visibility timeout and must extend the lease while they work; a job whose
+    lease expires, because its worker died, is handed to the next worker, up
+    to max_attempts times.
+
+    API keys are stored only while a job is queued or running and are
+    deleted as soon as it finishes. The database is readable by its owner
+    only.
+    """
+
+    def __init__(self, path: str, max_attempts: int = QUEUE_MAX_ATTEMPTS) -> None:
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._connection: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use, creating the schema if needed."""
+        if self._connection is None:
+            self._create_private()
+            # Autocommit; claims open their own write transaction
+            connection = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None, timeout=10.0
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, run_path TEXT NOT NULL, language TEXT NOT NULL, "
+                "backend TEXT NOT NULL, api_key TEXT, files TEXT NOT NULL, "
+                "status TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+                "lease_owner TEXT, lease_expires REAL, error TEXT, "
+                "created_at REAL NOT NULL, finished_at REAL)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)"
+            )
+            self._connection = connection
+        return self._connection
+
+    def _create_private(self) -> None:
+        """Create the database owner-only, before SQLite creates it with the umask."""
+        os.makedirs(os.path.dirname(self.path), mode=0o700, exist_ok=True)
+        os.close(os.open(self.path, os.O_WRONLY | os.O_CREAT, 0o600))
+        # SQLite gives the -wal and -shm files the database's mode when it
+        # creates them; files left by an older version are fixed here
+        for path in (self.path, f"{self.path}-wal", f"{self.path}-shm"):
+            try:
+                os.chmod(path, 0o600)
+            except FileNotFoundError:
+                pass
+
+    def enqueue(
+        self,
+        job_id: str,
+        run_path: str,
+        language: str,
+        backend: str,
+        api_key: Optional[str],
+        files: List[Dict[str, Any]],
+    ) -> None:
+        """Add a job whose files are already saved under run_path."""
+        with self._lock:
+            self._connect().execute(
+                "INSERT INTO jobs (id, run_path, language, backend, api_key, files, "
+                "status, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    run_path,
+                    language,
+                    backend,
+                    api_key,
+                    json.dumps(files),
+                    JOB_QUEUED,
+                    time.time(),
+                ),
+            )
+        logger.info(f"Queued job {job_id} with {len(files)} files")
+
+    def claim(self, owner: str, visibility_timeout: float) -> Optional[QueuedJob]:
+        """
+        Lease the oldest job that is queued or whose lease has expired, or
+        return None if there is none. Expired jobs out of attempts are failed.
+        """
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            # Take the write lock up front so two workers can't claim one job
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                connection.execute(
+                    "UPDATE jobs SET status = ?, error = ?, api_key = NULL, "
+                    "lease_owner = NULL, finished_at = ? "
+                    "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                    (
+                        RUN_FAILED,
+                        "Processing failed: the job's worker stopped responding",
+                        now,
+                        JOB_LEASED,
+                        now,
+                        self.max_attempts,
+                    ),
+                )
+                row = connection.execute(
+                    "SELECT id, run_path, language, backend, api_key, files, attempts "
+                    "FROM jobs WHERE status = ? OR (status = ? AND lease_expires < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (JOB_QUEUED, JOB_LEASED, now),
+                ).fetchone()
+                if row is not None:
+                    connection.execute(
+                        "UPDATE jobs SET status = ?, lease_owner = ?, lease_expires = ?, "
+                        "attempts = attempts + 1 WHERE id = ?",
+                        (JOB_LEASED, owner, now + visibility_timeout, row[0]),
+                    )
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+
+        if row is None:
+            return None
+        job_id, run_path, language, backend, api_key, files, attempts = row
+        logger.info(f"Worker {owner} claimed job {job_id} (attempt {attempts + 1})")
+        return QueuedJob(
+            job_id,
+            run_path,
+            language,
+            backend,
+            api_key,
+            json.loads(files),
+            attempts + 1,
+        )
+
+    def _update_leased(self, job_id: str, owner: str, sql: str, params: tuple) -> bool:
+        """Run an update on a job only while owner still holds its lease."""
+        with self._lock:
+            cursor = self._connect().execute(
+                f"UPDATE jobs SET {sql} WHERE id = ? AND status = ? AND lease_owner = ?",  # nosec B608
+                (*params, job_id, JOB_LEASED, owner),
+            )
+        return cursor.rowcount == 1
+
+    def extend(self, job_id: str, owner: str, visibility_timeout: float) -> bool:
+        """Extend a lease; False means the lease was lost to another worker."""
+        return self._update_leased(
+            job_id, owner, "lease_expires = ?", (time.time() + visibility_timeout,)
+        )
+
+    def update_files(
+        self, job_id: str, owner: str, files: List[Dict[str, Any]]
+    ) -> bool:
+        """Record per-file progress of a leased job."""
+        return self._update_leased(job_id, owner, "files = ?", (json.dumps(files),))
+
+    def finish(
+        self,
+        job_id: str,
+        owner: str,
+        files: List[Dict[str, Any]],
+        error: Optional[str] = None,
+    ) -> bool:
+        """Mark a leased job as done, or failed if an error is given."""
+        return self._update_leased(
+            job_id,
+            owner,
+            "status = ?, files = ?, error = ?, api_key = NULL, lease_owner = NULL, "
+            "lease_expires = NULL, finished_at = ?",
+            (RUN_FAILED if error else RUN_DONE, json.dumps(files), error, time.time()),
+        )
+
+    def release(self, job_id: str, owner: str) -> bool:
+        """Return a leased job to the queue, as when its worker shuts down."""
+        return self._update_leased(
+            job_id,
+            owner,
+            "status = ?, lease_owner = NULL, lease_expires = NULL, "
+            "attempts = attempts - 1",
+            (JOB_QUEUED,),
+        )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job's status in the shape of Run.to_dict, or None if unknown."""
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT status, error, created_at, finished_at, files, attempts, run_path "
+                    "FROM jobs WHERE id = ?",
+                    (job_id,),
+                )
+                .fetchone()
+            )
+        if row is None:
+            return None
+        status, error, created_at, finished_at, files, attempts, run_path = row
+        return {
+            "id": job_id,
+            "status": RUN_PROCESSING if status in (JOB_QUEUED, JOB_LEASED) else status,
+            "queued": status == JOB_QUEUED,
+            "attempts": attempts,
+            "error": error,
+            "created_at": created_at,
+            "finished_at": finished_at,
+            "run_path": run_path,
+            "files": json.loads(files),
+        }
+
+    def pending_run_paths(self) -> Set[str]:
+        """Return the run directories of jobs that have not finished."""
+        with self._lock:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT run_path FROM jobs WHERE status IN (?, ?)",
+                    (JOB_QUEUED, JOB_LEASED),
+                )
+                .fetchall()
+            )
+        return {row[0] for row in rows}
+
+    def prune(self, max_age: float) -> int:
+        """Delete jobs that finished more than max_age seconds ago."""
+        with self._lock:
+            cursor = self._connect().execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+                (time.time() - max_age,),
+            )
+        if cursor.rowcount:
+            logger.info(f"Pruned {cursor.rowcount} finished jobs")
+        return cursor.rowcount
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+job_queue = JobQueue(JOB_QUEUE_PATH)
@@ -0,0 +1,423 @@
+import asyncio
+import logging
+import os
+import uuid
+from typing import Annotated, Any, AsyncIterator, Dict, List, Optional, Tuple, Union
+from urllib.parse import quote
+
+from fastapi import APIRouter, Form, Header, HTTPException, Request, UploadFile, status
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from src.app.artifacts import (
+    ArtifactNotFoundError,
+    artifact_key,
+    artifact_store,
+    result_key,
+)
+from src.app.backends import TranscriptionBackend
+from src.app.config import JOB_QUEUE_ENABLED, TEMP_DIR
+from src.app.events import parse_last_event_id, stream_queued_events, stream_run_events
+from src.app.jobqueue import job_queue
+from src.app.runs import (
+    FILE_DONE,
+    FILE_FAILED,
+    FILE_SAVED,
+    RUN_DONE,
+    RUN_FAILED,
+    Run,
+    runs,
+)
+from src.app.storage import storage_governor
+from src.app.tasks import (
+    add_run_guard,
+    mark_run_active,
+    mark_run_inactive,
+    remove_run_dir,
+    schedule_run_expiry,
+)
+from src.app.transcription import (
+    acquire_backend,
+    backend_requires_api_key,
+    create_zip_response,
+    iter_finished_results,
+    process_files,
+    reserve_storage,
+    select_backend,
+    start_saves,
+    validate_request_data,
+    zip_entry,
+)
+
+# Initialize router and rate limiter
+router = APIRouter()
+limiter = Limiter(key_func=get_remote_address)
+
+# Configure logging
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+
+# Job state kept in the queue for workers only
+_INTERNAL_FILE_KEYS = ("path", "key", "sha256")
+
+if JOB_QUEUE_ENABLED:
+    # Uploads of jobs waiting in the queue must outlive the cleanup's max age
+    add_run_guard(job_queue.pending_run_paths)
+
+
+async def run_job(
+    run: Run, files: List[UploadFile], backend: TranscriptionBackend, language: str
+) -> None:
+    """Runs the transcription pipeline for a job and records the outcome on the run."""
+    mark_run_active(run.run_path)
+    try:
+        await process_files(files, run.run_path, backend, language, run)
+        run.finish()
+        logger.info(f"Job {run.id} finished")
+    except HTTPException:
+        # Validation errors are reported by the submitting request
+        raise
+    except Exception as e:
+        logger.error(f"Job {run.id} failed: {e}")
+        run.finish(f"Processing failed: {str(e)}")
+    finally:
+        await backend.aclose()
+        mark_run_inactive(run.run_path)
+        if run.finished.is_set():
+            # Results are served from memory, so the uploads can go right away
+            await asyncio.to_thread(remove_run_dir, run.run_path)
+
+
+async def wait_until_saved(run: Run) -> None:
+    """
+    Waits until every upload of the job has been saved to disk.
+    Uploads are closed once the submitting request returns, so the request
+    must not respond before then. Validation errors are re-raised here.
+    """
+    assert run.task is not None  # nosec B101
+    saved = asyncio.create_task(run.saved.wait())
+    try:
+        await asyncio.wait({run.task, saved}, return_when=asyncio.FIRST_COMPLETED)
+    except asyncio.CancelledError:
+        run.task.cancel()
+        raise
+    finally:
+        saved.cancel()
+
+    if run.task.done() and not run.task.cancelled() and run.task.exception():
+        runs.remove(run.id)
+        await asyncio.to_thread(remove_run_dir, run.run_path)
+        raise run.task.exception()  # type: ignore[misc]
+
+
+async def enqueue_job(
+    files: List[UploadFile],
+    language: str,
+    backend_name: str,
+    api_key: Optional[str],
+) -> str:
+    """
+    Saves a job's uploads, puts them in the artifact store and adds the job
+    to the durable queue, where a worker process picks it up. Returns the
+    job id.
+    """
+    run_id = str(uuid.uuid4())
+    run_path = os.path.join(TEMP_DIR, run_id)
+    await reserve_storage(run_path, files)
+    os.makedirs(run_path, exist_ok=True)
+    logger.info(f"Created run directory: {run_path}")
+
+    run = Run(run_id, run_path, [file.filename for file in files])
+    try:
+        save_tasks, _ = start_saves(files, run_path, run)
+        saved_files = [saved for saved in await asyncio.gather(*save_tasks) if saved]
+        storage_governor.settle(run_path)
+        keys = [
+            artifact_key(run_id, os.path.basename(saved.path)) for saved in saved_files
+        ]
+        # Large files are uploaded in parts, several at a time, by stores that support it
+        await asyncio.gather(
+            *(
+                asyncio.to_thread(artifact_store.upload, key, saved.path)
+                for key, saved in zip(keys, saved_files)
+            )
+        )
+    except BaseException:
+        await asyncio.to_thread(remove_run_dir, run_path)
+        await asyncio.to_thread(artifact_store.delete_run, run_id)
+        raise
+    if not artifact_store.on_local_disk:
+        # Workers fetch the uploads from the store, so the local copies can go
+        await asyncio.to_thread(remove_run_dir, run_path)
+
+    for saved in saved_files:
+        run.update(
+            saved.upload_index, FILE_SAVED, output_filename=saved.output_filename
+        )
+    job_files = run.to_dict()["files"]
+    for job_file in job_files:
+        if job_file["status"] not in (FILE_SAVED, FILE_FAILED):
+            job_file.update(status=FILE_FAILED, error="Failed to save file")
+    for key, saved in zip(keys, saved_files):
+        job_files[saved.upload_index].update(
+            path=saved.path, key=key, sha256=saved.sha256
+        )
+
+    # SQLite may wait on a worker's write lock, so keep it off the event loop
+    await asyncio.to_thread(
+        job_queue.enqueue, run_id, run_path, language, backend_name, api_key, job_files
+    )
+    # Kept while the job is pending, then for MAX_AGE_SECONDS after the worker finishes
+    schedule_run_expiry(run_path)
+    return run_id
+
+
+def public_job_status(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a queued job's status without the fields only workers need."""
+    status = {key: value for key, value in job.items() if key != "run_path"}
+    status["files"] = [
+        {
+            key: value
+            for key, value in job_file.items()
+            if key not in _INTERNAL_FILE_KEYS
+        }
+        for job_file in job["files"]
+    ]
+    return status
+
+
+async def iter_stored_results(job: Dict[str, Any]) -> AsyncIterator[Tuple[str, bytes]]:
+    """Yield ZIP entries for the transcripts a worker wrote for a queued job."""
+    output_filenames = {
+        job_file["index"]: job_file["output_filename"] for job_file in job["files"]
+    }
+    for job_file in job["files"]:
+        # Files that never reached disk have no entry, as in the in-process flow
+        if job_file["output_filename"] is None:
+            continue
+        result: Union[str, BaseException]
+        if job_file["status"] == FILE_DONE:
+            key = result_key(job["id"], job_file["index"])
+            result = (await asyncio.to_thread(artifact_store.get, key)).decode()
+        else:
+            result = RuntimeError(job_file["error"] or "Transcription did not finish")
+        yield zip_entry(job_file["index"], result, output_filenames)
+
+
+@router.post("/jobs", status_code=status.HTTP_202_ACCEPTED)
+@limiter.limit("5/minute")
+async def submit_job(
+    request: Request,
+    language: str = Form(...),
+    # Annotated, so the default stays None when the handler is called directly
+    backend: Annotated[Optional[str], Form()] = None,
+    authorization: Optional[str] = Header(None),
+    files: Optional[List[UploadFile]] = None,
+) -> Dict[str, Any]:
+    """Accepts a transcription batch and processes it in the background."""
+    if files is None:
+        files = []
+
+    logger.info(f"Received job with {len(files)} files, language: {language}")
+    backend_name = select_backend(backend)
+    api_key = validate_request_data(
+        files, language, authorization, backend_requires_api_key(backend_name)
+    )
+
+    if JOB_QUEUE_ENABLED:
+        job_id = await enqueue_job(files, language, backend_name, api_key)
+        return job_urls(job_id)
+
+    run_id = str(uuid.uuid4())
+    run_path = os.path.join(TEMP_DIR, run_id)
+    await reserve_storage(run_path, files)
+    os.makedirs(run_path, exist_ok=True)
+    logger.info(f"Created run directory: {run_path}")
+
+    transcriber = await acquire_backend(backend_name, api_key, run_path)
+
+    run = runs.create(run_id, run_path, [file.filename for file in files])
+    run.task = asyncio.create_task(run_job(run, files, transcriber, language))
+    await wait_until_saved(run)
+
+    return job_urls(run.id)
+
+
+def job_urls(job_id: str) -> Dict[str, Any]:
+    """The response to a submitted job: its id and where to follow it."""
+    return {
+        "job_id": job_id,
+        "status_url": f"/jobs/{job_id}",
+        "events_url": f"/jobs/{job_id}/events",
+        "result_url": f"/jobs/{job_id}/result",
+    }
+
+
+def job_not_found() -> HTTPException:
+    """The error for a job that is unknown or has expired."""
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Job not found. Results are kept for 5 minutes after completion.",
+    )
+
+
+def get_run_or_404(job_id: str) -> Run:
+    """Looks up a job, raising 404 if it is unknown or has expired."""
+    run = runs.get(job_id)
+    if run is None:
+        raise job_not_found()
+    return run
+
+
+async def get_queued_job_or_404(job_id: str) -> Dict[str, Any]:
+    """Looks up a job in the queue, raising 404 if it is unknown or has expired."""
+    job = await asyncio.to_thread(job_queue.get, job_id)
+    if job is None:
+        raise job_not_found()
+    return job
+
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> Dict[str, Any]:
+    """Returns the overall and per-file status of a job."""
+    if JOB_QUEUE_ENABLED:
+        return public_job_status(await get_queued_job_or_404(job_id))
+    return get_run_or_404(job_id).to_dict()
+
+
+@router.get("/jobs/{job_id}/events")
+async def get_job_events(
+    job_id: str, last_event_id: Optional[str] = Header(None)
+) -> StreamingResponse:
+    """
+    Streams the job's progress as Server-Sent Events: one event per file as
+    it is saved, split into chunks, transcribing, done (with its transcript)
+    or failed, then a final "finished" event with the job status.
+    """
+    if JOB_QUEUE_ENABLED:
+        await get_queued_job_or_404(job_id)
+        events = stream_queued_events(lambda: job_queue.get(job_id))
+    else:
+        run = get_run_or_404(job_id)
+        events = stream_run_events(run, parse_last_event_id(last_event_id))
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        # Don't let proxies cache or buffer the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/jobs/{job_id}/result", response_model=None)
+async def get_job_result(job_id: str) -> Any:
+    """Returns the job's ZIP of transcriptions, or 202 while it is still running."""
+    if JOB_QUEUE_ENABLED:
+        return await get_queued_job_result(job_id)
+    run = get_run_or_404(job_id)
+    if run.status == RUN_FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=run.error,
+        )
+    if run.status != RUN_DONE:
+        return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=run.to_dict())
+
+    return create_zip_response(iter_finished_results(run.results, run.output_filenames))
+
+
+async def get_queued_job_result(job_id: str) -> Any:
+    """Returns a queued job's ZIP of transcriptions, or 202 while it is waiting or running."""
+    job = await get_queued_job_or_404(job_id)
+    if job["status"] == RUN_FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=job["error"],
+        )
+    if job["status"] != RUN_DONE:
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED, content=public_job_status(job)
+        )
+
+    done = [job_file for job_file in job["files"] if job_file["status"] == FILE_DONE]
+    if done and not await asyncio.to_thread(
+        artifact_store.exists, result_key(job_id, done[0]["index"])
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job results have expired.",
+        )
+    return create_zip_response(iter_stored_results(job))
+
+
+def find_job_file(job: Dict[str, Any], name: str) -> Dict[str, Any]:
+    """Looks up a job's file by transcript or upload name, raising 404 if there is none."""
+    job_files: List[Dict[str, Any]] = job["files"]
+    for job_file in job_files:
+        if name in (job_file["output_filename"], job_file["filename"]):
+            return job_file
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="File not found in this job.",
+    )
+
+
+def transcript_response(job_file: Dict[str, Any], text: str) -> PlainTextResponse:
+    """Returns one file's transcript as a text download."""
+    return PlainTextResponse(
+        text,
+        headers={
+            "Content-Disposition": "attachment; "
+            f"filename*=UTF-8''{quote(job_file['output_filename'])}"
+        },
+    )
+
+
+def unfinished_file_response(
+    job: Dict[str, Any], job_file: Dict[str, Any]
+) -> JSONResponse:
+    """Returns 202 with the file's status while it is pending, or raises if it failed."""
+    if job_file["status"] == FILE_FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=job_file["error"],
+        )
+    if job["status"] == RUN_FAILED:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=job["error"],
+        )
+    content = {
+        key: value for key, value in job_file.items() if key not in _INTERNAL_FILE_KEYS
+    }
+    return JSONResponse(status_code=status.HTTP_202_ACCEPTED, content=content)
+
+
+@router.get("/jobs/{job_id}/files/{name}", response_model=None)
+async def get_job_file(job_id: str, name: str) -> Any:
+    """
+    Returns one file's transcript as soon as that file is done, without
+    waiting for the rest of the job, or 202 with its status while it is still
+    pending. Files are named by their transcript or upload filename.
+    """
+    if JOB_QUEUE_ENABLED:
+        job = await get_queued_job_or_404(job_id)
+        job_file = find_job_file(job, name)
+        if job_file["status"] == FILE_DONE:
+            key = result_key(job_id, job_file["index"])
+            try:
+                text = await asyncio.to_thread(artifact_store.get, key)
+            except ArtifactNotFoundError:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Job results have expired.",
+                ) from None
+            return transcript_response(job_file, text.decode())
+        return unfinished_file_response(job, job_file)
+
+    run = get_run_or_404(job_id)
+    job = run.to_dict()
+    job_file = find_job_file(job, name)
+    if job_file["status"] == FILE_DONE:
+        return transcript_response(job_file, str(run.results[job_file["index"]]))
+    return unfinished_file_response(job, job_file)
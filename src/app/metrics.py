@@ -0,0 +1,161 @@
+import asyncio
+import os
+
+from fastapi import APIRouter, Response
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+from src.app.config import TEMP_DIR
+
+# Initialize router
+router = APIRouter()
+
+# Bucket bounds in seconds, from fast local stages up to long API calls
+STAGE_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+    120,
+    300,
+)
+
+STAGE_SECONDS = Histogram(
+    "transcriber_stage_seconds",
+    "Time spent in each stage of processing a file.",
+    ["stage"],
+    buckets=STAGE_BUCKETS,
+)
+# Children are resolved once here so the hot path skips the label lookup
+VALIDATE_SECONDS = STAGE_SECONDS.labels("validate")
+SAVE_SECONDS = STAGE_SECONDS.labels("save")
+# Time from a file being picked up for transcription until its first request
+# is sent, including the wait for a concurrency slot
+TRANSCRIBE_QUEUE_SECONDS = STAGE_SECONDS.labels("transcribe_queue")
+TRANSCRIBE_API_SECONDS = STAGE_SECONDS.labels("transcribe_api")
+ZIP_SECONDS = STAGE_SECONDS.labels("zip")
+
+TRANSCRIBE_RETRIES = Counter(
+    "transcriber_retries",
+    "Transcription requests retried after a transient error.",
+    ["reason"],
+)
+
+# Labelled by a short, per-process salted API key fingerprint
+CONCURRENCY_LIMIT = Gauge(
+    "transcriber_concurrency_limit",
+    "Current adaptive concurrency window for transcription calls.",
+    ["key"],
+)
+CONCURRENCY_IN_FLIGHT = Gauge(
+    "transcriber_concurrency_in_flight",
+    "Transcription calls in flight.",
+    ["key"],
+)
+
+TRANSCRIPTIONS_COALESCED = Counter(
+    "transcriber_coalesced_transcriptions",
+    "Transcriptions that joined an identical in-flight transcription.",
+)
+
+TRANSCRIPT_CACHE_LOOKUPS = Counter(
+    "transcriber_transcript_cache_lookups",
+    "Transcript cache lookups, by result (hit, miss or error).",
+    ["result"],
+)
+CACHE_HITS = TRANSCRIPT_CACHE_LOOKUPS.labels("hit")
+CACHE_MISSES = TRANSCRIPT_CACHE_LOOKUPS.labels("miss")
+CACHE_ERRORS = TRANSCRIPT_CACHE_LOOKUPS.labels("error")
+
+CLIENT_DISCONNECTS = Counter(
+    "transcriber_client_disconnects",
+    "Clients that disconnected before their results were streamed.",
+)
+TRANSCRIPTIONS_CANCELLED = Counter(
+    "transcriber_cancelled_transcriptions",
+    "Transcriptions cancelled because their client disconnected.",
+)
+
+BYTES_IN = Counter("transcriber_bytes_in", "Bytes of uploaded audio saved to disk.")
+BYTES_OUT = Counter("transcriber_bytes_out", "Bytes of ZIP archives sent to clients.")
+
+FILES_IN_FLIGHT = Gauge(
+    "transcriber_files_in_flight",
+    "Files currently being saved or transcribed.",
+    ["stage"],
+)
+FILES_SAVING = FILES_IN_FLIGHT.labels("saving")
+FILES_TRANSCRIBING = FILES_IN_FLIGHT.labels("transcribing")
+
+BATCH_SIZE = Histogram(
+    "transcriber_batch_size",
+    "Files or chunks transcribed together in one local inference batch.",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "transcriber_event_loop_lag_seconds",
+    "How late the event loop woke from a timer, by whether cleanup was running.",
+    ["cleanup"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+RUN_DIR_BYTES = Gauge(
+    "transcriber_run_dir_bytes", "Disk space used by run directories."
+)
+STORAGE_RESERVED_BYTES = Gauge(
+    "transcriber_storage_reserved_bytes",
+    "Disk space reserved for uploads of admitted runs that is not yet written.",
+)
+STORAGE_USED_BYTES = Gauge(
+    "transcriber_storage_used_bytes",
+    "Disk space written by the uploads of admitted runs.",
+)
+STORAGE_REJECTIONS = Counter(
+    "transcriber_storage_rejections",
+    "Requests refused because the disk was above its high watermark.",
+)
+STORAGE_EVICTIONS = Counter(
+    "transcriber_storage_evictions",
+    "Finished run directories deleted early to relieve disk pressure.",
+)
+
+
+def directory_size(path: str) -> int:
+    """Return the total size of the files under path, or 0 if it doesn't exist."""
+    total = 0
+    for root, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(root, filename))
+            except OSError:
+                # Runs are deleted concurrently by the cleanup task
+                continue
+    return total
+
+
+# Disk usage is only measured when metrics are scraped, never per request
+RUN_DIR_BYTES.set_function(lambda: directory_size(TEMP_DIR))
+
+
+@router.get("/metrics")
+async def get_metrics() -> Response:
+    """Exposes metrics in the Prometheus text format."""
+    # Collection walks the run directories, so keep it off the event loop
+    content = await asyncio.to_thread(generate_latest)
+    return Response(content=content, media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,267 @@
+import asyncio
+import io
+import logging
+import multiprocessing
+import os
+import signal
+import threading
+import time
+import wave
+from multiprocessing.pool import Pool
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# The model, loaded by the parent before it forks; workers inherit it copy-on-write
+_engine: Any = None
+
+# Whisper decodes one 30 second window per forward pass; longer audio is
+# transcribed on its own
+WINDOW_SECONDS = 30
+# Upper bound on generated tokens per window, as in Whisper itself
+MAX_WINDOW_TOKENS = 448
+
+
+def run_inference(
+    engine: Any, audio: Union[str, io.BytesIO], language: Optional[str]
+) -> str:
+    """Transcribe audio with a faster-whisper model and return the joined text."""
+    segments, _ = engine.transcribe(audio, language=language)
+    # Segments are generated lazily; joining them runs the decoding
+    return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+def transcribe_batch(
+    engine: Any, items: List[Tuple[str, str]]
+) -> List[Union[str, Exception]]:
+    """
+    Transcribe (file path, language) pairs with one forward pass for all files
+    that fit in a single window. Each file is decoded and padded to the window
+    length, the log-mel features are stacked into one batch and generated
+    together; longer files fall back to run_inference. A file that fails gets
+    its exception in place of its text.
+    """
+    if len(items) == 1:
+        file_path, language = items[0]
+        return [run_inference(engine, file_path, language)]
+
+    # Only needed, and only installed, for the local backend
+    import numpy as np
+    from faster_whisper.audio import decode_audio, pad_or_trim
+    from faster_whisper.tokenizer import Tokenizer
+    from faster_whisper.transcribe import get_ctranslate2_storage
+
+    extractor = engine.feature_extractor
+    results: List[Union[str, Exception]] = [""] * len(items)
+    batch: List[int] = []
+    features = []
+    for index, (file_path, language) in enumerate(items):
+        try:
+            audio = decode_audio(file_path, sampling_rate=extractor.sampling_rate)
+            if len(audio) > WINDOW_SECONDS * extractor.sampling_rate:
+                results[index] = run_inference(engine, audio, language)
+                continue
+            features.append(pad_or_trim(extractor(audio)))
+            batch.append(index)
+        except Exception as e:
+            results[index] = e
+
+    if not batch:
+        return results
+
+    tokenizers = [
+        Tokenizer(
+            engine.hf_tokenizer,
+            engine.model.is_multilingual,
+            task="transcribe",
+            language=items[index][1],
+        )
+        for index in batch
+    ]
+    prompts = [
+        [*tokenizer.sot_sequence, tokenizer.no_timestamps] for tokenizer in tokenizers
+    ]
+    generated = engine.model.generate(
+        get_ctranslate2_storage(np.stack(features)),
+        prompts,
+        beam_size=5,
+        max_length=MAX_WINDOW_TOKENS,
+        suppress_blank=True,
+    )
+    for index, tokenizer, result in zip(batch, tokenizers, generated):
+        results[index] = tokenizer.decode(result.sequences_ids[0]).strip()
+    return results
+
+
+def silent_wav(seconds: float = 1.0, rate: int = 16000) -> io.BytesIO:
+    """Return a mono 16-bit WAV of silence, used to warm up the model."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(b"\x00\x00" * int(seconds * rate))
+    buffer.seek(0)
+    return buffer
+
+
+def _init_worker(warmup: bool) -> None:
+    """
+    Prepare a freshly forked worker. The parent handles Ctrl+C and shuts the
+    pool down, and the warmup inference sets up the inference threads and
+    buffers here rather than on the first real request.
+    """
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    if warmup:
+        try:
+            run_inference(_engine, silent_wav(), "en")
+        except Exception as e:
+            logger.warning(f"Model warmup failed in worker {os.getpid()}: {e}")
+
+
+def _transcribe(file_path: str, language: str) -> str:
+    """Runs in a worker: transcribe one file with the inherited model."""
+    return run_inference(_engine, file_path, language)
+
+
+def _transcribe_batch(items: List[Tuple[str, str]]) -> List[Union[str, Exception]]:
+    """Runs in a worker: transcribe a batch of files with the inherited model."""
+    return transcribe_batch(_engine, items)
+
+
+def _ping() -> int:
+    """Runs in a worker: prove it can take work."""
+    return os.getpid()
+
+
+def fork_available() -> bool:
+    """Whether worker processes can be forked on this platform."""
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+class ModelWorkerPool:
+    """
+    A pool of worker processes forked from a parent that has already loaded
+    the model, so the weights are shared copy-on-write instead of being loaded
+    per worker. Each worker runs a warmup inference when it starts and is
+    replaced with a fresh fork after max_tasks_per_child tasks, which returns
+    memory fragmented by inference to the OS.
+
+    The parent only loads the model and never runs inference itself: inference
+    starts native thread pools, which must not be running when a process forks.
+    For the same reason start() must be called on the main thread before the
+    process starts any other threads; the pool is never started lazily.
+    """
+
+    def __init__(
+        self,
+        load_model: Callable[[], Any],
+        processes: int,
+        max_tasks_per_child: Optional[int] = None,
+        warmup: bool = True,
+    ) -> None:
+        self.load_model = load_model
+        self.processes = processes
+        self.max_tasks_per_child = max_tasks_per_child or None
+        self.warmup = warmup
+        self._pool: Optional[Pool] = None
+        self._lock = threading.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self._pool is not None
+
+    def start(self) -> None:
+        """
+        Load the model and fork the workers; blocks until both are done.
+        Call it before any threads exist, such as a thread pool's workers.
+        """
+        with self._lock:
+            if self._pool is not None:
+                return
+            self._start()
+
+    def load(self) -> None:
+        """
+        Load the model without forking the workers, so processes forked from
+        this one, and the pools they start, share this copy of the weights.
+        """
+        global _engine
+        with self._lock:
+            if _engine is None:
+                _engine = self.load_model()
+
+    def _start(self) -> None:
+        global _engine
+        start = time.perf_counter()
+        if _engine is None:
+            _engine = self.load_model()
+        self._pool = multiprocessing.get_context("fork").Pool(
+            self.processes,
+            initializer=_init_worker,
+            initargs=(self.warmup,),
+            maxtasksperchild=self.max_tasks_per_child,
+        )
+        logger.info(
+            f"Started {self.processes} model workers in {time.perf_counter() - start:.1f}s"
+        )
+
+    async def run(self, function: Callable[..., Any], *args: Any) -> Any:
+        """Run a module-level function in a worker and await its result."""
+        if self._pool is None:
+            # Forking now could copy locks held by other threads into the workers
+            raise RuntimeError("Model workers are not started")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def resolve(result: Any) -> None:
+            if not future.done():
+                future.set_result(result)
+
+        def reject(error: BaseException) -> None:
+            if not future.done():
+                future.set_exception(error)
+
+        # Callbacks run on the pool's result thread
+        self._pool.apply_async(
+            function,
+            args,
+            callback=lambda result: loop.call_soon_threadsafe(resolve, result),
+            error_callback=lambda error: loop.call_soon_threadsafe(reject, error),
+        )
+        return await future
+
+    async def transcribe(self, file_path: str, language: str) -> str:
+        """Transcribe a file in one of the workers."""
+        return str(await self.run(_transcribe, file_path, language))
+
+    async def transcribe_batch(
+        self, items: List[Tuple[str, str]]
+    ) -> List[Union[str, Exception]]:
+        """Transcribe a batch of (file path, language) pairs in one of the workers."""
+        return list(await self.run(_transcribe_batch, items))
+
+    async def health(self, timeout: float = 5.0) -> Dict[str, Any]:
+        """Check that the workers respond to a ping within timeout seconds."""
+        if self._pool is None:
+            return {"status": "stopped", "processes": self.processes}
+        try:
+            pids = await asyncio.wait_for(
+                asyncio.gather(*(self.run(_ping) for _ in range(self.processes))),
+                timeout,
+            )
+        except Exception as e:
+            logger.error(f"Model worker health check failed: {e}")
+            return {"status": "unhealthy", "processes": self.processes, "error": str(e)}
+        return {"status": "ok", "processes": self.processes, "pids": sorted(set(pids))}
+
+    def close(self) -> None:
+        """Stop the workers and drop the model; tasks still running are abandoned."""
+        global _engine
+        _engine = None
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+            logger.info("Model workers stopped.")
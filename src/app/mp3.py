@@ -0,0 +1,230 @@
+import logging
+import os
+from typing import BinaryIO, Iterator, List, NamedTuple, Optional, Tuple
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Bytes read from disk at a time while scanning for frames or copying chunks
+SCAN_BLOCK_SIZE = 1024 * 1024
+
+# Bitrates in kbps indexed by [table][bitrate_index]; index 0 is "free" and 15 is invalid
+_BITRATES = {
+    "V1L1": [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    "V1L2": [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    "V1L3": [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    "V2L1": [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    "V2L2": [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+
+# Sample rates indexed by MPEG version bits, then by sample rate index
+_SAMPLE_RATES = {
+    0: (11025, 12000, 8000),  # MPEG 2.5
+    2: (22050, 24000, 16000),  # MPEG 2
+    3: (44100, 48000, 32000),  # MPEG 1
+}
+
+
+class FrameHeader(NamedTuple):
+    """The fields of an MPEG audio frame header needed to walk and split a file."""
+
+    version: int  # 1 for MPEG 1, 2 for MPEG 2 and MPEG 2.5
+    layer: int
+    bitrate: int  # bits per second
+    sample_rate: int
+    padding: bool
+    mono: bool
+    frame_length: int  # bytes, including the 4-byte header
+    samples: int
+
+    @property
+    def duration(self) -> float:
+        """Playback duration of the frame in seconds."""
+        return self.samples / self.sample_rate
+
+
+def parse_frame_header(data: bytes) -> Optional[FrameHeader]:
+    """Parse a 4-byte MPEG audio frame header, returning None if it is not valid."""
+    if len(data) < 4 or data[0] != 0xFF or data[1] & 0xE0 != 0xE0:
+        return None
+
+    version_bits = (data[1] >> 3) & 0x03
+    layer_bits = (data[1] >> 1) & 0x03
+    bitrate_index = data[2] >> 4
+    sample_rate_index = (data[2] >> 2) & 0x03
+    if version_bits == 1 or layer_bits == 0:
+        return None
+    # Free-format (0) and invalid (15) bitrates can't be used to size frames
+    if bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    version = 1 if version_bits == 3 else 2
+    layer = 4 - layer_bits
+    if version == 1:
+        table = f"V1L{layer}"
+    else:
+        table = "V2L1" if layer == 1 else "V2L2"
+    bitrate = _BITRATES[table][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version_bits][sample_rate_index]
+    padding = bool((data[2] >> 1) & 0x01)
+    mono = (data[3] >> 6) == 3
+
+    if layer == 1:
+        samples = 384
+        frame_length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 3 and version == 2:
+        samples = 576
+        frame_length = 72 * bitrate // sample_rate + padding
+    else:
+        samples = 1152
+        frame_length = 144 * bitrate // sample_rate + padding
+
+    return FrameHeader(
+        version, layer, bitrate, sample_rate, padding, mono, frame_length, samples
+    )
+
+
+def id3v2_size(data: bytes) -> int:
+    """Return the total size of an ID3v2 tag at the start of data, or 0 if absent."""
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    # The tag size is a 28-bit "synchsafe" integer (7 bits per byte)
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    has_footer = bool(data[5] & 0x10)
+    return 10 + size + (10 if has_footer else 0)
+
+
+def is_info_frame(frame: bytes, header: FrameHeader) -> bool:
+    """Check whether a frame is a Xing/Info/VBRI header rather than audio."""
+    if header.version == 1:
+        side_info = 17 if header.mono else 32
+    else:
+        side_info = 9 if header.mono else 17
+    tag_offset = 4 + side_info
+    return frame[tag_offset : tag_offset + 4] in (b"Xing", b"Info") or (
+        frame[36:40] == b"VBRI"
+    )
+
+
+def _read_at(file: BinaryIO, offset: int, size: int) -> bytes:
+    """Read up to size bytes at an absolute file offset."""
+    file.seek(offset)
+    return file.read(size)
+
+
+def iter_frames(path: str) -> Iterator[Tuple[int, FrameHeader]]:
+    """
+    Yield (offset, header) for every MPEG audio frame in a file.
+    A leading ID3v2 tag is skipped. After junk data, a candidate header is only
+    accepted if the following frame also has a valid header, which avoids
+    false syncs on random bytes that happen to look like a header.
+    """
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as file:
+        offset = id3v2_size(file.read(10))
+        synced = False
+        while offset + 4 <= file_size:
+            header = parse_frame_header(_read_at(file, offset, 4))
+            if header is not None and not synced:
+                next_offset = offset + header.frame_length
+                if next_offset + 4 <= file_size:
+                    synced = (
+                        parse_frame_header(_read_at(file, next_offset, 4)) is not None
+                    )
+                else:
+                    synced = True
+            if header is None or not synced:
+                synced = False
+                offset = _find_sync(file, offset + 1, file_size)
+                continue
+            yield offset, header
+            offset += header.frame_length
+
+
+def _find_sync(file: BinaryIO, offset: int, file_size: int) -> int:
+    """Return the offset of the next 0xFF byte that could start a frame header."""
+    while offset < file_size:
+        block = _read_at(file, offset, SCAN_BLOCK_SIZE)
+        position = block.find(b"\xff")
+        if position != -1:
+            return offset + position
+        offset += len(block)
+    return file_size
+
+
+def plan_chunks(
+    path: str, max_bytes: int, max_seconds: Optional[float] = None
+) -> List[Tuple[int, int]]:
+    """
+    Split the audio frames of an MP3 file into (start, end) byte ranges.
+    Every range starts and ends on a frame boundary and stays below max_bytes
+    and, if given, max_seconds of audio. Xing/Info header frames are dropped
+    because they would describe the whole file rather than the chunk.
+    """
+    file_size = os.path.getsize(path)
+    chunks: List[Tuple[int, int]] = []
+    start: Optional[int] = None
+    end = 0
+    duration = 0.0
+
+    with open(path, "rb") as file:
+        for index, (offset, header) in enumerate(iter_frames(path)):
+            frame_end = min(offset + header.frame_length, file_size)
+            if index == 0 and is_info_frame(
+                _read_at(file, offset, header.frame_length), header
+            ):
+                continue
+
+            # Close the current chunk if this frame would push it over a limit
+            if start is not None and (
+                frame_end - start > max_bytes
+                or (
+                    max_seconds is not None and duration + header.duration > max_seconds
+                )
+            ):
+                chunks.append((start, end))
+                start = None
+
+            if start is None:
+                start = offset
+                duration = 0.0
+            end = frame_end
+            duration += header.duration
+
+    if start is not None:
+        chunks.append((start, end))
+    return chunks
+
+
+def split_mp3(
+    path: str, output_dir: str, max_bytes: int, max_seconds: Optional[float] = None
+) -> List[str]:
+    """
+    Write the chunks planned by plan_chunks to output_dir and return their paths.
+    A file that already fits in a single chunk is returned as is, without copying.
+    """
+    chunks = plan_chunks(path, max_bytes, max_seconds)
+    if not chunks:
+        raise ValueError(f"No MP3 audio frames found in {path}")
+    if len(chunks) == 1 and os.path.getsize(path) <= max_bytes:
+        return [path]
+
+    os.makedirs(output_dir, exist_ok=True)
+    base_name = os.path.splitext(os.path.basename(path))[0]
+    chunk_paths: List[str] = []
+    with open(path, "rb") as source:
+        for number, (start, end) in enumerate(chunks):
+            chunk_path = os.path.join(output_dir, f"{base_name}.part{number:03d}.mp3")
+            source.seek(start)
+            remaining = end - start
+            with open(chunk_path, "wb") as target:
+                while remaining > 0:
+                    block = source.read(min(SCAN_BLOCK_SIZE, remaining))
+                    if not block:
+                        break
+                    target.write(block)
+                    remaining -= len(block)
+            chunk_paths.append(chunk_path)
+
+    logger.info(f"Split {path} into {len(chunk_paths)} chunks")
+    return chunk_paths
@@ -0,0 +1,186 @@
+import asyncio
+import email.utils
+import logging
+import random
+import re
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import (
+    AsyncContextManager,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Optional,
+    TypeVar,
+)
+
+import httpx
+from openai import APIConnectionError, APIStatusError
+
+from src.app.config import (
+    RETRY_BASE_DELAY,
+    RETRY_DEADLINE,
+    RETRY_MAX_ATTEMPTS,
+    RETRY_MAX_DELAY,
+)
+from src.app.metrics import TRANSCRIBE_RETRIES
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Status codes worth retrying besides 5xx, matching the OpenAI SDK's own policy
+RETRYABLE_STATUS_CODES = {408, 409, 429}
+
+# Durations such as "1s", "20ms" or "6m0s" used by the x-ratelimit-reset-* headers
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Check whether an API error is transient and the request may be retried."""
+    if isinstance(error, APIConnectionError):
+        # Also covers APITimeoutError
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code in RETRYABLE_STATUS_CODES or error.status_code >= 500
+    return False
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """Parse seconds ("1.5") or a Go-style duration ("1m30s", "20ms") into seconds."""
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts or "".join(number + unit for number, unit in parts) != value:
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+
+def retry_after(headers: httpx.Headers) -> Optional[float]:
+    """
+    Return how many seconds the server asked us to wait before retrying, or None.
+    Retry-After (and OpenAI's retry-after-ms) take precedence; otherwise the
+    reset time of whichever x-ratelimit-* budget is exhausted is used.
+    """
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        delay = parse_duration(retry_after_ms)
+        if delay is not None:
+            return delay / 1000
+
+    value = headers.get("retry-after")
+    if value:
+        delay = parse_duration(value)
+        if delay is not None:
+            return delay
+        try:
+            # Retry-After may also be an HTTP date
+            retry_at = email.utils.parsedate_to_datetime(value).timestamp()
+            return max(0.0, retry_at - time.time())
+        except (TypeError, ValueError):
+            pass
+
+    resets = [
+        parse_duration(headers[f"x-ratelimit-reset-{kind}"])
+        for kind in ("requests", "tokens")
+        if headers.get(f"x-ratelimit-remaining-{kind}") == "0"
+        and f"x-ratelimit-reset-{kind}" in headers
+    ]
+    known = [reset for reset in resets if reset is not None]
+    return max(known) if known else None
+
+
+@asynccontextmanager
+async def _no_slot() -> AsyncIterator[None]:
+    """Admit an attempt immediately, for callers without a concurrency limit."""
+    yield
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retries transient API errors with capped exponential backoff and full jitter.
+    Server hints from Retry-After and x-ratelimit-reset-* are respected, and no
+    attempt or wait may run past `deadline` seconds from the start of the first
+    attempt. Time spent queued for a slot before that doesn't count.
+    """
+
+    max_attempts: int = RETRY_MAX_ATTEMPTS
+    base_delay: float = RETRY_BASE_DELAY
+    max_delay: float = RETRY_MAX_DELAY
+    multiplier: float = 2.0
+    deadline: float = RETRY_DEADLINE
+    rng: random.Random = field(default_factory=random.Random, compare=False, repr=False)
+
+    def backoff(self, attempt: int) -> float:
+        """Return a jittered delay before retry number `attempt` (starting at 1)."""
+        ceiling = min(
+            self.max_delay, self.base_delay * self.multiplier ** (attempt - 1)
+        )
+        # Full jitter spreads retries from concurrent files over the whole window
+        return self.rng.uniform(0, ceiling)  # nosec B311
+
+    def delay_for(self, error: BaseException, attempt: int) -> float:
+        """Return how long to wait after a failed attempt, honouring server hints."""
+        delay = self.backoff(attempt)
+        if isinstance(error, APIStatusError):
+            hint = retry_after(error.response.headers)
+            if hint is not None:
+                delay = max(delay, hint)
+        return delay
+
+    async def call(
+        self,
+        request: Callable[[], Awaitable[T]],
+        description: str = "request",
+        slot: Optional[Callable[[], AsyncContextManager[None]]] = None,
+    ) -> T:
+        """
+        Run request, retrying transient failures until it succeeds or the policy gives up.
+        Each attempt holds `slot()` (e.g. a concurrency limiter's) while it runs,
+        but never while backing off.
+        """
+        deadline: Optional[float] = None
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                async with (slot or _no_slot)():
+                    if deadline is None:
+                        deadline = time.monotonic() + self.deadline
+                    return await asyncio.wait_for(
+                        request(), timeout=deadline - time.monotonic()
+                    )
+            except asyncio.TimeoutError as e:
+                raise TimeoutError(
+                    f"{description} did not finish within {self.deadline:g}s"
+                ) from e
+            except Exception as e:
+                if not is_retryable(e) or attempt >= self.max_attempts:
+                    raise
+                delay = self.delay_for(e, attempt)
+                if deadline is not None and time.monotonic() + delay >= deadline:
+                    logger.warning(
+                        f"Not retrying {description}: deadline would be exceeded"
+                    )
+                    raise
+                reason = (
+                    str(e.status_code)
+                    if isinstance(e, APIStatusError)
+                    else "connection"
+                )
+                TRANSCRIBE_RETRIES.labels(reason).inc()
+                logger.warning(
+                    f"{description} failed ({reason}), retrying in {delay:.2f}s "
+                    f"(attempt {attempt + 1}/{self.max_attempts})"
+                )
+                await asyncio.sleep(delay)
+
+
+retry_policy = RetryPolicy()
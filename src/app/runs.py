@@ -0,0 +1,175 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+
+from src.app.tasks import MAX_AGE_SECONDS
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Per-file states, in the order a file normally moves through them
+FILE_PENDING = "pending"
+FILE_SAVED = "saved"
+FILE_TRANSCRIBING = "transcribing"
+FILE_DONE = "done"
+FILE_FAILED = "failed"
+
+# Run states
+RUN_PROCESSING = "processing"
+RUN_DONE = "done"
+RUN_FAILED = "failed"
+
+# Progress events besides the per-file states: a file was split into chunks,
+# and the run finished
+EVENT_CHUNKED = "chunked"
+EVENT_FINISHED = "finished"
+
+
+@dataclass
+class FileState:
+    """Progress of a single uploaded file within a run."""
+
+    filename: Optional[str]
+    status: str = FILE_PENDING
+    output_filename: Optional[str] = None
+    error: Optional[str] = None
+
+
+class Run:
+    """Tracks the per-file progress and results of one transcription batch."""
+
+    def __init__(self, run_id: str, run_path: str, filenames: List[Optional[str]]):
+        self.id = run_id
+        self.run_path = run_path
+        self.files: Dict[int, FileState] = {
+            index: FileState(filename) for index, filename in enumerate(filenames)
+        }
+        self.status = RUN_PROCESSING
+        self.error: Optional[str] = None
+        self.results: Dict[int, Union[str, BaseException]] = {}
+        self.output_filenames: Dict[int, str] = {}
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.task: Optional["asyncio.Task[None]"] = None
+        # Set once every upload has been saved to disk (or failed to)
+        self.saved = asyncio.Event()
+        self.finished = asyncio.Event()
+        # Progress events in order, for event streams; an event's id is its
+        # position in the list, counting from 1
+        self.events: List[Dict[str, Any]] = []
+        self._new_event = asyncio.Event()
+
+    def update(
+        self,
+        index: int,
+        status: str,
+        error: Optional[str] = None,
+        output_filename: Optional[str] = None,
+        text: Optional[str] = None,
+    ) -> None:
+        """
+        Record a file moving to a new state. The transcript of a finished file
+        is only passed on to event streams.
+        """
+        file_state = self.files[index]
+        file_state.status = status
+        if error is not None:
+            file_state.error = error
+        if output_filename is not None:
+            file_state.output_filename = output_filename
+
+        data: Dict[str, Any] = {
+            "output_filename": file_state.output_filename,
+            "error": file_state.error,
+        }
+        if text is not None:
+            data["text"] = text
+        self.publish(status, index, **data)
+
+    def publish(self, event: str, index: Optional[int] = None, **data: Any) -> None:
+        """Append a progress event, about one file if an index is given."""
+        if index is not None:
+            data = {"index": index, "filename": self.files[index].filename, **data}
+        self.events.append({"event": event, "data": data})
+        # Wake everyone waiting, and start a new generation of waiters
+        self._new_event.set()
+        self._new_event = asyncio.Event()
+
+    async def wait_for_events(self, seen: int, timeout: float) -> bool:
+        """Wait up to timeout seconds for more than `seen` events; return whether there are."""
+        if len(self.events) <= seen:
+            try:
+                await asyncio.wait_for(self._new_event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return len(self.events) > seen
+
+    def finish(self, error: Optional[str] = None) -> None:
+        """Mark the run as finished, successfully unless an error is given."""
+        self.status = RUN_FAILED if error else RUN_DONE
+        self.error = error
+        self.finished_at = time.time()
+        self.saved.set()
+        self.finished.set()
+        self.publish(EVENT_FINISHED, status=self.status, error=error)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a JSON-serializable summary of the run."""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "files": [
+                {
+                    "index": index,
+                    "filename": state.filename,
+                    "status": state.status,
+                    "output_filename": state.output_filename,
+                    "error": state.error,
+                }
+                for index, state in sorted(self.files.items())
+            ],
+        }
+
+
+class RunRegistry:
+    """In-process registry of runs, looked up by id."""
+
+    def __init__(self, max_age: float) -> None:
+        self.max_age = max_age
+        self._runs: Dict[str, Run] = {}
+
+    def create(self, run_id: str, run_path: str, filenames: List[Optional[str]]) -> Run:
+        """Register a new run, pruning finished runs older than max_age."""
+        self.prune()
+        run = Run(run_id, run_path, filenames)
+        self._runs[run.id] = run
+        return run
+
+    def get(self, run_id: str) -> Optional[Run]:
+        """Return a run by id, or None if it is unknown or was pruned."""
+        return self._runs.get(run_id)
+
+    def remove(self, run_id: str) -> None:
+        """Forget a run."""
+        self._runs.pop(run_id, None)
+
+    def prune(self) -> None:
+        """Drop finished runs whose results have outlived max_age."""
+        cutoff = time.time() - self.max_age
+        expired = [
+            run_id
+            for run_id, run in self._runs.items()
+            if run.finished_at is not None and run.finished_at < cutoff
+        ]
+        for run_id in expired:
+            del self._runs[run_id]
+        if expired:
+            logger.info(f"Pruned {len(expired)} finished runs")
+
+
+runs = RunRegistry(MAX_AGE_SECONDS)
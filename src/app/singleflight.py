@@ -0,0 +1,65 @@
+import asyncio
+import functools
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Generic, TypeVar
+
+from src.app.metrics import TRANSCRIPTIONS_COALESCED
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call(Generic[T]):
+    """A shared in-flight call and the number of callers awaiting it."""
+
+    task: "asyncio.Task[T]"
+    waiters: int = 0
+
+
+class SingleFlight(Generic[T]):
+    """
+    Coalesces concurrent calls with the same key into one shared task.
+    Callers that arrive while a call is in flight await its result instead of
+    starting their own. A caller being cancelled only detaches it; the shared
+    task is cancelled once the last caller has gone.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[str, _Call[T]] = {}
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    async def do(self, key: str, function: Callable[[], Awaitable[T]]) -> T:
+        """Return the result of function(), sharing it with concurrent callers of key."""
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(function()))
+            self._calls[key] = call
+            call.task.add_done_callback(functools.partial(self._done, key, call))
+        else:
+            TRANSCRIPTIONS_COALESCED.inc()
+            logger.info(f"Joining in-flight call for {key}")
+
+        call.waiters += 1
+        try:
+            # Shielded so one caller's cancellation doesn't cancel the others' call
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                logger.info(f"Cancelling call for {key}: every caller has gone")
+                call.task.cancel()
+                self._forget(key, call)
+
+    def _done(self, key: str, call: _Call[T], task: "asyncio.Task[T]") -> None:
+        self._forget(key, call)
+
+    def _forget(self, key: str, call: _Call[T]) -> None:
+        """Remove a finished or abandoned call so later callers start afresh."""
+        if self._calls.get(key) is call:
+            del self._calls[key]
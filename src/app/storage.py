@@ -0,0 +1,141 @@
+import logging
+import os
+import shutil
+import threading
+from typing import Dict, NamedTuple
+
+from src.app.config import (
+    STORAGE_HIGH_WATERMARK,
+    STORAGE_LOW_WATERMARK,
+    STORAGE_RETRY_AFTER,
+    TEMP_DIR,
+)
+from src.app.metrics import STORAGE_RESERVED_BYTES, STORAGE_USED_BYTES
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class StorageFullError(Exception):
+    """Raised when a run can't be admitted without pushing the disk past its high watermark."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Not enough disk space for the upload")
+        self.retry_after = retry_after
+
+
+class DiskUsage(NamedTuple):
+    total: int
+    used: int
+
+
+class StorageGovernor:
+    """
+    Keeps the volume holding the run directories below a high watermark.
+
+    Each run reserves the size of its uploads before it writes anything and
+    commits bytes as they reach disk, so runs that are admitted together
+    can't jointly overfill the volume. A run that would push the projected
+    usage (bytes on the volume plus bytes reserved but not yet written) past
+    high_watermark is refused with StorageFullError, after finished runs have
+    been evicted to try and make room. Eviction frees space down to
+    low_watermark, so it doesn't run again for every request.
+    """
+
+    def __init__(
+        self,
+        path: str = TEMP_DIR,
+        high_watermark: float = STORAGE_HIGH_WATERMARK,
+        low_watermark: float = STORAGE_LOW_WATERMARK,
+        retry_after: int = STORAGE_RETRY_AFTER,
+    ) -> None:
+        self.path = path
+        self.high_watermark = high_watermark
+        self.low_watermark = min(low_watermark, high_watermark)
+        self.retry_after = retry_after
+        self._reserved: Dict[str, int] = {}
+        self._used: Dict[str, int] = {}
+        # Runs are released from worker threads as well as the event loop;
+        # reentrant, as reserving reads the totals
+        self._lock = threading.RLock()
+
+    @property
+    def reserved_bytes(self) -> int:
+        """Bytes admitted runs may still write."""
+        with self._lock:
+            return sum(self._reserved.values())
+
+    @property
+    def used_bytes(self) -> int:
+        """Bytes admitted runs have written."""
+        with self._lock:
+            return sum(self._used.values())
+
+    def disk_usage(self) -> DiskUsage:
+        """Return the size of the volume holding the runs and how much of it is used."""
+        path = self.path
+        # The runs directory is created on startup; before that, measure its parent
+        while not os.path.exists(path) and os.path.dirname(path) != path:
+            path = os.path.dirname(path)
+        usage = shutil.disk_usage(path)
+        return DiskUsage(usage.total, usage.total - usage.free)
+
+    def projected_ratio(self, extra: int = 0) -> float:
+        """Fraction of the volume used once every reservation, plus extra bytes, is written."""
+        try:
+            total, used = self.disk_usage()
+        except OSError as e:
+            # Failing open: refusing every upload would be worse than not governing
+            logger.warning(f"Could not measure disk usage of {self.path}: {e}")
+            return 0.0
+        if total <= 0:
+            return 0.0
+        return (used + self.reserved_bytes + extra) / total
+
+    def under_pressure(self) -> bool:
+        """Whether the volume is projected to be above the high watermark."""
+        return self.projected_ratio() > self.high_watermark
+
+    def bytes_to_free(self) -> int:
+        """How many bytes eviction must free to get back to the low watermark."""
+        try:
+            total, used = self.disk_usage()
+        except OSError:
+            return 0
+        return max(0, used + self.reserved_bytes - int(total * self.low_watermark))
+
+    def admits(self, nbytes: int) -> bool:
+        """Whether a run of nbytes fits below the high watermark."""
+        return self.projected_ratio(nbytes) <= self.high_watermark
+
+    def reserve(self, run_path: str, nbytes: int) -> None:
+        """Reserve space for a run's uploads, or raise StorageFullError if it doesn't fit."""
+        with self._lock:
+            if not self.admits(nbytes):
+                raise StorageFullError(self.retry_after)
+            self._reserved[run_path] = self._reserved.get(run_path, 0) + nbytes
+
+    def commit(self, run_path: str, nbytes: int) -> None:
+        """Record bytes a run has written, drawing down its reservation."""
+        with self._lock:
+            self._used[run_path] = self._used.get(run_path, 0) + nbytes
+            if run_path in self._reserved:
+                self._reserved[run_path] = max(0, self._reserved[run_path] - nbytes)
+
+    def settle(self, run_path: str) -> None:
+        """Drop what is left of a run's reservation once all its uploads are saved."""
+        with self._lock:
+            self._reserved.pop(run_path, None)
+
+    def release(self, run_path: str) -> None:
+        """Forget a run whose directory has been deleted."""
+        with self._lock:
+            self._reserved.pop(run_path, None)
+            self._used.pop(run_path, None)
+
+
+storage_governor = StorageGovernor()
+
+# Sampled when metrics are scraped
+STORAGE_RESERVED_BYTES.set_function(lambda: storage_governor.reserved_bytes)
+STORAGE_USED_BYTES.set_function(lambda: storage_governor.used_bytes)
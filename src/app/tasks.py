@@ -1,10 +1,30 @@
+import asyncio
+import heapq
 import logging
 import os
 import shutil
+import threading
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_futures
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
+from apscheduler.executors.pool import ThreadPoolExecutor as SchedulerThreadPool
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
+from src.app.artifacts import artifact_store
+from src.app.config import (
+    ARTIFACT_EXPIRY_INTERVAL,
+    CLEANUP_DELETE_WORKERS,
+    CLEANUP_MAX_DELETES_PER_SECOND,
+    LOOP_LAG_INTERVAL,
+    RUN_EXPIRY_SWEEP_INTERVAL,
+    RUN_RECONCILE_INTERVAL,
+)
+from src.app.metrics import EVENT_LOOP_LAG, STORAGE_EVICTIONS
+from src.app.storage import storage_governor
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -14,44 +34,421 @@ TEMP_DIR = "/tmp/transcriber_runs"  # nosec B108
 # Files and directories older than 5 minutes will be deleted
 MAX_AGE_SECONDS = 5 * 60
 
-scheduler = AsyncIOScheduler()
+# Cleanup jobs run on their own thread, never on the event loop or its
+# default executor
+scheduler = AsyncIOScheduler(executors={"default": SchedulerThreadPool(1)})
+
+# Run directories still being processed, which the cleanup must not delete
+_active_runs: Set[str] = set()
+# Callables returning more run directories to keep, such as those of queued jobs
+_run_guards: List[Callable[[], Set[str]]] = []
+
+
+class ExpiryIndex:
+    """
+    Deadlines of run directories in a min-heap, so a sweep only touches the
+    directories that are due rather than listing and stat-ing all of them.
+    Rescheduling a directory leaves its old entry in the heap; entries that
+    no longer match a directory's deadline are skipped when they come up.
+    """
+
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, str]] = []
+        self._deadlines: Dict[str, float] = {}
+        # Sweeps run on the scheduler's thread pool
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def schedule(self, run_path: str, deadline: float) -> None:
+        """Set when a run directory expires, replacing any earlier deadline."""
+        with self._lock:
+            self._deadlines[run_path] = deadline
+            heapq.heappush(self._heap, (deadline, run_path))
+            # Drop stale entries once they outnumber the live ones
+            if len(self._heap) > 2 * len(self._deadlines) + 64:
+                self._heap = [(d, path) for path, d in self._deadlines.items()]
+                heapq.heapify(self._heap)
+
+    def pop_due(self, now: float) -> List[str]:
+        """Remove and return the run directories whose deadline has passed."""
+        due = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                deadline, run_path = heapq.heappop(self._heap)
+                if self._deadlines.get(run_path) == deadline:
+                    del self._deadlines[run_path]
+                    due.append(run_path)
+        return due
+
+    def discard(self, run_path: str) -> None:
+        """Forget a run directory; its heap entry is skipped when it comes up."""
+        with self._lock:
+            self._deadlines.pop(run_path, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._heap.clear()
+            self._deadlines.clear()
+
+
+run_expiry = ExpiryIndex()
+
+
+def schedule_run_expiry(run_path: str, deadline: Optional[float] = None) -> None:
+    """Schedules a run directory for deletion, by default MAX_AGE_SECONDS from now."""
+    if deadline is None:
+        deadline = time.time() + MAX_AGE_SECONDS
+    run_expiry.schedule(run_path, deadline)
+
+
+def mark_run_active(run_path: str) -> None:
+    """Protects a run directory from cleanup while its batch is processing."""
+    _active_runs.add(run_path)
+    schedule_run_expiry(run_path)
+
+
+def mark_run_inactive(run_path: str) -> None:
+    """Releases a run directory, keeping it for MAX_AGE_SECONDS from now."""
+    _active_runs.discard(run_path)
+    try:
+        os.utime(run_path)
+    except OSError:
+        pass
+    schedule_run_expiry(run_path)
+
+
+def add_run_guard(guard: Callable[[], Set[str]]) -> None:
+    """Protects the run directories returned by guard from cleanup."""
+    _run_guards.append(guard)
+
+
+def protected_runs() -> Set[str]:
+    """Returns the run directories that cleanup must keep."""
+    protected = set(_active_runs)
+    for guard in _run_guards:
+        protected |= guard()
+    return protected
+
+
+def remove_run_dir(run_path: str) -> None:
+    """
+    Deletes a run directory as soon as its results have been delivered,
+    rather than leaving the uploads on disk until it expires.
+    """
+    shutil.rmtree(run_path, ignore_errors=True)
+    run_expiry.discard(run_path)
+    storage_governor.release(run_path)
+    logger.info(f"Removed run directory: {run_path}")
+
+
+class _CleanupActivity:
+    """Counts cleanup work in progress, so event loop lag can be attributed to it."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.running = 0
+        # Incremented whenever work starts, to spot work that came and went
+        self.started = 0
+
+    def __enter__(self) -> None:
+        with self._lock:
+            self.running += 1
+            self.started += 1
+
+    def __exit__(self, *exc_info: object) -> None:
+        with self._lock:
+            self.running -= 1
+
+    def active_since(self, started: int) -> bool:
+        """Whether cleanup has run since `started` was read from this object."""
+        return self.running > 0 or self.started != started
+
+
+cleanup_activity = _CleanupActivity()
+
+
+class RunDeleter:
+    """
+    Deletes run directories on its own small thread pool, starting at most
+    max_per_second deletions a second. Removing large directories then
+    neither takes threads from the event loop's default executor, which
+    requests use for file I/O, nor saturates the disk those requests write to.
+    """
+
+    def __init__(self, workers: int, max_per_second: float) -> None:
+        self.workers = workers
+        self.interval = 1.0 / max_per_second if max_per_second > 0 else 0.0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, "Future[None]"] = {}
+        self._next_start = 0.0
+        self._lock = threading.Lock()
+
+    def submit(self, run_path: str) -> "Future[None]":
+        """Queue a run directory for deletion; repeated calls share one deletion."""
+        with self._lock:
+            future = self._pending.get(run_path)
+            if future is None:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        self.workers, thread_name_prefix="run-deleter"
+                    )
+                future = self._executor.submit(self._delete, run_path)
+                self._pending[run_path] = future
+            return future
+
+    def _delete(self, run_path: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+        if start > now:
+            time.sleep(start - now)
+        try:
+            with cleanup_activity:
+                remove_run_dir(run_path)
+        finally:
+            with self._lock:
+                self._pending.pop(run_path, None)
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait for the deletions queued so far."""
+        with self._lock:
+            pending = list(self._pending.values())
+        wait_futures(pending, timeout)
+
+    def shutdown(self) -> None:
+        """Stop deleting; directories still queued are left for the next cleanup."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._pending.clear()
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+run_deleter = RunDeleter(CLEANUP_DELETE_WORKERS, CLEANUP_MAX_DELETES_PER_SECOND)
+
+
+def expire_if_old(dirpath: str, modified: float, now: float) -> None:
+    """
+    Queues a run directory not modified in MAX_AGE_SECONDS for deletion. One
+    that was touched since, for instance by a queue worker, is rescheduled.
+    """
+    if modified >= now - MAX_AGE_SECONDS:
+        schedule_run_expiry(dirpath, modified + MAX_AGE_SECONDS)
+    else:
+        run_deleter.submit(dirpath)
+
+
+def remove_if_expired(dirpath: str, now: float) -> None:
+    """Checks when a run directory was last modified and expires it if it is old."""
+    try:
+        expire_if_old(dirpath, os.stat(dirpath).st_mtime, now)
+    except FileNotFoundError:
+        # Already deleted, for instance when its client disconnected
+        pass
+    except PermissionError as e:
+        logger.warning(f"Permission error when cleaning up {dirpath}: {e}")
+    except Exception as e:
+        logger.error(f"Unexpected error when cleaning up {dirpath}: {e}")
+
+
+def expire_runs() -> None:
+    """Deletes the run directories whose deadline in the expiry index has passed."""
+    now = time.time()
+    due = run_expiry.pop_due(now)
+    if not due:
+        return
+
+    with cleanup_activity:
+        try:
+            protected = protected_runs()
+        except Exception as e:
+            logger.error(f"Postponing run expiry, a run guard failed: {e}")
+            for dirpath in due:
+                schedule_run_expiry(dirpath, now + RUN_EXPIRY_SWEEP_INTERVAL)
+            return
+
+        for dirpath in due:
+            if dirpath in _active_runs:
+                # Rescheduled when its batch finishes
+                continue
+            if dirpath in protected:
+                schedule_run_expiry(dirpath)
+                continue
+            remove_if_expired(dirpath, now)
+
+
+def relieve_storage_pressure() -> None:
+    """Evicts finished runs if the disk is above the storage governor's high watermark."""
+    if storage_governor.under_pressure():
+        evict_runs()
+
+
+def _scan_runs(protected: Set[str]) -> List[Tuple[float, str]]:
+    """
+    List the unprotected run directories in TEMP_DIR with their modification
+    times, using one stat per directory.
+    """
+    runs = []
+    with os.scandir(TEMP_DIR) as entries:
+        for entry in entries:
+            if entry.path in protected:
+                continue
+            try:
+                # Directory entries carry the type, so only the mtime needs a stat
+                if entry.is_dir(follow_symlinks=False):
+                    runs.append(
+                        (entry.stat(follow_symlinks=False).st_mtime, entry.path)
+                    )
+            except FileNotFoundError:
+                # Deleted since the directory was listed
+                continue
+            except OSError as e:
+                logger.warning(f"Could not inspect {entry.path}: {e}")
+    return runs
+
+
+def evict_runs() -> int:
+    """
+    Frees disk space down to the storage governor's low watermark by deleting
+    run directories that are no longer in use, expired ones first and then
+    the oldest finished ones. Returns how many were deleted.
+    """
+    if storage_governor.bytes_to_free() <= 0 or not os.path.exists(TEMP_DIR):
+        return 0
+    with cleanup_activity:
+        try:
+            protected = protected_runs()
+        except Exception as e:
+            logger.error(f"Skipping eviction, a run guard failed: {e}")
+            return 0
+        candidates = _scan_runs(protected)
+
+    evicted = 0
+    # Least recently modified first, which puts expired runs ahead of the rest
+    for _, dirpath in sorted(candidates):
+        if storage_governor.bytes_to_free() <= 0:
+            break
+        # Each deletion has to land before the disk is measured again
+        run_deleter.submit(dirpath).result()
+        STORAGE_EVICTIONS.inc()
+        evicted += 1
+    if evicted:
+        logger.warning(f"Evicted {evicted} run directories to relieve disk pressure")
+    return evicted
 
 
 def cleanup_old_files() -> None:
-    """Finds and deletes processing directories that are older than MAX_AGE_SECONDS."""
+    """
+    Scans TEMP_DIR and deletes processing directories that are older than
+    MAX_AGE_SECONDS. The expiry index handles the runs of this process; this
+    slower scan catches directories left by crashed or other processes, and
+    adds those not yet expired to the index. Deletions are handed to the
+    run deleter.
+    """
     if not os.path.exists(TEMP_DIR):
         return
 
-    now = time.time()
-    for dirname in os.listdir(TEMP_DIR):
-        dirpath = os.path.join(TEMP_DIR, dirname)
+    with cleanup_activity:
+        try:
+            protected = protected_runs()
+        except Exception as e:
+            # Without knowing what to keep, deleting nothing is the safe choice
+            logger.error(f"Skipping cleanup, a run guard failed: {e}")
+            return
+
+        now = time.time()
+        for modified, dirpath in _scan_runs(protected):
+            expire_if_old(dirpath, modified, now)
+
+
+def expire_artifacts() -> None:
+    """
+    Deletes the artifacts of runs not modified in MAX_AGE_SECONDS from an
+    artifact store outside TEMP_DIR, which the run cleanup doesn't reach.
+    """
+    with cleanup_activity:
         try:
-            # Check if it's a directory and get its modification time
-            if os.path.isdir(dirpath):
-                if os.stat(dirpath).st_mtime < now - MAX_AGE_SECONDS:
-                    shutil.rmtree(dirpath, ignore_errors=True)
-                    logger.info(f"Cleaned up old directory: {dirpath}")
-        except FileNotFoundError:
-            # This can happen if another process cleans the file between listdir and stat
-            continue
-        except PermissionError as e:
-            logger.warning(f"Permission error when cleaning up {dirpath}: {e}")
+            protected = {os.path.basename(path) for path in protected_runs()}
         except Exception as e:
-            logger.error(f"Unexpected error when cleaning up {dirpath}: {e}")
+            logger.error(f"Skipping artifact expiry, a run guard failed: {e}")
+            return
+
+        cutoff = time.time() - MAX_AGE_SECONDS
+        for run_id, modified in artifact_store.list_runs().items():
+            if modified < cutoff and run_id not in protected:
+                artifact_store.delete_run(run_id)
+                logger.info(f"Deleted expired artifacts of run {run_id}")
+
+
+class LoopLagMonitor:
+    """
+    Measures how late the event loop wakes up from a timer, which is how long
+    it was kept from serving requests, and records whether cleanup was
+    running at the time.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start sampling on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = cleanup_activity.started
+            before = loop.time()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - before - self.interval)
+            cleanup = "running" if cleanup_activity.active_since(started) else "idle"
+            EVENT_LOOP_LAG.labels(cleanup).observe(lag)
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+lag_monitor = LoopLagMonitor(LOOP_LAG_INTERVAL)
 
 
 def start_scheduler() -> None:
     """Initializes the temporary directory and starts the cleanup scheduler."""
     os.makedirs(TEMP_DIR, exist_ok=True)
-    scheduler.add_job(cleanup_old_files, "interval", minutes=1)
+    scheduler.add_job(expire_runs, "interval", seconds=RUN_EXPIRY_SWEEP_INTERVAL)
+    scheduler.add_job(
+        relieve_storage_pressure, "interval", seconds=RUN_EXPIRY_SWEEP_INTERVAL
+    )
+    # The first scan runs shortly after startup, for directories left by a
+    # previous process, without holding up startup itself
+    scheduler.add_job(
+        cleanup_old_files,
+        "interval",
+        seconds=RUN_RECONCILE_INTERVAL,
+        next_run_time=datetime.now() + timedelta(seconds=RUN_EXPIRY_SWEEP_INTERVAL),
+    )
+    if not artifact_store.on_local_disk:
+        scheduler.add_job(
+            expire_artifacts, "interval", seconds=ARTIFACT_EXPIRY_INTERVAL
+        )
     scheduler.start()
+    lag_monitor.start()
     logger.info("Cleanup scheduler started.")
 
 
 def shutdown_scheduler() -> None:
     """Shuts down the cleanup scheduler gracefully."""
+    lag_monitor.stop()
     try:
-        scheduler.shutdown()
+        # Don't hold up shutdown for a scan in progress
+        scheduler.shutdown(wait=False)
+        run_deleter.shutdown()
         logger.info("Cleanup scheduler stopped.")
     except Exception as e:
         logger.error(f"Error shutting down scheduler: {e}")
@@ -1,19 +1,92 @@
 import asyncio
+import hashlib
 import logging
 import os
+import time
 import uuid
+from contextvars import ContextVar
 from http import HTTPStatus
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import (
+    Annotated,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import uvicorn
-from fastapi import APIRouter, File, Form, Header, HTTPException, Request, UploadFile, status
-from fastapi.responses import FileResponse
-from openai import APIConnectionError, APIError, AuthenticationError, OpenAI
+from fastapi import (
+    APIRouter,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Request,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from openai import (
+    APIConnectionError,
+    APIError,
+    AsyncOpenAI,
+    AuthenticationError,
+    OpenAI,
+)
 from slowapi import Limiter
 from slowapi.util import get_remote_address
-
-from src.app.config import MAX_FILE_SIZE, TEMP_DIR
+from starlette.background import BackgroundTask
+
+from src.app.backends import (
+    BACKENDS,
+    BackendUnavailableError,
+    TranscriptionBackend,
+    as_backend,
+    open_backend,
+    resolve_backend_name,
+)
+from src.app.cache import transcript_cache
+from src.app.config import (
+    CHUNK_MAX_BYTES,
+    CHUNK_MAX_SECONDS,
+    MAX_FILE_SIZE,
+    TEMP_DIR,
+    UPLOAD_CHUNK_SIZE,
+)
+from src.app.metrics import (
+    BYTES_IN,
+    FILES_SAVING,
+    FILES_TRANSCRIBING,
+    SAVE_SECONDS,
+    STORAGE_REJECTIONS,
+    TRANSCRIBE_API_SECONDS,
+    TRANSCRIBE_QUEUE_SECONDS,
+    TRANSCRIPTIONS_CANCELLED,
+    VALIDATE_SECONDS,
+)
+from src.app.disconnect import watch_disconnect
+from src.app.mp3 import split_mp3
+from src.app.retry import retry_policy
+from src.app.runs import (
+    FILE_DONE,
+    FILE_FAILED,
+    FILE_PENDING,
+    FILE_SAVED,
+    FILE_TRANSCRIBING,
+    EVENT_CHUNKED,
+    Run,
+)
+from src.app.singleflight import SingleFlight
+from src.app.storage import StorageFullError, storage_governor
+from src.app.tasks import evict_runs, mark_run_active, mark_run_inactive, remove_run_dir
+from src.app.zipstream import stream_zip
 
 # Initialize router and rate limiter
 router = APIRouter()
@@ -23,11 +96,29 @@ limiter = Limiter(key_func=get_remote_address)
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 
+# Transcriptions in flight, keyed like the transcript cache
+transcriptions_in_flight: SingleFlight[str] = SingleFlight()
+
+# When the current file was picked up for transcription, for queue wait metrics
+_transcription_started: ContextVar[Optional[float]] = ContextVar(
+    "transcription_started", default=None
+)
+# Told how many chunks the current file was split into, for progress events
+_chunks_listener: ContextVar[Optional[Callable[[int], None]]] = ContextVar(
+    "chunks_listener", default=None
+)
+
 
 def validate_request_data(
-    files: Optional[List[UploadFile]], language: str, authorization: Optional[str]
-) -> str:
-    """Validate request data and return API key if valid."""
+    files: Optional[List[UploadFile]],
+    language: str,
+    authorization: Optional[str],
+    require_api_key: bool = True,
+) -> Optional[str]:
+    """
+    Validate request data and return API key if valid.
+    The Authorization header may be omitted when require_api_key is False.
+    """
     logger.info("Validating request data")
     if not files:
         logger.error("No files provided")
@@ -43,6 +134,10 @@ def validate_request_data(
             detail="Language parameter is required.",
         )
 
+    if not authorization and not require_api_key:
+        logger.info("Request data validated successfully")
+        return None
+
     if not authorization:
         logger.error("No authorization header provided")
         raise HTTPException(
@@ -69,21 +164,82 @@ def validate_request_data(
     return api_key
 
 
-def create_client(api_key: str) -> Tuple[Optional[OpenAI], Optional[str]]:
-    """Create OpenAI client and return it with any validation error."""
+def select_backend(requested: Optional[str]) -> str:
+    """Return the name of the backend for a request, or raise 400 if it is unavailable."""
     try:
-        client = OpenAI(api_key=api_key)
-        # Test if the API key is valid by accessing the property
-        _ = client.api_key
-        return client, None
+        return resolve_backend_name(requested)
+    except BackendUnavailableError as e:
+        logger.error(str(e))
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
+
+
+def backend_requires_api_key(name: str) -> bool:
+    """Whether requests for the named backend must carry an OpenAI API key."""
+    return BACKENDS[name].requires_api_key
+
+
+async def acquire_backend(
+    name: str, api_key: Optional[str], run_path: str
+) -> TranscriptionBackend:
+    """Open the request's backend, removing the run directory and raising 400 on failure."""
+    try:
+        return await open_backend(name, api_key)
+    except BackendUnavailableError as e:
+        await asyncio.to_thread(remove_run_dir, run_path)
+        logger.error(f"Transcription backend unavailable: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        ) from e
     except Exception as e:
-        return None, str(e)
+        await asyncio.to_thread(remove_run_dir, run_path)
+        logger.error(f"Invalid OpenAI API Key format: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid OpenAI API Key format.",
+        ) from e
+
+
+def upload_size(file: UploadFile) -> int:
+    """Return the size of an upload, measuring its spool if the parser didn't."""
+    if file.size is not None:
+        return file.size
+    file.file.seek(0, os.SEEK_END)
+    size = file.file.tell()
+    file.file.seek(0)
+    return size
+
+
+async def reserve_storage(run_path: str, files: List[UploadFile]) -> None:
+    """
+    Reserve disk space for a run's uploads, evicting finished runs if the disk
+    is under pressure, or raise 503 with Retry-After if there still isn't room.
+    """
+    nbytes = sum(upload_size(file) for file in files)
+    try:
+        storage_governor.reserve(run_path, nbytes)
+        return
+    except StorageFullError:
+        await asyncio.to_thread(evict_runs)
+    try:
+        storage_governor.reserve(run_path, nbytes)
+    except StorageFullError as e:
+        STORAGE_REJECTIONS.inc()
+        logger.warning(f"Refusing {nbytes} bytes of uploads: the disk is nearly full")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The server is low on disk space. Please try again shortly.",
+            headers={"Retry-After": str(e.retry_after)},
+        ) from e
 
 
 def validate_file(file: UploadFile) -> Optional[str]:
     """Validate a single uploaded file and return an error message if invalid."""
     logger.info(f"Validating file: {file.filename}")
-    
+
     # Validate file extension first
     if file.filename is not None:
         file_extension = Path(file.filename).suffix.lower()
@@ -100,9 +256,13 @@ def validate_file(file: UploadFile) -> Optional[str]:
     if file.content_type not in ["audio/mpeg", "audio/mp3"]:
         # If MIME type is not what we expect but extension is .mp3, we'll allow it
         if file.filename and Path(file.filename).suffix.lower() == ".mp3":
-            logger.info(f"Accepting file with .mp3 extension despite MIME type: {file.content_type}")
+            logger.info(
+                f"Accepting file with .mp3 extension despite MIME type: {file.content_type}"
+            )
         else:
-            error_msg = f"File {file.filename} has invalid MIME type: {file.content_type}"
+            error_msg = (
+                f"File {file.filename} has invalid MIME type: {file.content_type}"
+            )
             logger.warning(error_msg)
             return error_msg
 
@@ -125,127 +285,295 @@ def validate_file(file: UploadFile) -> Optional[str]:
     return None
 
 
+class SavedFile(NamedTuple):
+    """An upload saved to the run directory."""
+
+    path: str
+    # Position in the request; "index" would shadow tuple.index
+    upload_index: int
+    output_filename: str
+    sha256: str
+    size: int
+
+
 async def save_file(
-    file: UploadFile, run_path: str, index: int
-) -> Tuple[Optional[str], Optional[Tuple[int, str]]]:
-    """Save a single uploaded file to disk and return file path and output filename."""
+    file: UploadFile, run_path: str, index: int, chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> Optional[SavedFile]:
+    """
+    Save a single uploaded file to disk and return where it was saved.
+    The upload is copied in chunks of chunk_size bytes so memory use does not
+    grow with the file size, and its SHA-256 is computed along the way.
+    """
     logger.info(f"Saving file {index}: {file.filename}")
-    
+
     if file.filename is None:
         logger.error("File has no filename")
-        return None, None
+        return None
 
     file_path = os.path.join(run_path, file.filename)
     logger.info(f"Saving file to: {file_path}")
-    
+
     try:
-        # Read file content
-        content = await file.read()
-        
-        # Write file content to disk
-        with open(file_path, "wb") as buffer:
-            buffer.write(content)
-        
-        logger.info(f"File saved successfully: {file_path}, size: {len(content)} bytes")
-        
-        if len(content) == 0:
+        # Stream file content from the upload spool to disk
+        bytes_written = 0
+        digest = hashlib.sha256()
+        with FILES_SAVING.track_inprogress(), SAVE_SECONDS.time():
+            with open(file_path, "wb") as buffer:
+                while True:
+                    chunk = await file.read(chunk_size)
+                    if not chunk:
+                        break
+                    buffer.write(chunk)
+                    digest.update(chunk)
+                    bytes_written += len(chunk)
+        BYTES_IN.inc(bytes_written)
+        storage_governor.commit(run_path, bytes_written)
+
+        logger.info(
+            f"File saved successfully: {file_path}, size: {bytes_written} bytes"
+        )
+
+        if bytes_written == 0:
             logger.error("Saved file is empty")
-            return None, None
-            
+            return None
+
         base_name = os.path.splitext(file.filename)[0]
         output_filename = f"{base_name}.txt"
 
-        return file_path, (index, output_filename)
+        return SavedFile(
+            file_path, index, output_filename, digest.hexdigest(), bytes_written
+        )
     except Exception as e:
         logger.error(f"Failed to save file {file.filename}: {e}")
-        return None, None
+        return None
+
+
+class _InputRemovedError(FileNotFoundError):
+    """The file a transcription was reading was deleted while it ran."""
 
 
-async def transcribe_file(client: OpenAI, file_path: str, language: str) -> str:
+async def transcribe_file(
+    client: Union[OpenAI, AsyncOpenAI, TranscriptionBackend],
+    file_path: str,
+    language: str,
+    content_hash: Optional[str] = None,
+) -> str:
     """
-    Sends an audio file to the OpenAI Whisper API for transcription.
-    Uses asyncio.to_thread to run the blocking I/O operation in a separate thread.
+    Transcribes an audio file with a backend, or with the OpenAI Whisper API
+    when given an OpenAI client.
+    When the file's content hash is given, the transcript cache is checked
+    first, concurrent transcriptions of identical audio share one call,
+    and successful transcriptions are stored in the cache.
+    Files larger than the API upload limit are split at MP3 frame boundaries
+    and the chunks are transcribed concurrently.
     """
     logger.info(f"Starting transcription for file: {file_path}")
-    
+
     # Check if file exists and has content
     if not os.path.exists(file_path):
         error_msg = f"File does not exist: {file_path}"
         logger.error(error_msg)
         raise FileNotFoundError(error_msg)
-        
+
     file_size = os.path.getsize(file_path)
     logger.info(f"File size: {file_size} bytes")
-    
+
     if file_size == 0:
         error_msg = f"File is empty: {file_path}"
         logger.error(error_msg)
         raise ValueError(error_msg)
-    
-    try:
-        with open(file_path, "rb") as audio_file:
-            # Check if audio file has content
-            audio_file.seek(0, os.SEEK_END)
-            audio_size = audio_file.tell()
-            audio_file.seek(0)
-            
-            if audio_size == 0:
-                error_msg = f"Audio file is empty: {file_path}"
-                logger.error(error_msg)
-                raise ValueError(error_msg)
-                
-            logger.info(f"Sending {audio_size} bytes to OpenAI API")
-            
-            transcription = await asyncio.to_thread(
-                client.audio.transcriptions.create,
-                model="whisper-1",
-                file=audio_file,
-                language=language,
+
+    backend = as_backend(client)
+    if content_hash is None:
+        return await _transcribe_chunks(backend, file_path, file_size, language)
+
+    # The cache is SQLite on disk, so it is read and written off the event loop
+    cached_text = await asyncio.to_thread(
+        transcript_cache.get, content_hash, language, backend.model
+    )
+    if cached_text is not None:
+        logger.info(f"Transcript cache hit for file: {file_path}")
+        return cached_text
+
+    async def transcribe_and_cache() -> str:
+        try:
+            transcription_text = await _transcribe_chunks(
+                backend, file_path, file_size, language
             )
-            
-        # Check transcription result
-        if transcription is None:
-            error_msg = "Received None transcription result from OpenAI API"
-            logger.error(error_msg)
-            raise ValueError(error_msg)
-            
-        if not hasattr(transcription, 'text'):
-            error_msg = "Transcription result missing 'text' attribute"
+        except Exception as e:
+            if os.path.exists(file_path):
+                raise
+            raise _InputRemovedError(f"File was removed: {file_path}") from e
+        await asyncio.to_thread(
+            transcript_cache.put,
+            content_hash,
+            language,
+            backend.model,
+            transcription_text,
+        )
+        return transcription_text
+
+    # Identical audio already being transcribed is awaited, not sent again
+    key = transcript_cache.make_key(content_hash, language, backend.model)
+    return await _transcribe_shared(key, file_path, transcribe_and_cache)
+
+
+async def _transcribe_shared(
+    key: str, file_path: str, transcribe: Callable[[], Awaitable[str]]
+) -> str:
+    """Join the in-flight transcription for key, re-running it if its input is removed."""
+    while True:
+        try:
+            return await transcriptions_in_flight.do(key, transcribe)
+        except _InputRemovedError:
+            # The shared call read another caller's file, whose run was deleted
+            # when that caller went away; run it again from our own copy
+            if not os.path.exists(file_path):
+                raise
+            logger.warning(f"Shared transcription lost its input, using {file_path}")
+
+
+async def _transcribe_chunks(
+    backend: TranscriptionBackend, file_path: str, file_size: int, language: str
+) -> str:
+    """Transcribe a file in one request, or in parallel chunks if it is too large."""
+    # Split files the API would reject into frame-aligned chunks
+    if file_size > CHUNK_MAX_BYTES or CHUNK_MAX_SECONDS is not None:
+        chunk_paths = await asyncio.to_thread(
+            split_mp3,
+            file_path,
+            f"{file_path}.chunks",
+            CHUNK_MAX_BYTES,
+            CHUNK_MAX_SECONDS,
+        )
+    else:
+        chunk_paths = [file_path]
+
+    if len(chunk_paths) == 1:
+        return await transcribe_chunk(backend, chunk_paths[0], language)
+
+    # Transcribe all chunks concurrently and stitch the text back in order
+    logger.info(f"Transcribing {len(chunk_paths)} chunks of {file_path} concurrently")
+    listener = _chunks_listener.get()
+    if listener is not None:
+        listener(len(chunk_paths))
+    chunk_tasks = [
+        asyncio.create_task(transcribe_chunk(backend, chunk_path, language))
+        for chunk_path in chunk_paths
+    ]
+    try:
+        chunk_texts = await asyncio.gather(*chunk_tasks)
+    except BaseException:
+        for task in chunk_tasks:
+            task.cancel()
+        raise
+
+    transcription_text = " ".join(text.strip() for text in chunk_texts if text.strip())
+    logger.info(
+        f"Transcription completed for file: {file_path}, length: {len(transcription_text)}"
+    )
+    return transcription_text
+
+
+async def transcribe_chunk(
+    client: Union[OpenAI, AsyncOpenAI, TranscriptionBackend],
+    file_path: str,
+    language: str,
+) -> str:
+    """
+    Sends a single audio file of acceptable size to the transcription backend.
+    Calls are admitted by the backend's concurrency limiter (adaptive per API
+    key for OpenAI) and transient errors are retried according to the retry
+    policy, whichever backend is used.
+    """
+    backend = as_backend(client)
+    try:
+        # Check if audio file has content
+        audio_size = os.path.getsize(file_path)
+        if audio_size == 0:
+            error_msg = f"Audio file is empty: {file_path}"
             logger.error(error_msg)
             raise ValueError(error_msg)
-            
-        transcription_text = transcription.text
-        logger.info(f"Transcription completed for file: {file_path}, length: {len(transcription_text)}")
-        
+
+        logger.info(f"Sending {audio_size} bytes to the {backend.name} backend")
+        limiter = backend.limiter
+        queued_at = _transcription_started.get()
+
+        async def request() -> str:
+            nonlocal queued_at
+            if queued_at is not None:
+                TRANSCRIBE_QUEUE_SECONDS.observe(time.perf_counter() - queued_at)
+                queued_at = None
+            with TRANSCRIBE_API_SECONDS.time():
+                # Every attempt reads the file from the start
+                return await backend.transcribe(file_path, language)
+
+        # The retry deadline starts once a slot is held, so queueing behind a
+        # small window doesn't use it up
+        transcription_text = await retry_policy.call(
+            request, f"Transcription of {file_path}", slot=limiter.slot
+        )
+        logger.info(
+            f"Transcription completed for file: {file_path}, length: {len(transcription_text)}"
+        )
+
         if len(transcription_text) == 0:
             logger.warning(f"Transcription result is empty for file: {file_path}")
-            
+
         return transcription_text
-        
+
     except Exception as e:
         logger.error(f"Error during transcription of {file_path}: {e}")
         raise
 
 
-async def process_files(
-    files: List[UploadFile], run_path: str
-) -> Tuple[List[str], dict[int, str], List[str]]:
-    """Process uploaded files and return saved files, output filenames, and validation errors."""
+async def _transcribe_tracked(
+    run: Run,
+    saved: SavedFile,
+    backend: TranscriptionBackend,
+    language: str,
+) -> str:
+    """Transcribe a saved file, recording its progress on the run."""
+    run.update(saved.upload_index, FILE_TRANSCRIBING)
+    # Runs in its own task, so chunk tasks inherit this but siblings don't
+    _transcription_started.set(time.perf_counter())
+    _chunks_listener.set(
+        lambda count: run.publish(EVENT_CHUNKED, saved.upload_index, chunks=count)
+    )
+    try:
+        with FILES_TRANSCRIBING.track_inprogress():
+            text = await transcribe_file(backend, saved.path, language, saved.sha256)
+    except Exception as e:
+        run.results[saved.upload_index] = e
+        run.update(saved.upload_index, FILE_FAILED, error=str(e))
+        raise
+    # Each result is available as soon as its own file is done
+    run.results[saved.upload_index] = text
+    run.update(saved.upload_index, FILE_DONE, text=text)
+    return text
+
+
+def start_saves(
+    files: List[UploadFile], run_path: str, run: Run
+) -> Tuple[List[asyncio.Task], List[str]]:
+    """Validate uploaded files and start saving the valid ones to disk."""
     logger.info(f"Processing {len(files)} files")
     validation_errors: List[str] = []
-    save_tasks = []
+    save_tasks: List[asyncio.Task] = []
 
     for index, file in enumerate(files):
         logger.info(f"Processing file {index}: {file.filename}")
         # Validate file
-        error = validate_file(file)
+        with VALIDATE_SECONDS.time():
+            error = validate_file(file)
         if error:
             logger.warning(f"File validation error for {file.filename}: {error}")
             validation_errors.append(error)
+            run.update(index, FILE_FAILED, error=error)
             continue
 
         # Create save task
-        save_tasks.append(save_file(file, run_path, index))
+        save_tasks.append(asyncio.create_task(save_file(file, run_path, index)))
 
     logger.info(f"Validation errors: {len(validation_errors)}")
     logger.info(f"Save tasks created: {len(save_tasks)}")
@@ -257,59 +585,211 @@ async def process_files(
             detail="No valid MP3 files were provided. Errors: "
             + "; ".join(validation_errors),
         )
+    return save_tasks, validation_errors
+
+
+async def start_transcriptions(
+    files: List[UploadFile],
+    run_path: str,
+    backend: Union[OpenAI, AsyncOpenAI, TranscriptionBackend],
+    language: str,
+    run: Optional[Run] = None,
+) -> Tuple[dict[int, asyncio.Task], dict[int, str], List[str]]:
+    """
+    Validate and save uploaded files, starting each file's transcription as
+    soon as its own save finishes, so a slow save never delays files that are
+    already on disk. Returns once every upload is on disk, with the running
+    transcription tasks and output filenames keyed by upload index, plus
+    validation errors. Per-file progress is recorded on the run, if given.
+    """
+    if run is None:
+        run = Run(os.path.basename(run_path), run_path, [f.filename for f in files])
+    backend = as_backend(backend)
+    save_tasks, validation_errors = start_saves(files, run_path, run)
 
-    # Save files concurrently
-    if save_tasks:
-        logger.info("Saving files concurrently")
-        save_results = await asyncio.gather(*save_tasks, return_exceptions=True)
-        logger.info(f"Save results: {len(save_results)}")
-
-        # Process save results
-        saved_files: List[str] = []
-        output_filenames: dict[int, str] = {}
-        for result in save_results:
-            if isinstance(result, Exception):
-                logger.error(f"File save error: {result}")
+    output_filenames: dict[int, str] = {}
+    transcription_tasks: dict[int, asyncio.Task] = {}
+    try:
+        for next_save in asyncio.as_completed(save_tasks):
+            try:
+                saved = await next_save
+            except Exception as e:
+                logger.error(f"File save error: {e}")
                 continue
-            file_path, output_info = result
-            if file_path and output_info:
-                saved_files.append(file_path)
-                index, filename = output_info
-                output_filenames[index] = filename
-    else:
-        saved_files = []
-        output_filenames = {}
+            if saved is not None:
+                output_filenames[saved.upload_index] = saved.output_filename
+                run.update(
+                    saved.upload_index,
+                    FILE_SAVED,
+                    output_filename=saved.output_filename,
+                )
+                transcription_tasks[saved.upload_index] = asyncio.create_task(
+                    _transcribe_tracked(run, saved, backend, language)
+                )
+                logger.info(f"Started transcription task for file {saved.upload_index}")
+    except BaseException:
+        # Don't leave saves or transcriptions running if the pipeline is aborted
+        cancel_tasks([*save_tasks, *transcription_tasks.values()])
+        raise
+
+    storage_governor.settle(run_path)
+    # Uploads may be closed from here on; only files on disk are used
+    for index, file_state in run.files.items():
+        if file_state.status == FILE_PENDING:
+            run.update(index, FILE_FAILED, error="Failed to save file")
+    run.saved.set()
 
-    logger.info(f"Saved files: {len(saved_files)}")
     logger.info(f"Output filenames: {output_filenames}")
-    return saved_files, output_filenames, validation_errors
+    run.output_filenames = output_filenames
+    return transcription_tasks, output_filenames, validation_errors
 
 
-def create_zip_response(
-    results: List[str], output_filenames: dict[int, str], run_path: str
-) -> str:
-    """Create a ZIP file with transcription results and return its path."""
-    logger.info(f"Creating ZIP response with {len(results)} results")
-    import zipfile
-
-    zip_path = os.path.join(run_path, "transcriptions.zip")
-
-    with zipfile.ZipFile(zip_path, "w") as zip_file:
-        for index, result in enumerate(results):
-            logger.info(f"Processing result {index}: {type(result)}")
-            if isinstance(result, Exception):
-                # Handle exceptions in results
-                error_message = f"Error transcribing file: {str(result)}\n"
-                output_filename = output_filenames.get(index, f"error_{index}.txt")
-                zip_file.writestr(output_filename, error_message)
+async def process_files(
+    files: List[UploadFile],
+    run_path: str,
+    backend: Union[OpenAI, AsyncOpenAI, TranscriptionBackend],
+    language: str,
+    run: Optional[Run] = None,
+) -> Tuple[dict[int, Union[str, BaseException]], dict[int, str], List[str]]:
+    """
+    Validate, save and transcribe uploaded files as a per-file pipeline.
+    Returns the transcription results and output filenames keyed by upload
+    index, plus validation errors.
+    """
+    if run is None:
+        run = Run(os.path.basename(run_path), run_path, [f.filename for f in files])
+    (
+        transcription_tasks,
+        output_filenames,
+        validation_errors,
+    ) = await start_transcriptions(files, run_path, backend, language, run)
+    try:
+        results = await asyncio.gather(
+            *transcription_tasks.values(), return_exceptions=True
+        )
+    except BaseException:
+        cancel_tasks(transcription_tasks.values())
+        raise
+
+    run.results = dict(zip(transcription_tasks.keys(), results))
+    return run.results, output_filenames, validation_errors
+
+
+def cancel_tasks(tasks: Iterable[asyncio.Task]) -> None:
+    """Cancel every task that is still running."""
+    for task in tasks:
+        task.cancel()
+
+
+def zip_entry(
+    index: int, result: Union[str, BaseException], output_filenames: dict[int, str]
+) -> Tuple[str, bytes]:
+    """Return the ZIP entry name and content for a transcription result."""
+    if isinstance(result, BaseException):
+        # Handle exceptions in results
+        logger.error(f"Transcription task {index} failed: {result}")
+        error_message = f"Error transcribing file: {str(result)}\n"
+        return output_filenames.get(index, f"error_{index}.txt"), error_message.encode()
+
+    # Handle successful transcriptions
+    output_filename = output_filenames.get(index, f"transcription_{index}.txt")
+    logger.info(
+        f"Adding transcription for {output_filename}: {len(result) if result else 0} characters"
+    )
+    return output_filename, (result or "").encode()
+
+
+async def iter_results(
+    tasks: dict[int, asyncio.Task], output_filenames: dict[int, str]
+) -> AsyncIterator[Tuple[str, bytes]]:
+    """Yield ZIP entries for transcription tasks in the order they finish."""
+    pending = {task: index for index, task in tasks.items()}
+    while pending:
+        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            index = pending.pop(task)
+            result: Union[str, BaseException]
+            if task.cancelled():
+                result = asyncio.CancelledError("Transcription was cancelled")
             else:
-                # Handle successful transcriptions
-                output_filename = output_filenames.get(index, f"transcription_{index}.txt")
-                logger.info(f"Adding transcription for {output_filename}: {len(result) if result else 0} characters")
-                zip_file.writestr(output_filename, result or "")
+                result = task.exception() or task.result()
+            yield zip_entry(index, result, output_filenames)
+
+
+async def iter_finished_results(
+    results: dict[int, Union[str, BaseException]], output_filenames: dict[int, str]
+) -> AsyncIterator[Tuple[str, bytes]]:
+    """Yield ZIP entries for results that are already complete."""
+    for index, result in sorted(results.items()):
+        yield zip_entry(index, result, output_filenames)
+
 
-    logger.info(f"ZIP file created at {zip_path}")
-    return zip_path
+def create_zip_response(
+    entries: AsyncIterable[Tuple[str, bytes]],
+    background: Optional[BackgroundTask] = None,
+) -> StreamingResponse:
+    """
+    Create a response that streams a ZIP archive of the given entries,
+    running background, if given, once the response is over.
+    """
+    return StreamingResponse(
+        stream_zip(entries),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="transcriptions.zip"'},
+        background=background,
+    )
+
+
+class _RunStream:
+    """The transcriptions and resources held by a streamed /transcribe response."""
+
+    def __init__(
+        self,
+        tasks: dict[int, asyncio.Task],
+        output_filenames: dict[int, str],
+        backend: TranscriptionBackend,
+        run_path: str,
+    ) -> None:
+        self.tasks = tasks
+        self.output_filenames = output_filenames
+        self.backend = backend
+        self.run_path = run_path
+        self.aborted = False
+        self._released = False
+
+    async def release(self) -> None:
+        """Cancel outstanding transcriptions and give back the backend and run."""
+        if self._released:
+            return
+        self._released = True
+        cancel_tasks(self.tasks.values())
+        await self.backend.aclose()
+        mark_run_inactive(self.run_path)
+
+    async def abort(self) -> None:
+        """Stop all work for a client that has gone away and delete its files."""
+        self.aborted = True
+        pending = [task for task in self.tasks.values() if not task.done()]
+        TRANSCRIPTIONS_CANCELLED.inc(len(pending))
+        logger.info(f"Cancelling {len(pending)} transcriptions for {self.run_path}")
+        await self.release()
+        await asyncio.to_thread(remove_run_dir, self.run_path)
+
+
+async def _stream_run_results(
+    stream: _RunStream, watcher: asyncio.Task
+) -> AsyncIterator[Tuple[str, bytes]]:
+    """Yield a run's ZIP entries, releasing its resources once streaming stops."""
+    try:
+        async for entry in iter_results(stream.tasks, stream.output_filenames):
+            yield entry
+        logger.info(f"Finished streaming results for {stream.run_path}")
+    finally:
+        # Let an abort in progress finish removing the run
+        if not stream.aborted:
+            watcher.cancel()
+        # Stop paying for transcriptions nobody will receive
+        await stream.release()
 
 
 @router.options("/transcribe")
@@ -323,78 +803,58 @@ async def transcribe_options():
 async def handle_transcription(
     request: Request,
     language: str = Form(...),
+    # Annotated, so the default stays None when the handler is called directly
+    backend: Annotated[Optional[str], Form()] = None,
     authorization: Optional[str] = Header(None),
     files: Optional[List[UploadFile]] = None,
-) -> FileResponse:
+) -> StreamingResponse:
     # Handle the case where files is None
     if files is None:
         files = []
 
-    logger.info(f"Received transcription request with {len(files)} files, language: {language}")
-    
+    logger.info(
+        f"Received transcription request with {len(files)} files, language: {language}"
+    )
+
     # Validate request data
-    api_key = validate_request_data(files, language, authorization)
+    backend_name = select_backend(backend)
+    api_key = validate_request_data(
+        files, language, authorization, backend_requires_api_key(backend_name)
+    )
 
     run_id = str(uuid.uuid4())
     run_path = os.path.join(TEMP_DIR, run_id)
+    await reserve_storage(run_path, files)
     os.makedirs(run_path, exist_ok=True)
     logger.info(f"Created run directory: {run_path}")
 
+    # Open the backend, leasing a pooled OpenAI client for this API key if needed
+    transcriber = await acquire_backend(backend_name, api_key, run_path)
+
     # Initialize cleanup flag
     cleanup_needed = True
-
-    # Create OpenAI client
-    client, client_creation_error = create_client(api_key)
-    if client_creation_error:
-        logger.error(f"Invalid OpenAI API Key format: {client_creation_error}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid OpenAI API Key format.",
-        )
-
-    # This should never happen, but mypy needs assurance
-    if client is None:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to create OpenAI client.",
-        )
+    mark_run_active(run_path)
 
     try:
-        # Process files
-        saved_files, output_filenames, validation_errors = await process_files(
-            files or [], run_path
+        # Save every upload; transcriptions start as each save completes
+        tasks, output_filenames, validation_errors = await start_transcriptions(
+            files or [], run_path, transcriber, language
         )
-        
-        logger.info(f"Processed files - saved: {len(saved_files)}, output filenames: {len(output_filenames)}")
-
-        # Create transcription tasks for valid files
-        transcription_tasks = [
-            transcribe_file(client, file_path, language) for file_path in saved_files
-        ]
-        
-        logger.info(f"Created {len(transcription_tasks)} transcription tasks")
-
-        # Process transcriptions
-        results = await asyncio.gather(*transcription_tasks, return_exceptions=True)
-        logger.info(f"Received {len(results)} transcription results")
-        
-        # Log details about results
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"Transcription task {i} failed: {result}")
-            else:
-                logger.info(f"Transcription task {i} succeeded, length: {len(result) if result else 0}")
-
-        # Create zip file with results
-        zip_path = create_zip_response(list(results), output_filenames, run_path)  # type: ignore
+        logger.info(f"Started {len(tasks)} transcription tasks")
 
-        # Set cleanup flag to False so the finally block doesn't delete files before response
+        # The stream now owns the backend and the run directory
+        stream = _RunStream(tasks, output_filenames, transcriber, run_path)
         cleanup_needed = False
 
-        # Return the response
-        logger.info(f"Returning ZIP file: {zip_path}")
-        return FileResponse(
-            path=zip_path, media_type="application/zip", filename="transcriptions.zip"
+        # Cancel everything as soon as the client goes away, even between entries
+        watcher = asyncio.create_task(watch_disconnect(request, stream.abort))
+
+        # Stream the ZIP, adding each transcription as soon as it finishes, and
+        # delete the uploads once the last byte is sent; the scheduled cleanup
+        # is only a safety net
+        return create_zip_response(
+            _stream_run_results(stream, watcher),
+            background=BackgroundTask(remove_run_dir, run_path),
         )
     except (AuthenticationError, APIError, APIConnectionError) as e:
         logger.error(f"OpenAI API error: {e}")
@@ -412,13 +872,13 @@ async def handle_transcription(
             detail=f"Processing failed: {str(e)}",
         ) from e
     finally:
-        # Clean up files if an error occurred before sending response
+        # Clean up files if an error occurred before the response started
         if cleanup_needed:
+            await transcriber.aclose()
+            mark_run_inactive(run_path)
             try:
                 # Clean up the run directory
-                import shutil
-
-                shutil.rmtree(run_path, ignore_errors=True)
+                await asyncio.to_thread(remove_run_dir, run_path)
                 logger.info(f"Cleaned up directory after error: {run_path}")
             except Exception as e:
-                logger.error(f"Failed to clean up directory {run_path}: {e}")
\ No newline at end of file
+                logger.error(f"Failed to clean up directory {run_path}: {e}")
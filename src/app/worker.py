@@ -0,0 +1,333 @@
+"""
+Run queued transcription jobs in worker processes, separate from the web tier.
+
+Each process claims jobs from the SQLite job queue (JOB_QUEUE_PATH) by leasing
+them, fetches their uploads from the artifact store (ARTIFACT_STORE),
+transcribes them through the same pipeline as the web tier and stores each
+transcript back in the artifact store, from which the web tier serves the
+results. Start the web tier with JOB_QUEUE=true so /jobs
+enqueues work instead of running it.
+
+Usage:
+    python -m src.app.worker [--processes 2] [--concurrency 4]
+"""
+
+import argparse
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import time
+from typing import Any, Dict, List, Optional, Set
+
+from src.app.artifacts import artifact_store, result_key
+from src.app.backends import (
+    load_backends,
+    open_backend,
+    shutdown_backends,
+    start_backends,
+)
+from src.app.cache import transcript_cache
+from src.app.clients import client_pool, close_http_client
+from src.app.config import (
+    QUEUE_POLL_INTERVAL,
+    QUEUE_VISIBILITY_TIMEOUT,
+    WORKER_CONCURRENCY,
+    WORKER_PROCESSES,
+)
+from src.app.jobqueue import JobQueue, QueuedJob, job_queue
+from src.app.modelpool import fork_available
+from src.app.runs import FILE_DONE, FILE_FAILED, FILE_SAVED, FILE_TRANSCRIBING
+from src.app.tasks import MAX_AGE_SECONDS
+from src.app.transcription import transcribe_file
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# How often each worker deletes finished jobs older than MAX_AGE_SECONDS
+PRUNE_INTERVAL = 60.0  # seconds
+
+
+def _remove_uploads(job: QueuedJob) -> None:
+    """Delete a finished job's audio and chunks; only its transcripts are served."""
+    for file in job.files:
+        if "path" not in file:
+            continue
+        artifact_store.delete(file["key"])
+        shutil.rmtree(f"{file['path']}.chunks", ignore_errors=True)
+
+
+class _Lease:
+    """Keeps a job's lease alive, cancelling the job's task if it is lost."""
+
+    def __init__(
+        self, queue: JobQueue, job: QueuedJob, owner: str, visibility_timeout: float
+    ) -> None:
+        self.queue = queue
+        self.job = job
+        self.owner = owner
+        self.visibility_timeout = visibility_timeout
+        self.lost = False
+        self._task = asyncio.current_task()
+        self._keeper = asyncio.create_task(self._keep())
+
+    async def _keep(self) -> None:
+        while True:
+            await asyncio.sleep(self.visibility_timeout / 3)
+            extended = await asyncio.to_thread(
+                self.queue.extend, self.job.id, self.owner, self.visibility_timeout
+            )
+            if not extended:
+                logger.warning(f"Lost the lease on job {self.job.id}; abandoning it")
+                self.lost = True
+                if self._task is not None:
+                    self._task.cancel()
+                return
+
+    def stop(self) -> None:
+        self._keeper.cancel()
+
+
+class _Progress:
+    """
+    Records a job's per-file state in the queue off the event loop. Writes
+    run one at a time, each of the latest state, so an older snapshot never
+    lands last.
+    """
+
+    def __init__(
+        self, queue: JobQueue, job_id: str, owner: str, files: List[Dict[str, Any]]
+    ) -> None:
+        self.queue = queue
+        self.job_id = job_id
+        self.owner = owner
+        self.files = files
+        self._lock = asyncio.Lock()
+
+    async def save(self) -> None:
+        async with self._lock:
+            snapshot = [dict(file) for file in self.files]
+            await asyncio.to_thread(
+                self.queue.update_files, self.job_id, self.owner, snapshot
+            )
+
+
+async def process_job(
+    queue: JobQueue,
+    job: QueuedJob,
+    owner: str,
+    visibility_timeout: float = QUEUE_VISIBILITY_TIMEOUT,
+) -> None:
+    """
+    Transcribe a claimed job's files, recording progress in the queue. Files a
+    previous attempt already finished are not transcribed again. If the worker
+    is shutting down, the job is returned to the queue for another worker.
+    """
+    lease = _Lease(queue, job, owner, visibility_timeout)
+    files: List[Dict[str, Any]] = job.files
+    try:
+        backend = await open_backend(job.backend, job.api_key)
+    except Exception as e:
+        lease.stop()
+        logger.error(f"Job {job.id} failed: {e}")
+        await asyncio.to_thread(
+            queue.finish, job.id, owner, files, f"Processing failed: {str(e)}"
+        )
+        return
+
+    progress = _Progress(queue, job.id, owner, files)
+
+    async def transcribe_one(file: Dict[str, Any]) -> None:
+        output_key = result_key(job.id, file["index"])
+        if file["status"] == FILE_DONE and await asyncio.to_thread(
+            artifact_store.exists, output_key
+        ):
+            return
+        file["status"] = FILE_TRANSCRIBING
+        await progress.save()
+        try:
+            path = await asyncio.to_thread(
+                artifact_store.download, file["key"], file["path"]
+            )
+            text = await transcribe_file(backend, path, job.language, file["sha256"])
+            await asyncio.to_thread(artifact_store.put, output_key, text.encode())
+            file["status"] = FILE_DONE
+        except Exception as e:
+            logger.error(f"Transcription of {file['path']} in job {job.id} failed: {e}")
+            file["status"] = FILE_FAILED
+            file["error"] = str(e)
+        await progress.save()
+
+    try:
+        await asyncio.gather(
+            *(
+                transcribe_one(file)
+                for file in files
+                if file["status"] in (FILE_SAVED, FILE_TRANSCRIBING, FILE_DONE)
+            )
+        )
+        await asyncio.to_thread(queue.finish, job.id, owner, files)
+        logger.info(f"Job {job.id} finished")
+        await asyncio.to_thread(_remove_uploads, job)
+    except asyncio.CancelledError:
+        if lease.lost:
+            return
+        await asyncio.to_thread(queue.release, job.id, owner)
+        logger.info(f"Returned job {job.id} to the queue")
+        raise
+    except Exception as e:
+        logger.error(f"Job {job.id} failed: {e}")
+        await asyncio.to_thread(
+            queue.finish, job.id, owner, files, f"Processing failed: {str(e)}"
+        )
+    finally:
+        lease.stop()
+        await backend.aclose()
+        if artifact_store.on_local_disk:
+            try:
+                # Results are kept for MAX_AGE_SECONDS from now
+                os.utime(job.run_path)
+            except OSError:
+                pass
+        else:
+            # Only copies fetched from the store are on this disk
+            await asyncio.to_thread(shutil.rmtree, job.run_path, True)
+
+
+async def run_worker(
+    queue: JobQueue,
+    owner: str,
+    stop: asyncio.Event,
+    concurrency: int = WORKER_CONCURRENCY,
+    poll_interval: float = QUEUE_POLL_INTERVAL,
+    visibility_timeout: float = QUEUE_VISIBILITY_TIMEOUT,
+) -> None:
+    """Claim and run up to `concurrency` jobs at a time until stop is set."""
+    running: Set[asyncio.Task] = set()
+    last_prune = 0.0
+    logger.info(f"Worker {owner} started")
+    try:
+        while not stop.is_set():
+            if time.monotonic() - last_prune > PRUNE_INTERVAL:
+                await asyncio.to_thread(queue.prune, MAX_AGE_SECONDS)
+                last_prune = time.monotonic()
+
+            job = (
+                await asyncio.to_thread(queue.claim, owner, visibility_timeout)
+                if len(running) < concurrency
+                else None
+            )
+            if job is not None:
+                task = asyncio.create_task(
+                    process_job(queue, job, owner, visibility_timeout)
+                )
+                running.add(task)
+                task.add_done_callback(running.discard)
+                continue
+
+            try:
+                await asyncio.wait_for(stop.wait(), poll_interval)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        # Jobs still running go back to the queue
+        for task in running:
+            task.cancel()
+        await asyncio.gather(*running, return_exceptions=True)
+        logger.info(f"Worker {owner} stopped")
+
+
+async def _serve(concurrency: int) -> None:
+    """Run one worker until SIGTERM or SIGINT, then release its resources."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, stop.set)
+
+    owner = f"{socket.gethostname()}:{os.getpid()}"
+    try:
+        await run_worker(job_queue, owner, stop, concurrency)
+    finally:
+        shutdown_backends()
+        await client_pool.close()
+        await close_http_client()
+        transcript_cache.close()
+        job_queue.close()
+
+
+def worker_main(concurrency: int) -> None:
+    """Entry point of a worker process."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(process)d - %(name)s - %(levelname)s - %(message)s",
+    )
+    # Model workers are forked before the event loop starts any threads
+    start_backends()
+    asyncio.run(_serve(concurrency))
+
+
+def _worker_context() -> Any:
+    """
+    Return the multiprocessing context to start worker processes with. Where
+    fork is available the local model is loaded first, so the workers inherit
+    it and share one copy of the weights instead of each loading their own.
+    """
+    if not fork_available():
+        return multiprocessing.get_context()
+    load_backends()
+    return multiprocessing.get_context("fork")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--processes", type=int, default=WORKER_PROCESSES)
+    parser.add_argument(
+        "--concurrency", type=int, default=WORKER_CONCURRENCY, help="jobs per process"
+    )
+    args = parser.parse_args(argv)
+
+    if args.processes <= 1:
+        worker_main(args.concurrency)
+        return
+
+    stopping = False
+
+    def request_stop(signum: int, frame: Any) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, request_stop)
+    signal.signal(signal.SIGINT, request_stop)
+
+    context = _worker_context()
+
+    def spawn() -> multiprocessing.process.BaseProcess:
+        process: multiprocessing.process.BaseProcess = context.Process(
+            target=worker_main, args=(args.concurrency,)
+        )
+        process.start()
+        return process
+
+    processes = [spawn() for _ in range(args.processes)]
+    # Replace workers that die, until asked to stop
+    while not stopping:
+        for slot, process in enumerate(processes):
+            if not process.is_alive():
+                logger.warning(
+                    f"Worker {process.pid} exited with {process.exitcode}; restarting"
+                )
+                processes[slot] = spawn()
+        time.sleep(1.0)
+
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
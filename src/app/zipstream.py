@@ -0,0 +1,71 @@
+import time
+import zipfile
+from typing import AsyncIterable, AsyncIterator, List, Tuple
+
+from src.app.metrics import BYTES_OUT, ZIP_SECONDS
+
+# Entries at least this large are written with ZIP64 local headers
+ZIP64_ENTRY_THRESHOLD = zipfile.ZIP64_LIMIT
+
+
+class _ChunkSink:
+    """
+    A write-only, unseekable buffer for zipfile to write into.
+    Because it can't seek back to patch local headers, zipfile writes a data
+    descriptor after each entry instead, so bytes can be sent as soon as
+    they are written.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        """Return and clear everything written since the last drain."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ZipStream:
+    """Builds a ZIP archive incrementally, returning its bytes entry by entry."""
+
+    def __init__(self, compression: int = zipfile.ZIP_DEFLATED) -> None:
+        self._sink = _ChunkSink()
+        self._compression = compression
+        # allowZip64 switches to ZIP64 records when offsets or entry counts overflow
+        self._zip = zipfile.ZipFile(self._sink, "w", allowZip64=True)  # type: ignore[call-overload]
+
+    def add(self, name: str, data: bytes) -> bytes:
+        """Add an entry and return the archive bytes it produced."""
+        info = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        info.compress_type = self._compression
+        force_zip64 = len(data) >= ZIP64_ENTRY_THRESHOLD
+        with self._zip.open(info, "w", force_zip64=force_zip64) as entry:
+            entry.write(data)
+        return self._sink.drain()
+
+    def close(self) -> bytes:
+        """Finish the archive and return the central directory bytes."""
+        self._zip.close()
+        return self._sink.drain()
+
+
+async def stream_zip(entries: AsyncIterable[Tuple[str, bytes]]) -> AsyncIterator[bytes]:
+    """Yield a ZIP archive in pieces as (name, data) entries become available."""
+    archive = ZipStream()
+    async for name, data in entries:
+        with ZIP_SECONDS.time():
+            chunk = archive.add(name, data)
+        BYTES_OUT.inc(len(chunk))
+        yield chunk
+    with ZIP_SECONDS.time():
+        chunk = archive.close()
+    BYTES_OUT.inc(len(chunk))
+    yield chunk
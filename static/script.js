@@ -7,12 +7,14 @@ document.getElementById('transcription-form').addEventListener('submit', async f
     const submitBtn = document.getElementById('submit-btn');
     const progressContainer = document.getElementById('progress-container');
     const progressBar = document.getElementById('progress-bar');
+    const transcriptsDiv = document.getElementById('transcripts');
     const apiKey = document.getElementById('api-key').value;
 
     // Reset UI elements
     statusDiv.textContent = '';
     progressContainer.style.display = 'none';
     progressBar.style.width = '0%';
+    transcriptsDiv.replaceChildren();
     
     // Validate API key
     if (!apiKey.startsWith('sk-')) {
@@ -48,22 +50,22 @@ document.getElementById('transcription-form').addEventListener('submit', async f
         formData.append('files', file);
     }
 
-    statusDiv.textContent = 'Uploading and processing... This may take a moment.';
+    statusDiv.textContent = 'Uploading files...';
     statusDiv.style.color = 'blue';
     submitBtn.disabled = true;
     
-    // Display and animate the progress bar
+    // Display the progress bar; it advances as files finish transcribing
     progressContainer.style.display = 'block';
-    progressBar.style.width = '50%'; // Initial animation to show activity
+    progressBar.style.width = '5%';
 
-    // Timeout implementation (3 minutes)
+    // Timeout implementation (3 minutes) for the upload itself
     const controller = new AbortController();
     const timeoutId = setTimeout(() => {
         controller.abort();
     }, 180000); // 3 minutes
 
     try {
-        const response = await fetch('/transcribe', {
+        const response = await fetch('/jobs', {
             method: 'POST',
             body: formData,
             headers: {
@@ -72,36 +74,45 @@ document.getElementById('transcription-form').addEventListener('submit', async f
             signal: controller.signal // Associate the AbortController with the request
         });
 
-        // Clear the timeout if the request completes in time
+        // Clear the timeout once the upload has been accepted
         clearTimeout(timeoutId);
 
-        progressBar.style.width = '100%';
-
-        if (response.ok) {
-            const blob = await response.blob();
-            const url = window.URL.createObjectURL(blob);
-            const a = document.createElement('a');
-            a.style.display = 'none';
-            a.href = url;
-            a.download = 'transcriptions.zip';
-            document.body.appendChild(a);
-            a.click();
-            window.URL.revokeObjectURL(url);
-            
-            statusDiv.textContent = 'Success! Your download has started.';
-            statusDiv.style.color = 'green';
-        } else {
+        if (!response.ok) {
             const error = await response.json();
-            statusDiv.textContent = `Error: ${error.detail || 'An unknown error occurred.'}`;
-            statusDiv.style.color = 'red';
-            progressContainer.style.display = 'none';
+            throw new Error(error.detail || 'An unknown error occurred.');
         }
+
+        const job = await response.json();
+        statusDiv.textContent = 'Transcribing...';
+        await followJob(job, files.length, statusDiv, progressBar, transcriptsDiv);
+
+        const result = await fetch(job.result_url);
+        if (!result.ok) {
+            const error = await result.json();
+            throw new Error(error.detail || 'An unknown error occurred.');
+        }
+
+        progressBar.style.width = '100%';
+        const blob = await result.blob();
+        const url = window.URL.createObjectURL(blob);
+        const a = document.createElement('a');
+        a.style.display = 'none';
+        a.href = url;
+        a.download = 'transcriptions.zip';
+        document.body.appendChild(a);
+        a.click();
+        window.URL.revokeObjectURL(url);
+        
+        statusDiv.textContent = 'Success! Your download has started.';
+        statusDiv.style.color = 'green';
     } catch (error) {
         if (error.name === 'AbortError') {
-            statusDiv.textContent = 'Error: The request timed out after 3 minutes. Please try again with smaller files.';
-        } else {
+            statusDiv.textContent = 'Error: The upload timed out after 3 minutes. Please try again with smaller files.';
+        } else if (error instanceof TypeError) {
             statusDiv.textContent = 'A network error occurred. Please try again.';
             console.error('Network error:', error);
+        } else {
+            statusDiv.textContent = `Error: ${error.message}`;
         }
         statusDiv.style.color = 'red';
         progressContainer.style.display = 'none';
@@ -109,3 +120,113 @@ document.getElementById('transcription-form').addEventListener('submit', async f
         submitBtn.disabled = false;
     }
 });
+
+
+// How far along a file is in each state, for the progress bar
+const FILE_PROGRESS = {
+    saved: 0.1,
+    chunked: 0.2,
+    transcribing: 0.2,
+    done: 1,
+    failed: 1,
+};
+
+// Shows overall progress from the states of the job's files
+function showProgress(states, fileCount, statusDiv, progressBar) {
+    const progress = states.reduce((sum, state) => sum + (FILE_PROGRESS[state] || 0), 0);
+    const finished = states.filter(state => state === 'done' || state === 'failed').length;
+    const percent = Math.max(5, Math.round((progress / fileCount) * 100));
+    progressBar.style.width = `${percent}%`;
+    statusDiv.textContent = `Transcribed ${finished} of ${fileCount} files...`;
+}
+
+// Adds a finished file's transcript, or its error, to the page
+function showTranscript(transcriptsDiv, job, file) {
+    const item = document.createElement('div');
+    item.className = 'transcript';
+    const title = document.createElement('h3');
+    if (file.error) {
+        title.textContent = file.output_filename || file.filename;
+    } else {
+        // Each transcript can be downloaded on its own before the batch finishes
+        const link = document.createElement('a');
+        link.href = `/jobs/${job.job_id}/files/${encodeURIComponent(file.output_filename)}`;
+        link.download = file.output_filename;
+        link.textContent = file.output_filename;
+        title.appendChild(link);
+    }
+    const body = document.createElement('p');
+    if (file.error) {
+        body.className = 'transcript-error';
+        body.textContent = `Failed: ${file.error}`;
+    } else {
+        body.textContent = file.text;
+    }
+    item.append(title, body);
+    transcriptsDiv.appendChild(item);
+}
+
+// Follows a job's progress events, showing each transcript as soon as it is ready.
+// Falls back to polling the job status if the event stream is unavailable.
+function followJob(job, fileCount, statusDiv, progressBar, transcriptsDiv) {
+    if (!window.EventSource || !job.events_url) {
+        return waitForJob(job.status_url, fileCount, statusDiv, progressBar);
+    }
+
+    return new Promise((resolve, reject) => {
+        const source = new EventSource(job.events_url);
+        const states = [];
+
+        const onFileEvent = event => {
+            const file = JSON.parse(event.data);
+            states[file.index] = event.type;
+            showProgress(states, fileCount, statusDiv, progressBar);
+            if (event.type === 'done' || event.type === 'failed') {
+                showTranscript(transcriptsDiv, job, file);
+            }
+        };
+        for (const type of Object.keys(FILE_PROGRESS)) {
+            source.addEventListener(type, onFileEvent);
+        }
+
+        source.addEventListener('finished', event => {
+            source.close();
+            const result = JSON.parse(event.data);
+            if (result.status === 'done') {
+                resolve(result);
+            } else {
+                reject(new Error(result.error || 'The transcription job failed.'));
+            }
+        });
+
+        // The browser reconnects by itself after a dropped connection; poll
+        // instead only once it has given up
+        source.onerror = () => {
+            if (source.readyState === EventSource.CLOSED) {
+                waitForJob(job.status_url, fileCount, statusDiv, progressBar).then(resolve, reject);
+            }
+        };
+    });
+}
+
+
+// Polls a transcription job until it finishes, updating the progress bar per file
+async function waitForJob(statusUrl, fileCount, statusDiv, progressBar) {
+    while (true) {
+        const response = await fetch(statusUrl);
+        const job = await response.json();
+        if (!response.ok) {
+            throw new Error(job.detail || 'An unknown error occurred.');
+        }
+
+        showProgress(job.files.map(f => f.status), fileCount, statusDiv, progressBar);
+
+        if (job.status === 'done') {
+            return job;
+        }
+        if (job.status === 'failed') {
+            throw new Error(job.error || 'The transcription job failed.');
+        }
+        await new Promise(resolve => setTimeout(resolve, 2000));
+    }
+}
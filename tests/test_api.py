@@ -1,6 +1,8 @@
+import io
 import os
 import sys
-from unittest.mock import patch
+import zipfile
+from unittest.mock import AsyncMock, Mock, patch
 
 from fastapi import FastAPI
 from fastapi.testclient import TestClient
@@ -9,6 +11,7 @@ from fastapi.testclient import TestClient
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from api.index import app
+from src.app.transcription import limiter
 
 
 class TestAPI:
@@ -67,3 +70,35 @@ class TestAPI:
         # We're just checking that the endpoint exists and routes correctly
         # The actual implementation will have its own tests
         assert response.status_code in [200, 400, 401, 422, 500]
+
+    def test_transcribe_removes_run_after_response(self, tmp_path):
+        """Test that the run directory is deleted as soon as the ZIP has been sent."""
+        mock_openai = Mock()
+        mock_openai.audio.transcriptions.create.return_value = Mock(text="hello")
+        limiter.enabled = False
+        try:
+            with (
+                patch("api.index.start_scheduler"),
+                patch("api.index.shutdown_scheduler"),
+                patch(
+                    "src.app.backends.client_pool.acquire",
+                    AsyncMock(return_value=mock_openai),
+                ),
+                patch("src.app.backends.client_pool.release", AsyncMock()),
+                patch("src.app.transcription.transcript_cache") as mock_cache,
+                patch("src.app.transcription.TEMP_DIR", str(tmp_path)),
+            ):
+                mock_cache.get.return_value = None
+                with TestClient(app) as client:
+                    response = client.post(
+                        "/transcribe",
+                        data={"language": "en"},
+                        headers={"Authorization": "Bearer sk-test"},
+                        files=[("files", ("a.mp3", b"\xff\xfb" * 100, "audio/mpeg"))],
+                    )
+        finally:
+            limiter.enabled = True
+
+        assert response.status_code == 200
+        assert zipfile.ZipFile(io.BytesIO(response.content)).read("a.txt") == b"hello"
+        assert os.listdir(tmp_path) == []
@@ -0,0 +1,131 @@
+import os
+from unittest.mock import patch
+
+import pytest
+
+from src.app.artifacts import (
+    ArtifactNotFoundError,
+    ArtifactStoreUnavailableError,
+    LocalArtifactStore,
+    S3ArtifactStore,
+    open_artifact_store,
+    result_key,
+)
+
+MB = 1024 * 1024
+
+
+@pytest.fixture
+def s3_store(monkeypatch):
+    """An S3 store against moto's in-process stand-in, uploading in 5 MB parts."""
+    moto = pytest.importorskip("moto")
+    import boto3
+
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+        monkeypatch.setenv(name, "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    with moto.mock_aws():
+        client = boto3.client("s3")
+        client.create_bucket(Bucket="runs")
+        yield S3ArtifactStore(
+            bucket="runs",
+            prefix="transcriber/",
+            multipart_threshold=5 * MB,
+            multipart_chunksize=5 * MB,
+            client=client,
+        )
+
+
+class TestArtifacts:
+    """Test cases for the artifact stores."""
+
+    def test_local_store_round_trip(self, tmp_path):
+        """Test that the local store keeps artifacts in run directories under its root."""
+        store = LocalArtifactStore(str(tmp_path))
+        key = result_key("run-1", 0)
+        store.put(key, b"hello")
+
+        assert (tmp_path / "run-1" / "results" / "0.txt").read_bytes() == b"hello"
+        assert store.get(key) == b"hello"
+        assert store.download(key, "/elsewhere") == str(
+            tmp_path / "run-1" / "results" / "0.txt"
+        )
+        assert list(store.list_runs()) == ["run-1"]
+
+        store.delete_run("run-1")
+        assert not store.exists(key)
+        with pytest.raises(ArtifactNotFoundError):
+            store.get(key)
+
+    def test_local_store_uploads_in_place(self, tmp_path):
+        """Test that files already saved at their key are not copied, and others are."""
+        store = LocalArtifactStore(str(tmp_path / "runs"))
+        saved = tmp_path / "runs" / "run-1" / "a.mp3"
+        saved.parent.mkdir(parents=True)
+        saved.write_bytes(b"audio")
+        elsewhere = tmp_path / "b.mp3"
+        elsewhere.write_bytes(b"other")
+
+        with patch("src.app.artifacts.shutil.copyfile") as mock_copy:
+            store.upload("run-1/a.mp3", str(saved))
+        mock_copy.assert_not_called()
+        store.upload("run-1/b.mp3", str(elsewhere))
+
+        assert store.get("run-1/b.mp3") == b"other"
+
+    def test_local_store_rejects_keys_outside_root(self, tmp_path):
+        """Test that a key can't reach files outside the store."""
+        store = LocalArtifactStore(str(tmp_path / "runs"))
+
+        with pytest.raises(ValueError):
+            store.put("../escaped", b"data")
+
+    def test_open_unknown_store(self):
+        """Test that an unknown store name is rejected."""
+        with pytest.raises(ArtifactStoreUnavailableError):
+            open_artifact_store("floppy")
+
+    def test_s3_store_requires_bucket(self):
+        """Test that the S3 store can't be created without a bucket."""
+        with pytest.raises(ArtifactStoreUnavailableError):
+            S3ArtifactStore(bucket="", client=object())
+
+    def test_s3_store_round_trip(self, s3_store, tmp_path):
+        """Test that the S3 store reads back what it stored and reports missing artifacts."""
+        key = result_key("run-1", 0)
+        s3_store.put(key, b"hello")
+
+        assert s3_store.exists(key)
+        assert s3_store.get(key) == b"hello"
+        path = s3_store.download(key, str(tmp_path / "run-1" / "0.txt"))
+        assert open(path, "rb").read() == b"hello"
+
+        s3_store.delete(key)
+        assert not s3_store.exists(key)
+        with pytest.raises(ArtifactNotFoundError):
+            s3_store.get(key)
+        with pytest.raises(ArtifactNotFoundError):
+            s3_store.download(key, str(tmp_path / "missing.txt"))
+
+    def test_s3_store_uploads_large_files_in_parts(self, s3_store, tmp_path):
+        """Test that files over the multipart threshold are uploaded in parts."""
+        upload = tmp_path / "a.mp3"
+        upload.write_bytes(os.urandom(11 * MB))
+
+        s3_store.upload("run-1/a.mp3", str(upload))
+
+        head = s3_store.client.head_object(Bucket="runs", Key="transcriber/run-1/a.mp3")
+        # Multipart uploads get an ETag ending in the number of parts
+        assert head["ETag"].strip('"').endswith("-3")
+        assert s3_store.get("run-1/a.mp3") == upload.read_bytes()
+
+    def test_s3_store_lists_and_deletes_runs(self, s3_store):
+        """Test that runs are listed by prefix and deleted with all their artifacts."""
+        s3_store.put("run-1/a.mp3", b"audio")
+        s3_store.put(result_key("run-1", 0), b"hello")
+        s3_store.put("run-2/b.mp3", b"audio")
+
+        assert sorted(s3_store.list_runs()) == ["run-1", "run-2"]
+
+        s3_store.delete_run("run-1")
+        assert list(s3_store.list_runs()) == ["run-2"]
@@ -0,0 +1,199 @@
+import asyncio
+import io
+import zipfile
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.index import app
+from src.app import backends
+from src.app.backends import (
+    BackendUnavailableError,
+    LocalWhisperBackend,
+    MockBackend,
+    OpenAIBackend,
+    as_backend,
+    resolve_backend_name,
+)
+from src.app.transcription import limiter, transcribe_file
+
+
+@pytest.fixture
+def client():
+    """Test client with rate limiting and the scheduler disabled and no transcript cache."""
+    limiter.enabled = False
+    with (
+        patch("api.index.start_scheduler"),
+        patch("api.index.shutdown_scheduler"),
+        patch("src.app.transcription.transcript_cache") as mock_cache,
+    ):
+        mock_cache.get.return_value = None
+        with TestClient(app) as test_client:
+            yield test_client
+    limiter.enabled = True
+
+
+class FakeWhisperModel:
+    """Stands in for faster_whisper.WhisperModel, recording how it was built."""
+
+    instances = []
+
+    def __init__(self, model_size, **kwargs):
+        self.model_size = model_size
+        self.kwargs = kwargs
+        FakeWhisperModel.instances.append(self)
+
+    def transcribe(self, file_path, language):
+        segments = (Mock(text=f" {language} "), Mock(text=" segment "))
+        return iter(segments), Mock()
+
+
+class TestBackends:
+    """Test cases for the transcription backends."""
+
+    def test_resolve_backend_name(self):
+        """Test that requests default to the deployment's backend and are checked."""
+        assert resolve_backend_name(None) == "openai"
+        # Only the default is enabled unless ALLOWED_BACKENDS says otherwise
+        with pytest.raises(BackendUnavailableError):
+            resolve_backend_name("local")
+        with patch("src.app.backends.ALLOWED_BACKENDS", ["openai", "local"]):
+            assert resolve_backend_name(" Local ") == "local"
+        with pytest.raises(BackendUnavailableError):
+            resolve_backend_name("nope")
+        # Known but not enabled
+        with pytest.raises(BackendUnavailableError):
+            resolve_backend_name("mock")
+
+    def test_as_backend_wraps_clients(self):
+        """Test that bare OpenAI clients are wrapped and backends passed through."""
+        mock_backend = MockBackend()
+        assert as_backend(mock_backend) is mock_backend
+        wrapped = as_backend(Mock())
+        assert isinstance(wrapped, OpenAIBackend)
+        assert wrapped.model == "whisper-1"
+
+    @pytest.mark.asyncio
+    async def test_openai_backend_releases_pooled_client_once(self):
+        """Test that closing an OpenAI backend returns its client to the pool once."""
+        mock_release = AsyncMock()
+        with patch("src.app.backends.client_pool.release", mock_release):
+            backend = OpenAIBackend(Mock(), pooled=True)
+            await backend.aclose()
+            await backend.aclose()
+            await OpenAIBackend(Mock()).aclose()
+        mock_release.assert_awaited_once_with(backend.client)
+
+    @pytest.mark.asyncio
+    async def test_transcribe_file_caches_by_backend_model(self, tmp_path):
+        """Test that any backend runs through transcribe_file, keyed by its model."""
+        file_path = tmp_path / "audio.mp3"
+        file_path.write_bytes(b"\xff\xfb" * 10)
+        with patch("src.app.transcription.transcript_cache") as mock_cache:
+            mock_cache.get.return_value = None
+            result = await transcribe_file(
+                MockBackend(text="mocked"), str(file_path), "en", "abc"
+            )
+
+        assert result == "mocked"
+        mock_cache.get.assert_called_once_with("abc", "en", "mock")
+        mock_cache.put.assert_called_once_with("abc", "en", "mock", "mocked")
+
+    def test_local_backend_requires_faster_whisper(self):
+        """Test that the local backend is unavailable without faster-whisper."""
+        with patch.object(backends, "WhisperModel", None):
+            with pytest.raises(BackendUnavailableError):
+                LocalWhisperBackend()
+
+    @pytest.mark.asyncio
+    async def test_local_backend_loads_int8_model_once(self, tmp_path):
+        """Test that the local backend loads one quantized CPU model and joins segments."""
+        file_path = tmp_path / "audio.mp3"
+        file_path.write_bytes(b"\xff\xfb" * 10)
+        FakeWhisperModel.instances = []
+        with patch.object(backends, "WhisperModel", FakeWhisperModel):
+            backend = LocalWhisperBackend(
+                model_size="tiny", workers=3, processes=False, batch_size=1
+            )
+            first = await backend.transcribe(str(file_path), "en")
+            second = await backend.transcribe(str(file_path), "pt")
+
+        assert (first, second) == ("en segment", "pt segment")
+        assert backend.model == "faster-whisper-tiny-int8"
+        assert backend.limiter.window == 3
+        assert len(FakeWhisperModel.instances) == 1
+        assert FakeWhisperModel.instances[0].kwargs["device"] == "cpu"
+        assert FakeWhisperModel.instances[0].kwargs["compute_type"] == "int8"
+
+    @pytest.mark.asyncio
+    async def test_local_backend_batches_concurrent_files(self):
+        """Test that files sent to the local backend together share one batch."""
+        batches = []
+
+        def fake_transcribe_batch(engine, items):
+            batches.append(items)
+            return [f"{path} in {language}" for path, language in items]
+
+        with (
+            patch.object(backends, "WhisperModel", FakeWhisperModel),
+            patch(
+                "src.app.backends.transcribe_batch", side_effect=fake_transcribe_batch
+            ),
+        ):
+            backend = LocalWhisperBackend(
+                workers=2, processes=False, batch_size=4, batch_wait_ms=50
+            )
+            results = await asyncio.gather(
+                *(backend.transcribe(f"{i}.mp3", "en") for i in range(5))
+            )
+
+        assert results == [f"{i}.mp3 in en" for i in range(5)]
+        assert [len(items) for items in batches] == [4, 1]
+        assert backend.limiter.window == 8
+
+    def test_transcribe_with_requested_backend(self, client):
+        """Test that a request can pick an enabled backend that needs no API key."""
+        with (
+            patch("src.app.backends.ALLOWED_BACKENDS", ["openai", "mock"]),
+            patch.dict(
+                "src.app.backends._shared_backends",
+                {"mock": MockBackend(text="mocked")},
+            ),
+        ):
+            response = client.post(
+                "/transcribe",
+                data={"language": "en", "backend": "mock"},
+                files=[("files", ("a.mp3", b"\xff\xfb" * 100, "audio/mpeg"))],
+            )
+
+        assert response.status_code == 200
+        with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+            assert archive.read("a.txt") == b"mocked"
+
+    def test_transcribe_rejects_unknown_backend(self, client):
+        """Test that unknown backends are rejected before anything is saved."""
+        response = client.post(
+            "/transcribe",
+            data={"language": "en", "backend": "nope"},
+            headers={"Authorization": "Bearer sk-test"},
+            files=[("files", ("a.mp3", b"\xff\xfb" * 100, "audio/mpeg"))],
+        )
+
+        assert response.status_code == 400
+        assert "nope" in response.json()["detail"]
+
+    def test_health_reports_started_backends(self, client):
+        """Test that /health reports each started backend and fails if one is unhealthy."""
+        local = Mock(spec=LocalWhisperBackend)
+        local.health = AsyncMock(return_value={"status": "unhealthy"})
+        with patch.dict("src.app.backends._shared_backends", {"mock": MockBackend()}):
+            assert client.get("/health").json() == {
+                "status": "ok",
+                "backends": {"mock": {"status": "ok"}},
+            }
+            with patch.dict("src.app.backends._shared_backends", {"local": local}):
+                response = client.get("/health")
+
+        assert response.status_code == 503
+        assert response.json()["backends"]["local"] == {"status": "unhealthy"}
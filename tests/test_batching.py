@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from src.app.batching import MicroBatcher
+
+
+class TestMicroBatcher:
+    """Test cases for the micro-batcher."""
+
+    @pytest.mark.asyncio
+    async def test_full_batches_run_without_waiting(self):
+        """Test that a batch starts as soon as max_batch_size items are waiting."""
+        batches = []
+
+        async def run_batch(items):
+            batches.append(items)
+            return [item * 10 for item in items]
+
+        batcher = MicroBatcher(run_batch, max_batch_size=3, max_wait=60)
+        results = await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(i) for i in range(6))), timeout=1
+        )
+
+        assert results == [0, 10, 20, 30, 40, 50]
+        assert batches == [[0, 1, 2], [3, 4, 5]]
+
+    @pytest.mark.asyncio
+    async def test_partial_batch_runs_after_max_wait(self):
+        """Test that a partial batch is flushed once the oldest item has waited max_wait."""
+        batches = []
+
+        async def run_batch(items):
+            batches.append(items)
+            return items
+
+        batcher = MicroBatcher(run_batch, max_batch_size=8, max_wait=0.01)
+        first = asyncio.create_task(batcher.submit("a"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(batcher.submit("b"))
+
+        assert await asyncio.wait_for(asyncio.gather(first, second), timeout=1) == [
+            "a",
+            "b",
+        ]
+        assert batches == [["a", "b"]]
+
+    @pytest.mark.asyncio
+    async def test_errors_fail_their_items(self):
+        """Test that per-item errors fail one caller and batch errors fail all."""
+
+        async def run_batch(items):
+            if "all" in items:
+                raise RuntimeError("engine failed")
+            return [ValueError(item) if item == "bad" else item for item in items]
+
+        batcher = MicroBatcher(run_batch, max_batch_size=2, max_wait=0.01)
+        results = await asyncio.gather(
+            batcher.submit("good"), batcher.submit("bad"), return_exceptions=True
+        )
+        assert results[0] == "good"
+        assert isinstance(results[1], ValueError)
+
+        results = await asyncio.gather(
+            batcher.submit("all"), batcher.submit("other"), return_exceptions=True
+        )
+        assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+
+    @pytest.mark.asyncio
+    async def test_cancelled_callers_are_left_out(self):
+        """Test that callers cancelled while waiting are not sent to the engine."""
+        batches = []
+
+        async def run_batch(items):
+            batches.append(items)
+            return items
+
+        batcher = MicroBatcher(run_batch, max_batch_size=8, max_wait=0.02)
+        cancelled = asyncio.create_task(batcher.submit("gone"))
+        kept = asyncio.create_task(batcher.submit("kept"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+
+        assert await asyncio.wait_for(kept, timeout=1) == "kept"
+        assert batches == [["kept"]]
+
+    @pytest.mark.asyncio
+    async def test_items_gather_while_engine_is_busy(self):
+        """Test that items arriving while max_concurrency batches run form the next batch."""
+        batches = []
+        release = asyncio.Event()
+
+        async def run_batch(items):
+            batches.append(items)
+            await release.wait()
+            return items
+
+        batcher = MicroBatcher(
+            run_batch, max_batch_size=8, max_wait=0, max_concurrency=1
+        )
+        tasks = [asyncio.create_task(batcher.submit("first"))]
+        await asyncio.sleep(0.01)
+        tasks += [asyncio.create_task(batcher.submit(item)) for item in ("a", "b", "c")]
+        await asyncio.sleep(0.01)
+        assert batches == [["first"]]
+
+        release.set()
+        await asyncio.wait_for(asyncio.gather(*tasks), timeout=1)
+        assert batches == [["first"], ["a", "b", "c"]]
@@ -0,0 +1,124 @@
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.bench_batching import simulate
+from benchmarks.load_test import compare, percentile
+from benchmarks.mock_whisper import LatencyModel, create_mock_app
+from benchmarks.synth import FRAME_LENGTH, make_batch, make_mp3, parse_size
+from src.app.mp3 import iter_frames
+
+
+class TestSynth:
+    """Test cases for the synthetic MP3 generator."""
+
+    def test_make_mp3_is_parseable(self, tmp_path):
+        """Test that generated files are whole, valid MP3 frames."""
+        content = make_mp3(100 * FRAME_LENGTH + 10, seed=1)
+        path = tmp_path / "audio.mp3"
+        path.write_bytes(content)
+
+        frames = list(iter_frames(str(path)))
+        assert len(content) == 100 * FRAME_LENGTH
+        assert len(frames) == 100
+        assert frames[-1][0] + frames[-1][1].frame_length == os.path.getsize(path)
+
+    def test_make_batch_is_unique_and_reproducible(self):
+        """Test that batches cycle sizes, differ per file and repeat per seed."""
+        batch = make_batch([FRAME_LENGTH, 2 * FRAME_LENGTH], 3, seed=7)
+
+        assert [len(content) for _, content in batch] == [
+            FRAME_LENGTH,
+            2 * FRAME_LENGTH,
+            FRAME_LENGTH,
+        ]
+        assert batch[0][1] != batch[2][1]
+        assert batch == make_batch([FRAME_LENGTH, 2 * FRAME_LENGTH], 3, seed=7)
+
+    def test_parse_size(self):
+        """Test parsing human-readable sizes."""
+        assert parse_size("512") == 512
+        assert parse_size("256KB") == 256 * 1024
+        assert parse_size("1.5mb") == 1536 * 1024
+
+
+class TestMockWhisper:
+    """Test cases for the mock Whisper server."""
+
+    def test_latency_distributions_center_on_median(self):
+        """Test that every distribution's median is close to the configured one."""
+        import random
+
+        for distribution in ("fixed", "uniform", "exponential", "lognormal"):
+            model = LatencyModel(0.1, distribution, rng=random.Random(0))
+            samples = sorted(model.sample() for _ in range(2001))
+            assert abs(samples[1000] - 0.1) < 0.02, distribution
+
+    def test_injects_rate_limits_and_errors(self):
+        """Test that 429s carry rate limit headers and errors are counted."""
+        app = create_mock_app(latency=0, rate_limit_rate=0.3, error_rate=0.3, seed=0)
+        client = TestClient(app)
+
+        statuses = []
+        for _ in range(50):
+            response = client.post(
+                "/v1/audio/transcriptions",
+                data={"model": "whisper-1"},
+                files={"file": ("a.mp3", b"abc", "audio/mpeg")},
+            )
+            statuses.append(response.status_code)
+            if response.status_code == 429:
+                assert response.headers["retry-after"] == "1"
+                assert response.headers["x-ratelimit-remaining-requests"] == "0"
+
+        assert set(statuses) == {200, 429, 500}
+        assert app.state.status_counts[429] == statuses.count(429)
+
+
+class TestLoadTest:
+    """Test cases for the load test driver's reporting."""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = [float(n) for n in range(1, 101)]
+        assert percentile(values, 0.50) == 50.0
+        assert percentile(values, 0.99) == 99.0
+        assert percentile([], 0.5) == 0.0
+
+    def test_compare_flags_regressions(self):
+        """Test that only metrics worse than the tolerance are reported."""
+        baseline = {
+            "throughput_rps": 10.0,
+            "latency_p50_ms": 100.0,
+            "latency_p95_ms": 200.0,
+            "latency_p99_ms": 300.0,
+            "peak_rss_mb": 100.0,
+        }
+        results = dict(
+            baseline, throughput_rps=7.0, latency_p50_ms=50.0, peak_rss_mb=110.0
+        )
+
+        assert compare(results, baseline, tolerance=0.2) == ["throughput_rps"]
+
+
+class TestBatchingBenchmark:
+    """Test cases for the micro-batching benchmark."""
+
+    @pytest.mark.asyncio
+    async def test_batching_raises_throughput_of_a_saturated_engine(self):
+        """Test that batching beats one item per pass when arrivals exceed capacity."""
+        options = {
+            "items": 60,
+            "rate": 2000,
+            "wait_ms": 1,
+            "overhead": 0.01,
+            "per_item": 0.001,
+            "workers": 1,
+        }
+        unbatched = await simulate(batch_size=1, **options)
+        batched = await simulate(batch_size=8, **options)
+
+        assert unbatched["mean_batch"] == 1
+        assert batched["mean_batch"] > 2
+        assert batched["items_per_s"] > 2 * unbatched["items_per_s"]
@@ -0,0 +1,123 @@
+import sqlite3
+
+from prometheus_client import REGISTRY
+
+from src.app.cache import TranscriptCache
+
+
+def stored(path):
+    """Return the number of cached transcripts and their total size."""
+    with sqlite3.connect(path) as connection:
+        return connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM transcripts"
+        ).fetchone()
+
+
+def lookups(result):
+    """Read the transcript cache lookup counter for one result."""
+    return (
+        REGISTRY.get_sample_value(
+            "transcriber_transcript_cache_lookups_total", {"result": result}
+        )
+        or 0.0
+    )
+
+
+class TestTranscriptCache:
+    """Test cases for the transcript cache."""
+
+    def test_get_and_put(self, tmp_path):
+        """Test storing and retrieving a transcript with hit/miss counters."""
+        cache = TranscriptCache(str(tmp_path / "cache.sqlite3"))
+
+        assert cache.get("hash", "en", "whisper-1") is None
+        cache.put("hash", "en", "whisper-1", "hello world")
+
+        assert cache.get("hash", "en", "whisper-1") == "hello world"
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert stored(cache.path) == (1, 11)
+        cache.close()
+
+    def test_key_includes_language_and_model(self, tmp_path):
+        """Test that the same audio in another language or model is a miss."""
+        cache = TranscriptCache(str(tmp_path / "cache.sqlite3"))
+        cache.put("hash", "en", "whisper-1", "hello")
+
+        assert cache.get("hash", "pt", "whisper-1") is None
+        assert cache.get("hash", "en", "other-model") is None
+        assert cache.get("other-hash", "en", "whisper-1") is None
+        cache.close()
+
+    def test_persists_across_instances(self, tmp_path):
+        """Test that transcripts survive a restart."""
+        path = str(tmp_path / "cache.sqlite3")
+        cache = TranscriptCache(path)
+        cache.put("hash", "en", "whisper-1", "hello")
+        cache.close()
+
+        reopened = TranscriptCache(path)
+        assert reopened.get("hash", "en", "whisper-1") == "hello"
+        reopened.close()
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test that the least recently used transcripts are evicted over the limit."""
+        cache = TranscriptCache(str(tmp_path / "cache.sqlite3"), max_bytes=10)
+        cache.put("first", "en", "whisper-1", "aaaa")
+        cache.put("second", "en", "whisper-1", "bbbb")
+        # Touch the first entry so the second becomes the least recently used
+        assert cache.get("first", "en", "whisper-1") == "aaaa"
+        cache.put("third", "en", "whisper-1", "cccc")
+
+        assert cache.get("second", "en", "whisper-1") is None
+        assert cache.get("first", "en", "whisper-1") == "aaaa"
+        assert cache.get("third", "en", "whisper-1") == "cccc"
+        assert stored(cache.path)[1] == 8
+        cache.close()
+
+    def test_skips_transcripts_larger_than_cache(self, tmp_path):
+        """Test that a transcript larger than the whole cache is not stored."""
+        cache = TranscriptCache(str(tmp_path / "cache.sqlite3"), max_bytes=4)
+        cache.put("hash", "en", "whisper-1", "too long")
+
+        assert cache.get("hash", "en", "whisper-1") is None
+        cache.close()
+
+    def test_exports_lookup_counters(self, tmp_path):
+        """Test that hits and misses are exported as Prometheus counters."""
+        cache = TranscriptCache(str(tmp_path / "cache.sqlite3"))
+        hits, misses = lookups("hit"), lookups("miss")
+
+        cache.get("hash", "en", "whisper-1")
+        cache.put("hash", "en", "whisper-1", "hello")
+        cache.get("hash", "en", "whisper-1")
+
+        assert (lookups("hit") - hits, lookups("miss") - misses) == (1, 1)
+        cache.close()
+
+    def test_access_times_survive_a_restart(self, tmp_path):
+        """Test that hits not yet written by a store are written on close."""
+        path = str(tmp_path / "cache.sqlite3")
+        cache = TranscriptCache(path, max_bytes=10)
+        cache.put("first", "en", "whisper-1", "aaaa")
+        cache.put("second", "en", "whisper-1", "bbbb")
+        assert cache.get("first", "en", "whisper-1") == "aaaa"
+        cache.close()
+
+        reopened = TranscriptCache(path, max_bytes=10)
+        reopened.put("third", "en", "whisper-1", "cccc")
+
+        assert reopened.get("second", "en", "whisper-1") is None
+        assert reopened.get("first", "en", "whisper-1") == "aaaa"
+        reopened.close()
+
+    def test_database_errors_are_not_raised(self, tmp_path):
+        """Test that a cache that can't be opened behaves as empty instead of failing."""
+        # A directory can't be opened as a database
+        cache = TranscriptCache(str(tmp_path))
+        errors = lookups("error")
+
+        cache.put("hash", "en", "whisper-1", "hello")
+
+        assert cache.get("hash", "en", "whisper-1") is None
+        assert lookups("error") - errors == 1
+        cache.close()
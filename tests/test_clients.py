@@ -0,0 +1,149 @@
+from unittest.mock import AsyncMock, patch
+
+import httpx
+import pytest
+from openai import AsyncOpenAI
+
+from src.app import clients
+from src.app.clients import (
+    ClientPool,
+    build_transport,
+    close_http_client,
+    create_async_client,
+    fingerprint,
+    get_transport,
+    limiter_for,
+)
+from src.app.config import (
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+)
+
+
+class TestClients:
+    """Test cases for the clients module."""
+
+    @pytest.mark.asyncio
+    async def test_build_transport_limits(self):
+        """Test that the HTTP transport uses the configured pool limits."""
+        transport = build_transport()
+        try:
+            pool = transport._pool
+            assert pool._max_connections == HTTP_MAX_CONNECTIONS
+            assert pool._max_keepalive_connections == HTTP_MAX_KEEPALIVE_CONNECTIONS
+            assert pool._keepalive_expiry == HTTP_KEEPALIVE_EXPIRY
+        finally:
+            await transport.aclose()
+
+    @pytest.mark.asyncio
+    async def test_clients_share_transport(self):
+        """Test that every AsyncOpenAI client reuses the same connection pool."""
+        try:
+            first = create_async_client("sk-first")
+            second = create_async_client("sk-second")
+
+            assert isinstance(first, AsyncOpenAI)
+            assert first._client._transport._transport is get_transport()
+            assert second._client._transport._transport is get_transport()
+
+            # Closing one client must leave the shared pool usable
+            await first.close()
+            assert clients._transport is not None
+        finally:
+            await close_http_client()
+
+    @pytest.mark.asyncio
+    async def test_close_http_client(self):
+        """Test that closing the pool resets it for the next caller."""
+        get_transport()
+        await close_http_client()
+
+        assert clients._transport is None
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_headers_reach_limiter(self):
+        """Test that responses update the concurrency limiter for the client's key."""
+        headers = {"x-ratelimit-remaining-requests": "3"}
+        mock_transport = httpx.MockTransport(
+            lambda request: httpx.Response(200, json={"text": "hi"}, headers=headers)
+        )
+        with patch("src.app.clients.get_transport", return_value=mock_transport):
+            client = create_async_client("sk-limited")
+        limiter = limiter_for(client)
+
+        await client.audio.transcriptions.create(model="whisper-1", file=b"audio")
+
+        assert limiter.window == 3
+        await client.close()
+
+    def test_fingerprint_hides_api_key(self):
+        """Test that fingerprints are stable, distinct and don't contain the key."""
+        assert fingerprint("sk-secret") == fingerprint("sk-secret")
+        assert fingerprint("sk-secret") != fingerprint("sk-other")
+        assert "sk-secret" not in fingerprint("sk-secret")
+
+
+class TestClientPool:
+    """Test cases for the OpenAI client pool."""
+
+    @pytest.mark.asyncio
+    async def test_reuses_client_for_same_key(self):
+        """Test that repeat callers get the same warm client."""
+        pool = ClientPool(max_size=2, ttl=60)
+        async with pool.lease("sk-one") as first:
+            pass
+        async with pool.lease("sk-one") as second:
+            pass
+
+        assert first is second
+        assert len(pool) == 1
+        assert "sk-one" not in pool._clients
+        await pool.close()
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used(self):
+        """Test that the oldest client is evicted and closed when the pool is full."""
+        pool = ClientPool(max_size=2, ttl=60)
+        with patch.object(AsyncOpenAI, "close", new_callable=AsyncMock) as mock_close:
+            async with pool.lease("sk-one") as first:
+                pass
+            async with pool.lease("sk-two"):
+                pass
+            async with pool.lease("sk-one"):
+                pass
+            async with pool.lease("sk-three"):
+                pass
+
+            assert len(pool) == 2
+            assert fingerprint("sk-two") not in pool._clients
+            assert fingerprint("sk-one") in pool._clients
+            mock_close.assert_awaited_once()
+
+            async with pool.lease("sk-one") as again:
+                assert again is first
+
+    @pytest.mark.asyncio
+    async def test_expires_idle_clients(self):
+        """Test that clients idle for longer than the TTL are replaced."""
+        pool = ClientPool(max_size=2, ttl=0)
+        with patch.object(AsyncOpenAI, "close", new_callable=AsyncMock) as mock_close:
+            async with pool.lease("sk-one") as first:
+                pass
+            async with pool.lease("sk-one") as second:
+                pass
+
+            assert first is not second
+            mock_close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_leased_client_closed_after_release(self):
+        """Test that an evicted client stays open until its lease is released."""
+        pool = ClientPool(max_size=1, ttl=60)
+        with patch.object(AsyncOpenAI, "close", new_callable=AsyncMock) as mock_close:
+            async with pool.lease("sk-one"):
+                async with pool.lease("sk-two"):
+                    pass
+                mock_close.assert_not_awaited()
+            mock_close.assert_awaited_once()
+            await pool.close()
@@ -0,0 +1,176 @@
+import asyncio
+import time
+
+import httpx
+import openai
+import pytest
+from prometheus_client import REGISTRY
+
+from src.app.concurrency import AIMDLimiter, LimiterRegistry, is_overload
+from src.app.retry import RetryPolicy
+
+
+def rate_limit_error():
+    """Build the error the OpenAI SDK raises for a 429."""
+    request = httpx.Request("POST", "https://api.openai.com/v1/audio/transcriptions")
+    return openai.RateLimitError(
+        "rate limited", response=httpx.Response(429, request=request), body=None
+    )
+
+
+class TestAIMDLimiter:
+    """Test cases for the adaptive concurrency limiter."""
+
+    @pytest.mark.asyncio
+    async def test_limits_calls_in_flight(self):
+        """Test that no more calls than the window run at once."""
+        limiter = AIMDLimiter(initial=2, max_limit=2)
+        running = 0
+        peak = 0
+
+        async def call():
+            nonlocal running, peak
+            async with limiter.slot():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(call() for _ in range(6)))
+
+        assert peak == 2
+        assert limiter.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_additive_increase(self):
+        """Test that the window grows by about one per window of successes."""
+        limiter = AIMDLimiter(initial=4, max_limit=100)
+
+        for _ in range(4):
+            async with limiter.slot():
+                pass
+
+        assert limiter.window == 4
+        assert 4.9 < limiter.limit < 5.0
+
+    @pytest.mark.asyncio
+    async def test_multiplicative_decrease_once_per_burst(self):
+        """Test that concurrent 429s halve the window only once."""
+        limiter = AIMDLimiter(initial=8)
+        started = asyncio.Event()
+
+        async def rate_limited_call():
+            async with limiter.slot():
+                await started.wait()
+                raise rate_limit_error()
+
+        calls = [asyncio.create_task(rate_limited_call()) for _ in range(4)]
+        await asyncio.sleep(0)
+        started.set()
+        results = await asyncio.gather(*calls, return_exceptions=True)
+
+        assert all(isinstance(result, openai.RateLimitError) for result in results)
+        assert limiter.limit == 4
+
+        # A call started after the cut can cut the window again
+        with pytest.raises(openai.RateLimitError):
+            async with limiter.slot():
+                raise rate_limit_error()
+        assert limiter.limit == 2
+
+    @pytest.mark.asyncio
+    async def test_other_errors_leave_window_unchanged(self):
+        """Test that errors that aren't overload signals don't move the window."""
+        limiter = AIMDLimiter(initial=8)
+
+        with pytest.raises(ValueError):
+            async with limiter.slot():
+                raise ValueError("bad audio")
+
+        assert limiter.limit == 8
+        assert not is_overload(ValueError())
+        assert is_overload(
+            openai.APITimeoutError(request=httpx.Request("POST", "https://x"))
+        )
+
+    @pytest.mark.asyncio
+    async def test_retry_deadline_timeout_cuts_the_window(self):
+        """Test that a call cancelled by the retry deadline counts as overload."""
+        limiter = AIMDLimiter(initial=8)
+
+        async def slow_request():
+            await asyncio.sleep(10)
+
+        with pytest.raises(TimeoutError):
+            await RetryPolicy(deadline=0.05).call(slow_request, slot=limiter.slot)
+
+        assert limiter.limit == 4
+        assert limiter.in_flight == 0
+
+    def test_observe_remaining_requests(self):
+        """Test that the window never exceeds the provider's remaining requests."""
+        limiter = AIMDLimiter(initial=8)
+
+        limiter.observe(httpx.Headers({"x-ratelimit-remaining-requests": "100"}))
+        assert limiter.window == 8
+        limiter.observe(httpx.Headers({"x-ratelimit-remaining-requests": "3"}))
+        assert limiter.window == 3
+        limiter.observe(httpx.Headers({"x-ratelimit-remaining-requests": "0"}))
+        assert limiter.window == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_releases_slot(self):
+        """Test that a cancelled waiter doesn't leak or block slots."""
+        limiter = AIMDLimiter(initial=1)
+        await limiter.acquire()
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        waiter.cancel()
+        limiter.release(time.monotonic())
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+        assert limiter.in_flight == 0
+        assert limiter.idle
+        await asyncio.wait_for(limiter.acquire(), timeout=1)
+
+
+class TestLimiterRegistry:
+    """Test cases for the per-key limiter registry."""
+
+    def test_limiters_are_per_key_and_exported(self):
+        """Test that each key gets its own limiter with its window in metrics."""
+        registry = LimiterRegistry()
+        first = registry.get("aaaaaaaaaaaaaaaa")
+        second = registry.get("bbbbbbbbbbbbbbbb")
+
+        assert first is registry.get("aaaaaaaaaaaaaaaa")
+        assert first is not second
+
+        registry.observe(
+            "aaaaaaaaaaaaaaaa",
+            httpx.Response(200, headers={"x-ratelimit-remaining-requests": "2"}),
+        )
+        assert first.window == 2
+        assert second.window == 8
+        assert (
+            REGISTRY.get_sample_value(
+                "transcriber_concurrency_limit", {"key": "aaaaaaaaaaaa"}
+            )
+            == 2
+        )
+
+    def test_evicts_idle_limiters(self):
+        """Test that idle limiters beyond max_size are dropped with their metrics."""
+        registry = LimiterRegistry(max_size=1)
+        registry.get("cccccccccccccccc")
+        registry.get("dddddddddddddddd")
+
+        assert len(registry) == 1
+        assert (
+            REGISTRY.get_sample_value(
+                "transcriber_concurrency_limit", {"key": "cccccccccccc"}
+            )
+            is None
+        )
@@ -0,0 +1,116 @@
+import asyncio
+import io
+import os
+from functools import partial
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from fastapi import UploadFile
+from prometheus_client import REGISTRY
+from starlette.datastructures import Headers
+from starlette.requests import Request
+
+from src.app.disconnect import watch_disconnect
+from src.app.transcription import handle_transcription, limiter
+
+
+def disconnecting_request(after: float) -> Request:
+    """A request whose client disconnects `after` seconds from now."""
+    loop = asyncio.get_running_loop()
+    disconnect_at = loop.time() + after
+
+    async def receive():
+        # Like a server, block until there is a message to deliver
+        delay = disconnect_at - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return {"type": "http.disconnect"}
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/transcribe",
+        "query_string": b"",
+        "headers": [],
+    }
+    return Request(scope, receive)
+
+
+def sample(name):
+    """Return the current value of a metric sample, treating missing as 0."""
+    return REGISTRY.get_sample_value(name) or 0.0
+
+
+class TestDisconnect:
+    """Test cases for cancelling work when the client disconnects."""
+
+    @pytest.mark.asyncio
+    async def test_watch_disconnect(self):
+        """Test that the callback runs once the client has gone."""
+        request = Mock()
+        request.is_disconnected = AsyncMock(side_effect=[False, False, True])
+        on_disconnect = AsyncMock()
+
+        await watch_disconnect(request, on_disconnect, interval=0)
+
+        on_disconnect.assert_awaited_once()
+        assert request.is_disconnected.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_disconnect_cancels_transcriptions_and_removes_run(self, tmp_path):
+        """Test that a disconnect mid-stream cancels work and deletes the run."""
+        cancelled = asyncio.Event()
+
+        async def slow_transcribe(client, file_path, language, content_hash):
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        upload = UploadFile(
+            file=io.BytesIO(b"\xff\xfb" * 100),
+            filename="a.mp3",
+            headers=Headers({"content-type": "audio/mpeg"}),
+        )
+        mock_release = AsyncMock()
+        cancelled_before = sample("transcriber_cancelled_transcriptions_total")
+        disconnects_before = sample("transcriber_client_disconnects_total")
+
+        limiter.enabled = False
+        try:
+            with (
+                patch(
+                    "src.app.backends.client_pool.acquire",
+                    AsyncMock(return_value=Mock()),
+                ),
+                patch("src.app.backends.client_pool.release", mock_release),
+                patch(
+                    "src.app.transcription.transcribe_file", side_effect=slow_transcribe
+                ),
+                patch(
+                    "src.app.transcription.watch_disconnect",
+                    partial(watch_disconnect, interval=0.01),
+                ),
+                patch("src.app.transcription.TEMP_DIR", str(tmp_path)),
+            ):
+                response = await handle_transcription(
+                    request=disconnecting_request(after=0.05),
+                    language="en",
+                    backend=None,
+                    authorization="Bearer sk-test",
+                    files=[upload],
+                )
+                assert len(os.listdir(tmp_path)) == 1
+                await asyncio.wait_for(cancelled.wait(), timeout=2)
+                await asyncio.sleep(0.05)
+        finally:
+            limiter.enabled = True
+
+        assert response.media_type == "application/zip"
+        mock_release.assert_awaited_once()
+        assert os.listdir(tmp_path) == []
+        assert (
+            sample("transcriber_cancelled_transcriptions_total") == cancelled_before + 1
+        )
+        assert sample("transcriber_client_disconnects_total") == disconnects_before + 1
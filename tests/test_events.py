@@ -0,0 +1,139 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+import pytest
+
+from src.app.artifacts import LocalArtifactStore, result_key
+from src.app.events import (
+    HEARTBEAT,
+    format_event,
+    parse_last_event_id,
+    stream_queued_events,
+    stream_run_events,
+)
+from src.app.runs import FILE_DONE, FILE_SAVED, FILE_TRANSCRIBING, Run
+
+
+def parse(message):
+    """Decode one encoded event into its fields, with the data parsed."""
+    fields = dict(line.split(": ", 1) for line in message.decode().strip().split("\n"))
+    fields["data"] = json.loads(fields["data"])
+    return fields
+
+
+async def collect(stream):
+    """Read a stream to the end."""
+    return [message async for message in stream]
+
+
+class TestEvents:
+    """Test cases for job progress event streams."""
+
+    def test_format_event(self):
+        """Test that events are encoded as SSE messages, newlines in data escaped."""
+        message = format_event("done", {"text": "line 1\nline 2"}, 3)
+
+        assert message == b'id: 3\nevent: done\ndata: {"text": "line 1\\nline 2"}\n\n'
+
+    def test_parse_last_event_id(self):
+        """Test that missing or invalid Last-Event-ID headers resume from the start."""
+        assert parse_last_event_id("4") == 4
+        assert parse_last_event_id(None) == 0
+        assert parse_last_event_id("junk") == 0
+        assert parse_last_event_id("-2") == 0
+
+    @pytest.mark.asyncio
+    async def test_run_events_stream_until_finished(self):
+        """Test that a run's events are streamed as they happen, ending when it finishes."""
+        run = Run("run-1", "/tmp/run-1", ["a.mp3"])
+
+        async def progress():
+            run.update(0, FILE_SAVED, output_filename="a.txt")
+            await asyncio.sleep(0.01)
+            run.update(0, FILE_TRANSCRIBING)
+            run.update(0, FILE_DONE, text="hello")
+            run.finish()
+
+        messages, _ = await asyncio.gather(collect(stream_run_events(run)), progress())
+
+        events = [parse(message) for message in messages]
+        assert [event["event"] for event in events] == [
+            "saved",
+            "transcribing",
+            "done",
+            "finished",
+        ]
+        assert [event["id"] for event in events] == ["1", "2", "3", "4"]
+        assert events[2]["data"]["text"] == "hello"
+        assert events[2]["data"]["filename"] == "a.mp3"
+        assert events[3]["data"] == {"status": "done", "error": None}
+
+    @pytest.mark.asyncio
+    async def test_run_events_resume_after_last_seen(self):
+        """Test that a reconnecting client only gets the events it missed."""
+        run = Run("run-1", "/tmp/run-1", ["a.mp3"])
+        run.update(0, FILE_SAVED, output_filename="a.txt")
+        run.update(0, FILE_DONE, text="hello")
+        run.finish()
+
+        events = [
+            parse(message) for message in await collect(stream_run_events(run, 2))
+        ]
+
+        assert [event["event"] for event in events] == ["finished"]
+        assert events[0]["id"] == "3"
+
+    @pytest.mark.asyncio
+    async def test_run_events_heartbeat(self):
+        """Test that an idle stream sends keepalive comments."""
+        run = Run("run-1", "/tmp/run-1", ["a.mp3"])
+        stream = stream_run_events(run, heartbeat=0.01)
+
+        assert await stream.__anext__() == HEARTBEAT
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_queued_events_report_changes(self, tmp_path):
+        """Test that a queued job's state changes are streamed with stored transcripts."""
+        store = LocalArtifactStore(str(tmp_path / "store"))
+        store.put(result_key("job-1", 0), b"hello")
+        file_state = {
+            "index": 0,
+            "filename": "a.mp3",
+            "output_filename": "a.txt",
+            "error": None,
+        }
+        states = [
+            ("processing", "saved"),
+            ("processing", "saved"),
+            ("processing", "transcribing"),
+            ("done", "done"),
+        ]
+
+        def get_job():
+            status, file_status = states.pop(0)
+            return {
+                "id": "job-1",
+                "status": status,
+                "error": None,
+                "run_path": str(tmp_path / "job-1"),
+                "files": [{**file_state, "status": file_status}],
+            }
+
+        with patch("src.app.events.artifact_store", store):
+            messages = await collect(stream_queued_events(get_job, poll_interval=0))
+
+        events = [parse(message) for message in messages]
+        assert [event["event"] for event in events] == [
+            "saved",
+            "transcribing",
+            "done",
+            "finished",
+        ]
+        assert events[2]["data"]["text"] == "hello"
+
+    @pytest.mark.asyncio
+    async def test_queued_events_end_when_job_expires(self):
+        """Test that the stream of a job that disappears from the queue ends."""
+        assert await collect(stream_queued_events(lambda: None)) == []
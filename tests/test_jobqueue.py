@@ -0,0 +1,138 @@
+import os
+import stat
+import time
+
+from src.app.jobqueue import JobQueue
+
+
+def make_queue(tmp_path, max_attempts=3):
+    """Create a queue in a temporary database."""
+    return JobQueue(str(tmp_path / "queue" / "jobs.sqlite3"), max_attempts=max_attempts)
+
+
+def enqueue(queue, job_id="job-1", run_path="/runs/job-1"):
+    """Enqueue a job with one saved file."""
+    files = [
+        {
+            "index": 0,
+            "filename": "a.mp3",
+            "status": "saved",
+            "path": f"{run_path}/a.mp3",
+        }
+    ]
+    queue.enqueue(job_id, run_path, "en", "openai", "sk-test", files)
+
+
+class TestJobQueue:
+    """Test cases for the durable job queue."""
+
+    def test_claim_leases_jobs_in_order(self, tmp_path):
+        """Test that jobs are claimed oldest first and only once while leased."""
+        queue = make_queue(tmp_path)
+        enqueue(queue, "job-1")
+        enqueue(queue, "job-2")
+
+        first = queue.claim("worker-a", visibility_timeout=60)
+        second = queue.claim("worker-b", visibility_timeout=60)
+
+        assert (first.id, second.id) == ("job-1", "job-2")
+        assert first.api_key == "sk-test"
+        assert first.files[0]["path"] == "/runs/job-1/a.mp3"
+        assert first.attempts == 1
+        assert queue.claim("worker-c", visibility_timeout=60) is None
+        assert queue.get("job-1")["status"] == "processing"
+        queue.close()
+
+    def test_expired_lease_is_reclaimed(self, tmp_path):
+        """Test that a job is handed to another worker once its lease expires."""
+        queue = make_queue(tmp_path)
+        enqueue(queue)
+        queue.claim("worker-a", visibility_timeout=0.01)
+        time.sleep(0.02)
+
+        job = queue.claim("worker-b", visibility_timeout=60)
+
+        assert job.id == "job-1"
+        assert job.attempts == 2
+        # The first worker can no longer extend or finish it
+        assert not queue.extend("job-1", "worker-a", 60)
+        assert not queue.finish("job-1", "worker-a", job.files)
+        assert queue.extend("job-1", "worker-b", 60)
+        queue.close()
+
+    def test_job_fails_after_max_attempts(self, tmp_path):
+        """Test that a job whose workers keep dying is failed, not retried forever."""
+        queue = make_queue(tmp_path, max_attempts=1)
+        enqueue(queue)
+        queue.claim("worker-a", visibility_timeout=0.01)
+        time.sleep(0.02)
+
+        assert queue.claim("worker-b", visibility_timeout=60) is None
+        job = queue.get("job-1")
+        assert job["status"] == "failed"
+        assert "stopped responding" in job["error"]
+        assert queue.pending_run_paths() == set()
+        queue.close()
+
+    def test_finish_records_results_and_forgets_api_key(self, tmp_path):
+        """Test that finishing a job stores its files and deletes the API key."""
+        queue = make_queue(tmp_path)
+        enqueue(queue)
+        job = queue.claim("worker-a", visibility_timeout=60)
+        job.files[0]["status"] = "done"
+
+        assert queue.finish(job.id, "worker-a", job.files)
+
+        status = queue.get("job-1")
+        assert status["status"] == "done"
+        assert status["files"][0]["status"] == "done"
+        assert status["finished_at"] is not None
+        api_key = queue._connect().execute("SELECT api_key FROM jobs").fetchone()[0]
+        assert api_key is None
+        queue.close()
+
+    def test_release_requeues_without_using_an_attempt(self, tmp_path):
+        """Test that a job released by a stopping worker is claimed again as new."""
+        queue = make_queue(tmp_path)
+        enqueue(queue)
+        queue.claim("worker-a", visibility_timeout=60)
+
+        assert queue.release("job-1", "worker-a")
+        assert queue.get("job-1")["queued"]
+        assert queue.claim("worker-b", visibility_timeout=60).attempts == 1
+        queue.close()
+
+    def test_survives_restart_and_prunes(self, tmp_path):
+        """Test that queued jobs persist across instances and old finished jobs are pruned."""
+        queue = make_queue(tmp_path)
+        enqueue(queue, "job-1", "/runs/job-1")
+        enqueue(queue, "job-2", "/runs/job-2")
+        queue.close()
+
+        reopened = make_queue(tmp_path)
+        assert reopened.pending_run_paths() == {"/runs/job-1", "/runs/job-2"}
+        job = reopened.claim("worker-a", visibility_timeout=60)
+        reopened.finish(job.id, "worker-a", job.files, error="boom")
+
+        assert reopened.prune(max_age=60) == 0
+        assert reopened.prune(max_age=-1) == 1
+        assert reopened.get("job-1") is None
+        assert reopened.get("job-2") is not None
+        reopened.close()
+
+    def test_database_is_private(self, tmp_path):
+        """Test that the directory and files holding API keys are owner-only."""
+        old_umask = os.umask(0o022)
+        try:
+            queue = make_queue(tmp_path)
+            enqueue(queue)
+        finally:
+            os.umask(old_umask)
+
+        def mode(path):
+            return stat.S_IMODE(os.stat(path).st_mode)
+
+        assert mode(tmp_path / "queue") == 0o700
+        for name in ("jobs.sqlite3", "jobs.sqlite3-wal", "jobs.sqlite3-shm"):
+            assert mode(tmp_path / "queue" / name) == 0o600
+        queue.close()
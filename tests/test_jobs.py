@@ -0,0 +1,300 @@
+import asyncio
+import io
+import json
+import os
+import time
+import zipfile
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from api.index import app
+from src.app.artifacts import artifact_store
+from src.app.jobqueue import JobQueue
+from src.app.jobs import limiter
+from src.app.runs import runs
+from src.app.storage import DiskUsage
+from src.app.worker import process_job
+
+
+@pytest.fixture
+def client():
+    """Test client with rate limiting and the scheduler disabled and a mocked OpenAI client."""
+    mock_openai = Mock()
+    mock_openai.audio.transcriptions.create.return_value = Mock(text="hello")
+    limiter.enabled = False
+    with (
+        patch("api.index.start_scheduler"),
+        patch("api.index.shutdown_scheduler"),
+        patch(
+            "src.app.backends.client_pool.acquire", AsyncMock(return_value=mock_openai)
+        ),
+        patch("src.app.backends.client_pool.release", AsyncMock()),
+        patch("src.app.transcription.transcript_cache") as mock_cache,
+    ):
+        mock_cache.get.return_value = None
+        with TestClient(app) as test_client:
+            yield test_client
+    limiter.enabled = True
+
+
+def submit(client, files):
+    """Submit a job and return the response."""
+    return client.post(
+        "/jobs",
+        data={"language": "en"},
+        headers={"Authorization": "Bearer sk-test"},
+        files=[("files", file) for file in files],
+    )
+
+
+def wait_for(client, job_id, timeout=5.0):
+    """Poll a job until it finishes and return its final status."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").json()
+        if job["status"] != "processing":
+            return job
+        time.sleep(0.02)
+    raise AssertionError("Job did not finish in time")
+
+
+def read_events(client, job_id):
+    """Read a job's event stream to the end and return (event, data) pairs."""
+    events = []
+    with client.stream("GET", f"/jobs/{job_id}/events") as response:
+        assert response.headers["content-type"].startswith("text/event-stream")
+        event = None
+        for line in response.iter_lines():
+            if line.startswith("event: "):
+                event = line[len("event: ") :]
+            elif line.startswith("data: "):
+                events.append((event, json.loads(line[len("data: ") :])))
+    return events
+
+
+class TestJobs:
+    """Test cases for the asynchronous job API."""
+
+    def test_submit_poll_and_fetch(self, client):
+        """Test the full submit / poll / fetch flow."""
+        response = submit(
+            client,
+            [
+                ("a.mp3", b"\xff\xfb" * 100, "audio/mpeg"),
+                ("b.txt", b"not audio", "text/plain"),
+            ],
+        )
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+        assert response.json()["result_url"] == f"/jobs/{job_id}/result"
+
+        job = wait_for(client, job_id)
+        assert job["status"] == "done"
+        assert [f["status"] for f in job["files"]] == ["done", "failed"]
+        assert "invalid extension" in job["files"][1]["error"]
+
+        result = client.get(f"/jobs/{job_id}/result")
+        assert result.status_code == 200
+        archive = zipfile.ZipFile(io.BytesIO(result.content))
+        assert archive.read("a.txt") == b"hello"
+
+    def test_result_pending_returns_202(self, client):
+        """Test that fetching the result of a running job returns 202."""
+        run = runs.create("pending-job", "/tmp/transcriber_runs/pending-job", ["a.mp3"])
+        try:
+            response = client.get("/jobs/pending-job/result")
+            assert response.status_code == 202
+            assert response.json()["files"][0]["status"] == "pending"
+        finally:
+            runs.remove(run.id)
+
+    def test_all_invalid_files_rejected(self, client):
+        """Test that a job with no valid files is rejected up front."""
+        response = submit(client, [("b.txt", b"not audio", "text/plain")])
+
+        assert response.status_code == 400
+        assert "No valid MP3 files" in response.json()["detail"]
+
+    def test_unknown_job(self, client):
+        """Test that unknown job ids return 404."""
+        assert client.get("/jobs/unknown").status_code == 404
+        assert client.get("/jobs/unknown/result").status_code == 404
+
+    def test_queued_job_runs_in_worker(self, client, tmp_path):
+        """Test that with the job queue enabled a worker runs the job and the web tier serves it."""
+        queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+        with (
+            patch("src.app.jobs.JOB_QUEUE_ENABLED", True),
+            patch("src.app.jobs.job_queue", queue),
+            patch("src.app.jobs.TEMP_DIR", str(tmp_path)),
+            patch.object(artifact_store, "root", str(tmp_path)),
+        ):
+            response = submit(
+                client,
+                [
+                    ("a.mp3", b"\xff\xfb" * 100, "audio/mpeg"),
+                    ("b.txt", b"not audio", "text/plain"),
+                ],
+            )
+            assert response.status_code == 202
+            job_id = response.json()["job_id"]
+
+            job = client.get(f"/jobs/{job_id}").json()
+            assert job["status"] == "processing"
+            assert job["queued"]
+            assert "run_path" not in job
+            assert "path" not in job["files"][0]
+            assert client.get(f"/jobs/{job_id}/result").status_code == 202
+            assert client.get(f"/jobs/{job_id}/files/a.txt").status_code == 202
+
+            asyncio.run(process_job(queue, queue.claim("worker", 60), "worker"))
+
+            job = client.get(f"/jobs/{job_id}").json()
+            assert job["status"] == "done"
+            assert [f["status"] for f in job["files"]] == ["done", "failed"]
+            result = client.get(f"/jobs/{job_id}/result")
+            assert result.status_code == 200
+            archive = zipfile.ZipFile(io.BytesIO(result.content))
+            assert archive.read("a.txt") == b"hello"
+
+            assert client.get(f"/jobs/{job_id}/files/a.txt").text == "hello"
+
+            events = read_events(client, job_id)
+            assert ("done", "hello") in [
+                (event, data.get("text")) for event, data in events
+            ]
+            assert events[-1] == ("finished", {"status": "done", "error": None})
+        queue.close()
+
+    def test_event_stream(self, client):
+        """Test that a job's progress is streamed per file, with transcripts, until it finishes."""
+        response = submit(
+            client,
+            [
+                ("a.mp3", b"\xff\xfb" * 100, "audio/mpeg"),
+                ("b.txt", b"not audio", "text/plain"),
+            ],
+        )
+        assert (
+            response.json()["events_url"] == f"/jobs/{response.json()['job_id']}/events"
+        )
+
+        events = read_events(client, response.json()["job_id"])
+
+        by_file = {}
+        for event, data in events:
+            by_file.setdefault(data.get("index"), []).append(event)
+        assert by_file[0] == ["saved", "transcribing", "done"]
+        assert by_file[1] == ["failed"]
+        assert by_file[None] == ["finished"]
+        done = next(data for event, data in events if event == "done")
+        assert done["text"] == "hello"
+        assert done["output_filename"] == "a.txt"
+        assert events[-1] == ("finished", {"status": "done", "error": None})
+
+    def test_event_stream_reports_chunks(self, client):
+        """Test that a file split into chunks gets a chunked event."""
+
+        def split(path, *args):
+            return [path, path]
+
+        with (
+            patch("src.app.transcription.CHUNK_MAX_SECONDS", 1),
+            patch("src.app.transcription.split_mp3", side_effect=split),
+        ):
+            response = submit(client, [("a.mp3", b"\xff\xfb" * 100, "audio/mpeg")])
+            events = read_events(client, response.json()["job_id"])
+
+        assert [event for event, _ in events] == [
+            "saved",
+            "transcribing",
+            "chunked",
+            "done",
+            "finished",
+        ]
+        assert events[2][1]["chunks"] == 2
+        assert events[3][1]["text"] == "hello hello"
+
+    def test_event_stream_unknown_job(self, client):
+        """Test that the event stream of an unknown job returns 404."""
+        assert client.get("/jobs/unknown/events").status_code == 404
+
+    def test_file_result_before_job_finishes(self, client):
+        """Test that a finished file can be downloaded while the rest of the job runs."""
+        run = runs.create(
+            "partial-job", "/tmp/transcriber_runs/partial-job", ["a.mp3", "b.mp3"]
+        )
+        try:
+            run.update(0, "saved", output_filename="a.txt")
+            run.update(1, "saved", output_filename="b.txt")
+            run.results[0] = "hello"
+            run.update(0, "done")
+            run.update(1, "transcribing")
+
+            response = client.get("/jobs/partial-job/files/a.txt")
+            assert response.status_code == 200
+            assert response.text == "hello"
+            assert "a.txt" in response.headers["content-disposition"]
+            # Upload names work too
+            assert client.get("/jobs/partial-job/files/a.mp3").text == "hello"
+
+            pending = client.get("/jobs/partial-job/files/b.txt")
+            assert pending.status_code == 202
+            assert pending.json()["status"] == "transcribing"
+            assert client.get("/jobs/partial-job/result").status_code == 202
+        finally:
+            runs.remove(run.id)
+
+    def test_file_result_errors(self, client):
+        """Test failed and unknown files of a job."""
+        response = submit(
+            client,
+            [
+                ("a.mp3", b"\xff\xfb" * 100, "audio/mpeg"),
+                ("b.txt", b"not audio", "text/plain"),
+            ],
+        )
+        job_id = response.json()["job_id"]
+        wait_for(client, job_id)
+
+        assert client.get(f"/jobs/{job_id}/files/a.txt").text == "hello"
+        failed = client.get(f"/jobs/{job_id}/files/b.txt")
+        assert failed.status_code == 500
+        assert "invalid extension" in failed.json()["detail"]
+        assert client.get(f"/jobs/{job_id}/files/c.txt").status_code == 404
+        assert client.get("/jobs/unknown/files/a.txt").status_code == 404
+
+    def test_uploads_removed_when_job_finishes(self, client, tmp_path):
+        """Test that a finished job's run directory is deleted while its results stay available."""
+        with patch("src.app.jobs.TEMP_DIR", str(tmp_path)):
+            response = submit(client, [("a.mp3", b"\xff\xfb" * 100, "audio/mpeg")])
+        job_id = response.json()["job_id"]
+        wait_for(client, job_id)
+
+        deadline = time.monotonic() + 2
+        while os.listdir(tmp_path) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert os.listdir(tmp_path) == []
+
+        result = client.get(f"/jobs/{job_id}/result")
+        assert zipfile.ZipFile(io.BytesIO(result.content)).read("a.txt") == b"hello"
+        assert client.get(f"/jobs/{job_id}/files/a.txt").text == "hello"
+
+    def test_submit_refused_when_disk_is_full(self, client, tmp_path):
+        """Test that uploads are refused with 503 and Retry-After above the high watermark."""
+        with (
+            patch(
+                "src.app.storage.storage_governor.disk_usage",
+                return_value=DiskUsage(1000, 990),
+            ),
+            patch("src.app.transcription.evict_runs") as mock_evict,
+            patch("src.app.jobs.TEMP_DIR", str(tmp_path)),
+        ):
+            response = submit(client, [("a.mp3", b"\xff\xfb" * 100, "audio/mpeg")])
+
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "30"
+        mock_evict.assert_called_once()
+        assert os.listdir(tmp_path) == []
@@ -0,0 +1,95 @@
+import io
+import zipfile
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from api.index import app
+from src.app.metrics import directory_size
+from src.app.transcription import limiter
+
+
+def sample(name, **labels):
+    """Return the current value of a metric sample, treating missing as 0."""
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.fixture
+def client():
+    """Test client with rate limiting and the scheduler disabled and a mocked OpenAI client."""
+    mock_openai = Mock()
+    mock_openai.audio.transcriptions.create.return_value = Mock(text="hello")
+    limiter.enabled = False
+    with (
+        patch("api.index.start_scheduler"),
+        patch("api.index.shutdown_scheduler"),
+        patch(
+            "src.app.backends.client_pool.acquire", AsyncMock(return_value=mock_openai)
+        ),
+        patch("src.app.backends.client_pool.release", AsyncMock()),
+        patch("src.app.transcription.transcript_cache") as mock_cache,
+    ):
+        mock_cache.get.return_value = None
+        with TestClient(app) as test_client:
+            yield test_client
+    limiter.enabled = True
+
+
+class TestMetrics:
+    """Test cases for the Prometheus metrics."""
+
+    def test_metrics_endpoint(self, client):
+        """Test that /metrics serves every metric in the Prometheus text format."""
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        for name in (
+            "transcriber_stage_seconds_bucket",
+            "transcriber_bytes_in_total",
+            "transcriber_bytes_out_total",
+            "transcriber_files_in_flight",
+            "transcriber_run_dir_bytes",
+        ):
+            assert name in response.text
+
+    def test_transcription_records_stages_and_bytes(self, client):
+        """Test that a transcription updates stage histograms and byte counters."""
+        stages = ("validate", "save", "transcribe_queue", "transcribe_api", "zip")
+        before = {
+            stage: sample("transcriber_stage_seconds_count", stage=stage)
+            for stage in stages
+        }
+        bytes_in = sample("transcriber_bytes_in_total")
+        bytes_out = sample("transcriber_bytes_out_total")
+
+        audio = b"\xff\xfb" * 100
+        response = client.post(
+            "/transcribe",
+            data={"language": "en"},
+            headers={"Authorization": "Bearer sk-test"},
+            files=[("files", ("a.mp3", audio, "audio/mpeg"))],
+        )
+        assert response.status_code == 200
+        assert zipfile.ZipFile(io.BytesIO(response.content)).read("a.txt") == b"hello"
+
+        for stage in stages:
+            count = sample("transcriber_stage_seconds_count", stage=stage)
+            assert count > before[stage], stage
+        assert sample("transcriber_bytes_in_total") == bytes_in + len(audio)
+        assert sample("transcriber_bytes_out_total") == bytes_out + len(
+            response.content
+        )
+        assert sample("transcriber_files_in_flight", stage="saving") == 0
+        assert sample("transcriber_files_in_flight", stage="transcribing") == 0
+
+    def test_directory_size(self, tmp_path):
+        """Test measuring the disk usage of nested run directories."""
+        (tmp_path / "run").mkdir()
+        (tmp_path / "run" / "a.mp3").write_bytes(b"x" * 10)
+        (tmp_path / "b.txt").write_bytes(b"x" * 5)
+
+        assert directory_size(str(tmp_path)) == 15
+        assert directory_size(str(tmp_path / "missing")) == 0
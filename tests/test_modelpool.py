@@ -0,0 +1,109 @@
+import pytest
+
+from src.app import modelpool
+from src.app.modelpool import ModelWorkerPool, fork_available
+
+pytestmark = pytest.mark.skipif(not fork_available(), reason="requires fork")
+
+
+class FakeModel:
+    """A stand-in for a faster-whisper model that logs every call to a file."""
+
+    def __init__(self, log_path):
+        self.log_path = log_path
+
+    def transcribe(self, audio, language):
+        source = audio if isinstance(audio, str) else "warmup"
+        with open(self.log_path, "a") as log:
+            log.write(f"{source}\n")
+        return iter([type("Segment", (), {"text": f" {language} text "})()]), None
+
+
+@pytest.fixture
+def make_pool(tmp_path):
+    """Build pools around a FakeModel and close them after the test."""
+    pools = []
+    loads = []
+    log_path = str(tmp_path / "calls.log")
+
+    def factory(**kwargs):
+        def load_model():
+            loads.append(1)
+            return FakeModel(log_path)
+
+        pool = ModelWorkerPool(load_model, **kwargs)
+        pools.append(pool)
+        return pool
+
+    factory.loads = loads
+    factory.log_path = log_path
+    yield factory
+    for pool in pools:
+        pool.close()
+
+
+class TestModelWorkerPool:
+    """Test cases for the pre-warmed model worker pool."""
+
+    @pytest.mark.asyncio
+    async def test_workers_share_the_parents_model_and_warm_up(self, make_pool):
+        """Test that the model is loaded once in the parent and workers warm up."""
+        pool = make_pool(processes=2)
+        pool.start()
+        await pool.transcribe("/audio/a.mp3", "en")
+        result = await pool.transcribe("/audio/b.mp3", "pt")
+
+        assert result == "pt text"
+        assert len(make_pool.loads) == 1
+        with open(make_pool.log_path) as log:
+            calls = log.read().split()
+        assert calls.count("warmup") == 2
+        assert {"/audio/a.mp3", "/audio/b.mp3"} <= set(calls)
+
+    @pytest.mark.asyncio
+    async def test_workers_are_recycled(self, make_pool):
+        """Test that a worker is replaced after max_tasks_per_child tasks."""
+        pool = make_pool(processes=1, max_tasks_per_child=1, warmup=False)
+        pool.start()
+        first = await pool.health()
+        second = await pool.health()
+
+        assert first["status"] == second["status"] == "ok"
+        assert first["pids"] != second["pids"]
+        assert len(make_pool.loads) == 1
+
+    @pytest.mark.asyncio
+    async def test_workers_are_not_started_on_demand(self, make_pool):
+        """Test that running a task before start() fails instead of forking late."""
+        pool = make_pool(processes=1, warmup=False)
+
+        with pytest.raises(RuntimeError):
+            await pool.transcribe("/audio/a.mp3", "en")
+        assert not pool.started
+        assert make_pool.loads == []
+
+    @pytest.mark.asyncio
+    async def test_load_shares_the_model_without_forking(self, make_pool):
+        """Test that load() forks nothing and start() reuses the loaded model."""
+        pool = make_pool(processes=1, warmup=False)
+        pool.load()
+        assert not pool.started
+        assert len(make_pool.loads) == 1
+
+        pool.start()
+        assert await pool.transcribe("/audio/a.mp3", "en") == "en text"
+        assert len(make_pool.loads) == 1
+
+    @pytest.mark.asyncio
+    async def test_health_and_close(self, make_pool):
+        """Test that health reports a stopped pool and that close drops the model."""
+        pool = make_pool(processes=1, warmup=False)
+        assert (await pool.health())["status"] == "stopped"
+
+        pool.start()
+        await pool.transcribe("/audio/a.mp3", "en")
+        assert (await pool.health())["status"] == "ok"
+
+        pool.close()
+        assert not pool.started
+        assert modelpool._engine is None
@@ -0,0 +1,182 @@
+import os
+
+import pytest
+
+from src.app.mp3 import (
+    FrameHeader,
+    id3v2_size,
+    iter_frames,
+    parse_frame_header,
+    plan_chunks,
+    split_mp3,
+)
+
+# MPEG 1 Layer III, 128 kbps, 44.1 kHz, no padding, stereo: 417-byte frames
+HEADER_128K = bytes([0xFF, 0xFB, 0x90, 0x00])
+FRAME_LENGTH = 417
+FRAME_SECONDS = 1152 / 44100
+
+
+def make_frame(header: bytes = HEADER_128K, fill: int = 0x00) -> bytes:
+    """Build a frame with the given header and a constant payload."""
+    length = parse_frame_header(header).frame_length
+    return header + bytes([fill]) * (length - 4)
+
+
+def make_id3_tag(payload_size: int) -> bytes:
+    """Build an ID3v2 tag with a synchsafe size field."""
+    size = bytes(
+        [
+            (payload_size >> 21) & 0x7F,
+            (payload_size >> 14) & 0x7F,
+            (payload_size >> 7) & 0x7F,
+            payload_size & 0x7F,
+        ]
+    )
+    return b"ID3\x04\x00\x00" + size + b"\x00" * payload_size
+
+
+def make_xing_frame() -> bytes:
+    """Build a Xing/Info header frame as written by LAME for CBR files."""
+    frame = bytearray(make_frame())
+    frame[36:40] = b"Info"
+    return bytes(frame)
+
+
+class TestMp3:
+    """Test cases for the MP3 frame parser and chunker."""
+
+    def test_parse_frame_header(self):
+        """Test parsing an MPEG 1 Layer III header."""
+        header = parse_frame_header(HEADER_128K)
+        assert header == FrameHeader(
+            version=1,
+            layer=3,
+            bitrate=128000,
+            sample_rate=44100,
+            padding=False,
+            mono=False,
+            frame_length=FRAME_LENGTH,
+            samples=1152,
+        )
+        assert header.duration == pytest.approx(FRAME_SECONDS)
+
+    def test_parse_frame_header_padding_and_mpeg2(self):
+        """Test padding and the MPEG 2 Layer III frame size formula."""
+        padded = parse_frame_header(bytes([0xFF, 0xFB, 0x92, 0x00]))
+        assert padded.frame_length == FRAME_LENGTH + 1
+
+        # MPEG 2 Layer III, 64 kbps, 22.05 kHz, mono
+        mpeg2 = parse_frame_header(bytes([0xFF, 0xF3, 0x80, 0xC0]))
+        assert mpeg2.version == 2
+        assert mpeg2.samples == 576
+        assert mpeg2.mono is True
+        assert mpeg2.frame_length == 72 * 64000 // 22050
+
+    @pytest.mark.parametrize(
+        "data",
+        [
+            b"\x00\x00\x00\x00",  # no sync word
+            bytes([0xFF, 0xEB, 0x90, 0x00]),  # reserved MPEG version
+            bytes([0xFF, 0xF9, 0x90, 0x00]),  # reserved layer
+            bytes([0xFF, 0xFB, 0xF0, 0x00]),  # invalid bitrate index
+            bytes([0xFF, 0xFB, 0x00, 0x00]),  # free-format bitrate
+            bytes([0xFF, 0xFB, 0x9C, 0x00]),  # reserved sample rate
+            b"\xff\xfb",  # truncated
+        ],
+    )
+    def test_parse_frame_header_invalid(self, data):
+        """Test that invalid headers are rejected."""
+        assert parse_frame_header(data) is None
+
+    def test_id3v2_size(self):
+        """Test decoding the synchsafe ID3v2 tag size."""
+        assert id3v2_size(make_id3_tag(300)) == 310
+        assert id3v2_size(HEADER_128K + b"\x00" * 6) == 0
+
+    def test_iter_frames_skips_tags_and_junk(self, tmp_path):
+        """Test that ID3 tags and junk between frames are skipped."""
+        tag = make_id3_tag(100)
+        junk = b"\xff\x00junk\xff"
+        path = tmp_path / "audio.mp3"
+        path.write_bytes(tag + make_frame() * 3 + junk + make_frame() * 2)
+
+        offsets = [offset for offset, _ in iter_frames(str(path))]
+
+        first = len(tag)
+        resumed = first + 3 * FRAME_LENGTH + len(junk)
+        assert offsets == [
+            first,
+            first + FRAME_LENGTH,
+            first + 2 * FRAME_LENGTH,
+            resumed,
+            resumed + FRAME_LENGTH,
+        ]
+
+    def test_plan_chunks_by_bytes(self, tmp_path):
+        """Test that chunks end on frame boundaries below the byte limit."""
+        path = tmp_path / "audio.mp3"
+        path.write_bytes(make_frame() * 10)
+
+        chunks = plan_chunks(str(path), max_bytes=4 * FRAME_LENGTH + 10)
+
+        assert chunks == [
+            (0, 4 * FRAME_LENGTH),
+            (4 * FRAME_LENGTH, 8 * FRAME_LENGTH),
+            (8 * FRAME_LENGTH, 10 * FRAME_LENGTH),
+        ]
+
+    def test_plan_chunks_by_duration(self, tmp_path):
+        """Test that chunks also respect the duration limit."""
+        path = tmp_path / "audio.mp3"
+        path.write_bytes(make_frame() * 10)
+
+        chunks = plan_chunks(
+            str(path), max_bytes=1024 * 1024, max_seconds=5.5 * FRAME_SECONDS
+        )
+
+        assert chunks == [(0, 5 * FRAME_LENGTH), (5 * FRAME_LENGTH, 10 * FRAME_LENGTH)]
+
+    def test_plan_chunks_drops_info_frame(self, tmp_path):
+        """Test that the Xing/Info frame is not copied into any chunk."""
+        path = tmp_path / "audio.mp3"
+        path.write_bytes(make_xing_frame() + make_frame() * 4)
+
+        chunks = plan_chunks(str(path), max_bytes=1024 * 1024)
+
+        assert chunks == [(FRAME_LENGTH, 5 * FRAME_LENGTH)]
+
+    def test_split_mp3_writes_chunks(self, tmp_path):
+        """Test that split chunks concatenate back to the original audio frames."""
+        frames = [make_frame(fill=index) for index in range(9)]
+        path = tmp_path / "audio.mp3"
+        path.write_bytes(make_id3_tag(50) + b"".join(frames))
+
+        chunk_paths = split_mp3(
+            str(path), str(tmp_path / "chunks"), max_bytes=3 * FRAME_LENGTH
+        )
+
+        assert [os.path.basename(p) for p in chunk_paths] == [
+            "audio.part000.mp3",
+            "audio.part001.mp3",
+            "audio.part002.mp3",
+        ]
+        contents = [open(p, "rb").read() for p in chunk_paths]
+        assert all(len(content) <= 3 * FRAME_LENGTH for content in contents)
+        assert b"".join(contents) == b"".join(frames)
+
+    def test_split_mp3_small_file_not_copied(self, tmp_path):
+        """Test that a file below the limit is returned without copying."""
+        path = tmp_path / "audio.mp3"
+        path.write_bytes(make_frame() * 3)
+
+        assert split_mp3(str(path), str(tmp_path / "chunks"), 4096) == [str(path)]
+        assert not (tmp_path / "chunks").exists()
+
+    def test_split_mp3_without_frames(self, tmp_path):
+        """Test that a file without MP3 frames cannot be split."""
+        path = tmp_path / "audio.mp3"
+        path.write_bytes(b"not an mp3 file" * 100)
+
+        with pytest.raises(ValueError, match="No MP3 audio frames"):
+            split_mp3(str(path), str(tmp_path / "chunks"), 100)
@@ -0,0 +1,161 @@
+import asyncio
+import random
+import time
+from unittest.mock import AsyncMock
+
+import httpx
+import openai
+import pytest
+
+from src.app.concurrency import AIMDLimiter
+from src.app.retry import RetryPolicy, is_retryable, parse_duration, retry_after
+
+
+def api_error(status_code, headers=None):
+    """Build the OpenAI SDK error raised for an HTTP status code."""
+    request = httpx.Request("POST", "https://api.openai.com/v1/audio/transcriptions")
+    response = httpx.Response(status_code, headers=headers or {}, request=request)
+    error_class = {
+        401: openai.AuthenticationError,
+        429: openai.RateLimitError,
+    }.get(status_code, openai.InternalServerError)
+    return error_class("error", response=response, body=None)
+
+
+def fast_policy(**kwargs):
+    """A policy with no backoff delay so tests don't sleep."""
+    return RetryPolicy(
+        **{"base_delay": 0.0, "max_delay": 0.0, "rng": random.Random(0), **kwargs}
+    )
+
+
+class TestRetryHints:
+    """Test cases for parsing server retry hints."""
+
+    def test_parse_duration(self):
+        """Test plain seconds and Go-style durations."""
+        assert parse_duration("2") == 2.0
+        assert parse_duration("1.5s") == 1.5
+        assert parse_duration("20ms") == 0.02
+        assert parse_duration("6m0s") == 360.0
+        assert parse_duration("1h2m3.5s") == 3723.5
+        assert parse_duration("soon") is None
+
+    def test_retry_after_headers(self):
+        """Test Retry-After, retry-after-ms and exhausted x-ratelimit-reset-* headers."""
+        assert retry_after(httpx.Headers({"retry-after": "3"})) == 3.0
+        assert retry_after(httpx.Headers({"retry-after-ms": "250"})) == 0.25
+        assert (
+            retry_after(
+                httpx.Headers(
+                    {
+                        "x-ratelimit-remaining-requests": "0",
+                        "x-ratelimit-reset-requests": "1.2s",
+                        "x-ratelimit-remaining-tokens": "5000",
+                        "x-ratelimit-reset-tokens": "30s",
+                    }
+                )
+            )
+            == 1.2
+        )
+        assert retry_after(httpx.Headers({"x-ratelimit-reset-requests": "1s"})) is None
+
+    def test_is_retryable(self):
+        """Test that only transient errors are retried."""
+        assert is_retryable(api_error(429))
+        assert is_retryable(api_error(503))
+        assert is_retryable(
+            openai.APIConnectionError(request=httpx.Request("POST", "https://x"))
+        )
+        assert not is_retryable(api_error(401))
+        assert not is_retryable(ValueError("bad audio"))
+
+
+class TestRetryPolicy:
+    """Test cases for the retry policy."""
+
+    def test_backoff_is_capped_and_jittered(self):
+        """Test that delays stay within the exponential window and the cap."""
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0, rng=random.Random(0))
+        delays = [
+            policy.backoff(attempt) for attempt in range(1, 10) for _ in range(20)
+        ]
+
+        assert all(0 <= delay <= 5.0 for delay in delays)
+        assert all(policy.backoff(1) <= 1.0 for _ in range(20))
+        assert len(set(delays)) > 1
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_errors(self):
+        """Test that a request failing transiently eventually succeeds."""
+        request = AsyncMock(side_effect=[api_error(429), api_error(500), "text"])
+
+        assert await fast_policy().call(request) == "text"
+        assert request.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_does_not_retry_permanent_errors(self):
+        """Test that an authentication error is raised immediately."""
+        request = AsyncMock(side_effect=api_error(401))
+
+        with pytest.raises(openai.AuthenticationError):
+            await fast_policy().call(request)
+        assert request.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_attempts(self):
+        """Test that the last error is raised once attempts are exhausted."""
+        request = AsyncMock(side_effect=api_error(503))
+
+        with pytest.raises(openai.InternalServerError):
+            await fast_policy(max_attempts=3).call(request)
+        assert request.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_waits_for_retry_after(self):
+        """Test that the server's Retry-After overrides a shorter backoff."""
+        request = AsyncMock(
+            side_effect=[api_error(429, {"retry-after-ms": "100"}), "text"]
+        )
+
+        start = time.monotonic()
+        assert await fast_policy().call(request) == "text"
+        assert time.monotonic() - start >= 0.1
+
+    @pytest.mark.asyncio
+    async def test_does_not_wait_past_deadline(self):
+        """Test that a hint longer than the remaining deadline fails fast."""
+        request = AsyncMock(side_effect=api_error(429, {"retry-after": "60"}))
+
+        start = time.monotonic()
+        with pytest.raises(openai.RateLimitError):
+            await fast_policy(deadline=5.0).call(request)
+        assert time.monotonic() - start < 1.0
+        assert request.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_deadline_bounds_slow_attempts(self):
+        """Test that an attempt still running at the deadline is cancelled."""
+
+        async def slow_request():
+            await asyncio.sleep(10)
+
+        with pytest.raises(TimeoutError):
+            await fast_policy(deadline=0.05).call(slow_request)
+
+    @pytest.mark.asyncio
+    async def test_deadline_starts_once_a_slot_is_held(self):
+        """Test that calls queued behind a full limiter don't time out while waiting."""
+        limiter = AIMDLimiter(initial=1, min_limit=1, max_limit=1)
+        policy = fast_policy(deadline=0.1)
+
+        async def request():
+            await asyncio.sleep(0.06)
+            return "text"
+
+        results = await asyncio.gather(
+            *(policy.call(request, slot=limiter.slot) for _ in range(3)),
+            return_exceptions=True,
+        )
+
+        assert results == ["text", "text", "text"]
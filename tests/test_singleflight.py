@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from src.app.singleflight import SingleFlight
+
+
+class TestSingleFlight:
+    """Test cases for singleflight coalescing."""
+
+    @pytest.mark.asyncio
+    async def test_coalesces_concurrent_calls(self):
+        """Test that concurrent callers of one key share a single call."""
+        flight: SingleFlight[str] = SingleFlight()
+        calls = 0
+
+        async def work():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return "result"
+
+        results = await asyncio.gather(*(flight.do("key", work) for _ in range(5)))
+
+        assert results == ["result"] * 5
+        assert calls == 1
+        assert len(flight) == 0
+
+    @pytest.mark.asyncio
+    async def test_separate_keys_and_later_calls_run_again(self):
+        """Test that other keys, and calls after completion, are not coalesced."""
+        flight: SingleFlight[str] = SingleFlight()
+        calls = []
+
+        async def work(name):
+            calls.append(name)
+            await asyncio.sleep(0)
+            return name
+
+        assert await asyncio.gather(
+            flight.do("a", lambda: work("a")), flight.do("b", lambda: work("b"))
+        ) == ["a", "b"]
+        assert await flight.do("a", lambda: work("a")) == "a"
+        assert calls == ["a", "b", "a"]
+
+    @pytest.mark.asyncio
+    async def test_errors_are_shared(self):
+        """Test that every waiter sees the shared call's exception."""
+        flight: SingleFlight[str] = SingleFlight()
+
+        async def fail():
+            await asyncio.sleep(0.01)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            flight.do("key", fail), flight.do("key", fail), return_exceptions=True
+        )
+
+        assert [type(result) for result in results] == [ValueError, ValueError]
+        assert len(flight) == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelling_one_waiter_keeps_call_running(self):
+        """Test that the shared call survives while another caller still waits."""
+        flight: SingleFlight[str] = SingleFlight()
+        release = asyncio.Event()
+
+        async def work():
+            await release.wait()
+            return "result"
+
+        first = asyncio.create_task(flight.do("key", work))
+        second = asyncio.create_task(flight.do("key", work))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await second == "result"
+        assert first.cancelled()
+
+    @pytest.mark.asyncio
+    async def test_cancelling_every_waiter_cancels_call(self):
+        """Test that the shared call is cancelled once its last caller has gone."""
+        flight: SingleFlight[str] = SingleFlight()
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def work():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return "result"
+
+        waiters = [asyncio.create_task(flight.do("key", work)) for _ in range(2)]
+        await started.wait()
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+
+        await asyncio.wait_for(cancelled.wait(), timeout=1)
+        assert len(flight) == 0
@@ -0,0 +1,73 @@
+from unittest.mock import patch
+
+import pytest
+
+from src.app.storage import DiskUsage, StorageFullError, StorageGovernor
+
+
+@pytest.fixture
+def governor():
+    """A governor for a 1000 byte volume with 500 bytes used."""
+    storage = StorageGovernor(
+        "/runs", high_watermark=0.8, low_watermark=0.6, retry_after=7
+    )
+    with patch.object(storage, "disk_usage", return_value=DiskUsage(1000, 500)):
+        yield storage
+
+
+class TestStorageGovernor:
+    """Test cases for the storage governor."""
+
+    def test_reserve_below_high_watermark(self, governor):
+        """Test that runs are admitted while they fit below the high watermark."""
+        governor.reserve("/runs/a", 200)
+        governor.reserve("/runs/b", 100)
+
+        assert governor.reserved_bytes == 300
+
+    def test_reservations_count_against_the_watermark(self, governor):
+        """Test that bytes reserved but not yet written keep out further runs."""
+        governor.reserve("/runs/a", 250)
+
+        with pytest.raises(StorageFullError) as excinfo:
+            governor.reserve("/runs/b", 100)
+        assert excinfo.value.retry_after == 7
+
+    def test_commit_moves_reserved_to_used(self, governor):
+        """Test that written bytes draw down the reservation."""
+        governor.reserve("/runs/a", 200)
+        governor.commit("/runs/a", 150)
+
+        assert governor.reserved_bytes == 50
+        assert governor.used_bytes == 150
+
+        governor.settle("/runs/a")
+        assert governor.reserved_bytes == 0
+        assert governor.used_bytes == 150
+
+        governor.release("/runs/a")
+        assert governor.used_bytes == 0
+
+    def test_pressure_and_bytes_to_free(self, governor):
+        """Test the pressure check and how much eviction must free."""
+        assert not governor.under_pressure()
+        assert governor.bytes_to_free() == 0
+
+        governor.disk_usage.return_value = DiskUsage(1000, 900)
+
+        assert governor.under_pressure()
+        assert governor.bytes_to_free() == 300
+
+    def test_unmeasurable_disk_admits(self):
+        """Test that runs are admitted if disk usage can't be measured."""
+        storage = StorageGovernor("/runs")
+        with patch.object(storage, "disk_usage", side_effect=OSError("gone")):
+            storage.reserve("/runs/a", 10**12)
+
+        assert storage.reserved_bytes == 10**12
+
+    def test_disk_usage_of_missing_directory(self, tmp_path):
+        """Test that a runs directory that doesn't exist yet is measured through its parent."""
+        usage = StorageGovernor(str(tmp_path / "missing" / "runs")).disk_usage()
+
+        assert usage.total > 0
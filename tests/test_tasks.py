@@ -1,14 +1,45 @@
+import asyncio
+import os
+import shutil
+import time
 from unittest.mock import Mock, patch
 
+import pytest
+
 from src.app.tasks import (
     MAX_AGE_SECONDS,
     TEMP_DIR,
+    ExpiryIndex,
+    LoopLagMonitor,
+    RunDeleter,
+    add_run_guard,
+    cleanup_activity,
     cleanup_old_files,
+    evict_runs,
+    expire_artifacts,
+    expire_runs,
+    mark_run_active,
+    mark_run_inactive,
+    relieve_storage_pressure,
+    run_deleter,
+    run_expiry,
+    schedule_run_expiry,
     shutdown_scheduler,
     start_scheduler,
 )
 
 
+@pytest.fixture
+def run_dir(tmp_path):
+    """A run directory last modified long ago, with an empty expiry index."""
+    path = tmp_path / "run"
+    path.mkdir()
+    os.utime(path, (0, 0))
+    run_expiry.clear()
+    yield str(path)
+    run_expiry.clear()
+
+
 class TestTasks:
     """Test cases for the tasks module."""
 
@@ -20,47 +51,225 @@ class TestTasks:
         """Test that MAX_AGE_SECONDS is set to 5 minutes."""
         assert MAX_AGE_SECONDS == 5 * 60
 
-    @patch("src.app.tasks.os.path.exists")
-    @patch("src.app.tasks.os.listdir")
-    @patch("src.app.tasks.os.stat")
-    @patch("src.app.tasks.shutil.rmtree")
-    def test_cleanup_old_files(self, mock_rmtree, mock_stat, mock_listdir, mock_exists):
-        """Test the cleanup_old_files function."""
-        # Setup mocks
-        mock_exists.return_value = True
-        mock_listdir.return_value = ["dir1", "dir2"]
-
-        # Create a mock stat result with a modification time that's older than MAX_AGE_SECONDS
-        old_time = Mock()
-        old_time.st_mtime = 0  # Very old timestamp
-        mock_stat.return_value = old_time
-
-        # Mock os.path.isdir to return True
-        with patch("src.app.tasks.os.path.isdir", return_value=True):
-            # Run the function
+    def test_cleanup_old_files(self, tmp_path):
+        """Test that cleanup deletes old directories and leaves files alone."""
+        for name in ("dir1", "dir2"):
+            (tmp_path / name).mkdir()
+            os.utime(tmp_path / name, (0, 0))
+        (tmp_path / "stray.txt").write_text("not a run")
+
+        with (
+            patch("src.app.tasks.TEMP_DIR", str(tmp_path)),
+            patch("src.app.tasks.shutil.rmtree", wraps=shutil.rmtree) as mock_rmtree,
+        ):
             cleanup_old_files()
+            run_deleter.wait(5)
 
-            # Assertions
-            assert mock_exists.called
-            assert mock_listdir.called
-            assert mock_stat.call_count == 2  # Called for each directory
-            assert mock_rmtree.call_count == 2  # Called for each directory
+        assert os.listdir(tmp_path) == ["stray.txt"]
+        # Deletions happen on the run deleter's threads
+        assert mock_rmtree.call_count == 2
 
     @patch("src.app.tasks.os.makedirs")
+    @patch("src.app.tasks.lag_monitor")
     @patch("src.app.tasks.scheduler")
-    def test_start_scheduler(self, mock_scheduler, mock_makedirs):
+    def test_start_scheduler(self, mock_scheduler, mock_lag_monitor, mock_makedirs):
         """Test the start_scheduler function."""
         start_scheduler()
 
         # Assertions
         mock_makedirs.assert_called_once_with(TEMP_DIR, exist_ok=True)
-        mock_scheduler.add_job.assert_called_once()
+        scheduled = [call.args[0] for call in mock_scheduler.add_job.call_args_list]
+        assert scheduled == [expire_runs, relieve_storage_pressure, cleanup_old_files]
         mock_scheduler.start.assert_called_once()
+        mock_lag_monitor.start.assert_called_once()
 
+    @patch("src.app.tasks.run_deleter")
+    @patch("src.app.tasks.lag_monitor")
     @patch("src.app.tasks.scheduler")
-    def test_shutdown_scheduler(self, mock_scheduler):
+    def test_shutdown_scheduler(
+        self, mock_scheduler, mock_lag_monitor, mock_run_deleter
+    ):
         """Test the shutdown_scheduler function."""
         shutdown_scheduler()
 
         # Assertions
         mock_scheduler.shutdown.assert_called_once()
+        mock_lag_monitor.stop.assert_called_once()
+        mock_run_deleter.shutdown.assert_called_once()
+
+    def test_cleanup_keeps_guarded_runs(self, tmp_path):
+        """Test that cleanup keeps the run directories a run guard returns."""
+        for name in ("queued", "old"):
+            (tmp_path / name).mkdir()
+            os.utime(tmp_path / name, (0, 0))
+
+        with (
+            patch("src.app.tasks.TEMP_DIR", str(tmp_path)),
+            patch("src.app.tasks._run_guards", []),
+        ):
+            add_run_guard(lambda: {str(tmp_path / "queued")})
+            cleanup_old_files()
+            run_deleter.wait(5)
+
+        assert os.listdir(tmp_path) == ["queued"]
+
+    @patch("src.app.tasks.os.path.exists", return_value=True)
+    @patch("src.app.tasks.os.listdir", return_value=["old"])
+    @patch("src.app.tasks.shutil.rmtree")
+    def test_cleanup_skipped_when_guard_fails(self, mock_rmtree, *mocks):
+        """Test that nothing is deleted when a run guard can't tell what to keep."""
+        with patch("src.app.tasks._run_guards", [Mock(side_effect=RuntimeError("db"))]):
+            cleanup_old_files()
+
+        mock_rmtree.assert_not_called()
+
+    def test_expiry_index_pops_due_in_deadline_order(self):
+        """Test that only due directories are popped, and rescheduling replaces a deadline."""
+        index = ExpiryIndex()
+        index.schedule("b", 20)
+        index.schedule("a", 10)
+        index.schedule("c", 30)
+        index.schedule("c", 15)
+        index.schedule("b", 40)
+
+        assert index.pop_due(25) == ["a", "c"]
+        assert len(index) == 1
+        assert index.pop_due(50) == ["b"]
+        assert index.pop_due(100) == []
+
+    def test_expire_runs_deletes_due_runs(self, run_dir):
+        """Test that a sweep deletes a directory once its deadline has passed."""
+        schedule_run_expiry(run_dir, time.time() - 1)
+
+        with patch("src.app.tasks._scan_runs") as mock_scan_runs:
+            expire_runs()
+            run_deleter.wait(5)
+
+        assert not os.path.exists(run_dir)
+        # The sweep never lists the runs directory
+        mock_scan_runs.assert_not_called()
+
+    def test_expire_runs_skips_runs_not_due(self, run_dir):
+        """Test that a sweep leaves directories whose deadline is still ahead."""
+        schedule_run_expiry(run_dir)
+
+        expire_runs()
+
+        assert os.path.exists(run_dir)
+        assert len(run_expiry) == 1
+
+    def test_expire_runs_reschedules_touched_runs(self, run_dir):
+        """Test that a directory modified since it was scheduled is kept and rescheduled."""
+        schedule_run_expiry(run_dir, time.time() - 1)
+        os.utime(run_dir)
+
+        expire_runs()
+
+        assert os.path.exists(run_dir)
+        assert len(run_expiry) == 1
+
+    def test_active_run_is_kept_until_released(self, run_dir):
+        """Test that an active run survives its deadline and is rescheduled when released."""
+        mark_run_active(run_dir)
+        with patch(
+            "src.app.tasks.time.time", return_value=time.time() + MAX_AGE_SECONDS + 1
+        ):
+            expire_runs()
+        assert os.path.exists(run_dir)
+        assert len(run_expiry) == 0
+
+        mark_run_inactive(run_dir)
+        assert len(run_expiry) == 1
+
+    def test_cleanup_schedules_runs_not_yet_expired(self, tmp_path):
+        """Test that the reconciliation scan adds recent directories to the expiry index."""
+        (tmp_path / "recent").mkdir()
+        run_expiry.clear()
+        with patch("src.app.tasks.TEMP_DIR", str(tmp_path)):
+            cleanup_old_files()
+
+        assert (tmp_path / "recent").exists()
+        assert len(run_expiry) == 1
+        run_expiry.clear()
+
+    def test_evict_runs_oldest_first_until_enough_is_free(self, tmp_path):
+        """Test that eviction deletes unprotected runs, oldest first, until enough is freed."""
+        for name, mtime in [("new", 300), ("old", 100), ("active", 0), ("middle", 200)]:
+            (tmp_path / name).mkdir()
+            os.utime(tmp_path / name, (mtime, mtime))
+        # Two evictions bring the disk back under the low watermark
+        to_free = iter([10, 10, 5, 0])
+
+        with (
+            patch("src.app.tasks.TEMP_DIR", str(tmp_path)),
+            patch(
+                "src.app.tasks.storage_governor.bytes_to_free",
+                side_effect=lambda: next(to_free),
+            ),
+            patch("src.app.tasks._active_runs", {str(tmp_path / "active")}),
+        ):
+            assert evict_runs() == 2
+
+        assert sorted(os.listdir(tmp_path)) == ["active", "new"]
+
+    def test_evict_runs_without_pressure(self, tmp_path):
+        """Test that nothing is evicted while the disk is below the low watermark."""
+        (tmp_path / "old").mkdir()
+        with (
+            patch("src.app.tasks.TEMP_DIR", str(tmp_path)),
+            patch("src.app.tasks.storage_governor.bytes_to_free", return_value=0),
+        ):
+            assert evict_runs() == 0
+
+        assert os.listdir(tmp_path) == ["old"]
+
+    def test_run_deleter_caps_deletion_rate(self, tmp_path):
+        """Test that the run deleter starts no more than max_per_second deletions a second."""
+        deleter = RunDeleter(workers=3, max_per_second=20)
+        paths = []
+        for index in range(4):
+            (tmp_path / str(index)).mkdir()
+            paths.append(str(tmp_path / str(index)))
+
+        start = time.monotonic()
+        futures = [deleter.submit(path) for path in paths]
+        # A second request for a queued directory shares its deletion
+        assert deleter.submit(paths[-1]) is futures[-1]
+        deleter.wait(5)
+        deleter.shutdown()
+
+        assert os.listdir(tmp_path) == []
+        assert time.monotonic() - start >= 3 / 20
+
+    async def test_lag_monitor_records_blocked_loop(self):
+        """Test that blocking the event loop shows up as lag while cleanup runs."""
+        monitor = LoopLagMonitor(interval=0.01)
+        with patch("src.app.tasks.EVENT_LOOP_LAG") as mock_lag:
+            monitor.start()
+            await asyncio.sleep(0)
+            with cleanup_activity:
+                time.sleep(0.1)
+            await asyncio.sleep(0.05)
+            monitor.stop()
+
+        first = mock_lag.labels.call_args_list[0].args[0]
+        assert first == "running"
+        assert mock_lag.labels.return_value.observe.call_args_list[0].args[0] >= 0.05
+
+    def test_expire_artifacts_deletes_old_unprotected_runs(self):
+        """Test that old runs are deleted from a store outside TEMP_DIR unless a guard keeps them."""
+        store = Mock()
+        store.list_runs.return_value = {
+            "old": 0.0,
+            "queued": 0.0,
+            "recent": time.time(),
+        }
+
+        with (
+            patch("src.app.tasks.artifact_store", store),
+            patch("src.app.tasks._run_guards", []),
+        ):
+            add_run_guard(lambda: {os.path.join(TEMP_DIR, "queued")})
+            expire_artifacts()
+
+        store.delete_run.assert_called_once_with("old")
@@ -1,33 +1,57 @@
+import asyncio
+import hashlib
+import io
 import os
 import tempfile
-from unittest.mock import Mock
+import time
+import tracemalloc
+from unittest.mock import AsyncMock, Mock, patch
 
+import httpx
 import pytest
-from fastapi import HTTPException
+from fastapi import HTTPException, UploadFile
+from openai import AsyncOpenAI, RateLimitError
 from starlette.requests import Request
 
+from src.app.cache import TranscriptCache
+from src.app.retry import RetryPolicy
 from src.app.transcription import (
     MAX_FILE_SIZE,
-    MAX_FILES_LIMIT,
-    SUPPORTED_LANGUAGES,
+    SavedFile,
     handle_transcription,
+    iter_results,
+    process_files,
+    save_file,
     transcribe_file,
 )
 
 
-class TestTranscription:
-    """Test cases for the transcription module."""
+async def _peak_memory_for_save(tmp_path, size: int, chunk_size: int) -> int:
+    """Save an upload of the given size and return the peak traced allocation."""
+    spool = tempfile.TemporaryFile()
+    block = b"\xff" * (1024 * 1024)
+    for _ in range(size // len(block)):
+        spool.write(block)
+    spool.seek(0)
+    upload = UploadFile(file=spool, filename=f"audio_{size}.mp3")
+
+    run_path = tmp_path / str(size)
+    run_path.mkdir()
+    tracemalloc.start()
+    try:
+        saved = await save_file(upload, str(run_path), 0, chunk_size=chunk_size)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        spool.close()
 
-    def test_supported_languages(self):
-        """Test that supported languages are correctly defined."""
-        assert "en" in SUPPORTED_LANGUAGES
-        assert "pt" in SUPPORTED_LANGUAGES
-        assert SUPPORTED_LANGUAGES["en"] == "English"
-        assert SUPPORTED_LANGUAGES["pt"] == "Portuguese"
+    assert saved is not None
+    assert saved.size == os.path.getsize(saved.path) == size
+    return peak
 
-    def test_max_files_limit(self):
-        """Test that the maximum files limit is set."""
-        assert MAX_FILES_LIMIT == 5
+
+class TestTranscription:
+    """Test cases for the transcription module."""
 
     def test_max_file_size(self):
         """Test that the maximum file size is set correctly (100MB)."""
@@ -54,8 +78,263 @@ class TestTranscription:
             os.unlink(tmp_file_path)
 
     @pytest.mark.asyncio
-    async def test_handle_transcription_invalid_language(self):
-        """Test handle_transcription with an invalid language."""
+    async def test_transcribe_file_async_client(self):
+        """Test that AsyncOpenAI clients are awaited without a worker thread."""
+        mock_client = Mock(spec=AsyncOpenAI)
+        mock_client.audio = Mock()
+        mock_client.audio.transcriptions.create = AsyncMock(
+            return_value=Mock(text="Async transcription")
+        )
+
+        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp_file:
+            tmp_file.write(b"test audio content")
+            tmp_file_path = tmp_file.name
+
+        try:
+            with patch("src.app.transcription.asyncio.to_thread") as mock_to_thread:
+                result = await transcribe_file(mock_client, tmp_file_path, "en")
+            assert result == "Async transcription"
+            mock_client.audio.transcriptions.create.assert_awaited_once()
+            mock_to_thread.assert_not_called()
+        finally:
+            os.unlink(tmp_file_path)
+
+    @pytest.mark.asyncio
+    async def test_transcribe_file_retries_rate_limits(self, tmp_path):
+        """Test that a 429 is retried and the whole file is uploaded again."""
+        request = httpx.Request(
+            "POST", "https://api.openai.com/v1/audio/transcriptions"
+        )
+        rate_limited = RateLimitError(
+            "rate limited", response=httpx.Response(429, request=request), body=None
+        )
+        uploads = []
+
+        async def create(model, file, language):
+            uploads.append(file.read())
+            if len(uploads) == 1:
+                raise rate_limited
+            return Mock(text="Retried transcription")
+
+        mock_client = Mock(spec=AsyncOpenAI)
+        mock_client.audio = Mock()
+        mock_client.audio.transcriptions.create = create
+        file_path = tmp_path / "audio.mp3"
+        file_path.write_bytes(b"test audio content")
+
+        policy = RetryPolicy(base_delay=0.0, max_delay=0.0)
+        with patch("src.app.transcription.retry_policy", policy):
+            result = await transcribe_file(mock_client, str(file_path), "en")
+
+        assert result == "Retried transcription"
+        assert uploads == [b"test audio content", b"test audio content"]
+
+    @pytest.mark.asyncio
+    async def test_transcribe_file_splits_large_files(self, tmp_path):
+        """Test that files over the chunk limit are split and stitched in order."""
+        frame = bytes([0xFF, 0xFB, 0x90, 0x00]) + b"\x00" * 413
+        file_path = tmp_path / "long.mp3"
+        file_path.write_bytes(frame * 6)
+
+        async def fake_transcribe_chunk(client, chunk_path, language):
+            # Finish the chunks out of order to check the stitching order
+            part = int(chunk_path[-7:-4])
+            await asyncio.sleep(0.01 * (3 - part))
+            return f" part {part} "
+
+        with (
+            patch("src.app.transcription.CHUNK_MAX_BYTES", 2 * len(frame)),
+            patch(
+                "src.app.transcription.transcribe_chunk",
+                side_effect=fake_transcribe_chunk,
+            ) as mock_transcribe_chunk,
+        ):
+            result = await transcribe_file(Mock(), str(file_path), "en")
+
+        assert result == "part 0 part 1 part 2"
+        assert mock_transcribe_chunk.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_save_file_computes_sha256(self, tmp_path):
+        """Test that save_file hashes the upload while streaming it to disk."""
+        content = b"\xff\xfb" * 5000
+        upload = UploadFile(file=io.BytesIO(content), filename="audio.mp3")
+
+        saved = await save_file(upload, str(tmp_path), 3, chunk_size=1000)
+
+        assert saved == SavedFile(
+            str(tmp_path / "audio.mp3"),
+            3,
+            "audio.txt",
+            hashlib.sha256(content).hexdigest(),
+            len(content),
+        )
+
+    @pytest.mark.asyncio
+    async def test_transcribe_file_uses_cache(self, tmp_path):
+        """Test that a cached transcript is returned without calling the API."""
+        file_path = tmp_path / "audio.mp3"
+        file_path.write_bytes(b"test audio content")
+        mock_client = Mock()
+        mock_client.audio.transcriptions.create.return_value = Mock(text="Fresh")
+        cache = TranscriptCache(str(tmp_path / "cache.sqlite3"))
+
+        with patch("src.app.transcription.transcript_cache", cache):
+            first = await transcribe_file(mock_client, str(file_path), "en", "abc")
+            second = await transcribe_file(mock_client, str(file_path), "en", "abc")
+
+        assert first == second == "Fresh"
+        mock_client.audio.transcriptions.create.assert_called_once()
+        assert (cache.hits, cache.misses) == (1, 1)
+        cache.close()
+
+    @pytest.mark.asyncio
+    async def test_transcribe_file_coalesces_identical_audio(self, tmp_path):
+        """Test that concurrent transcriptions of identical audio make one API call."""
+        mock_client = Mock()
+        mock_client.audio.transcriptions.create.return_value = Mock(text="Shared")
+        paths = []
+        for name in ("a.mp3", "b.mp3"):
+            path = tmp_path / name
+            path.write_bytes(b"same audio")
+            paths.append(str(path))
+        content_hash = hashlib.sha256(b"same audio").hexdigest()
+
+        with patch("src.app.transcription.transcript_cache") as mock_cache:
+            mock_cache.get.return_value = None
+            mock_cache.make_key.return_value = f"{content_hash}:en:whisper-1"
+            results = await asyncio.gather(
+                *(
+                    transcribe_file(mock_client, path, "en", content_hash)
+                    for path in paths
+                )
+            )
+
+        assert results == ["Shared", "Shared"]
+        mock_client.audio.transcriptions.create.assert_called_once()
+        mock_cache.put.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_transcribe_file_reruns_when_shared_input_is_removed(self, tmp_path):
+        """Test that a caller re-runs a shared transcription whose file was deleted."""
+        request = httpx.Request(
+            "POST", "https://api.openai.com/v1/audio/transcriptions"
+        )
+        rate_limited = RateLimitError(
+            "rate limited", response=httpx.Response(429, request=request), body=None
+        )
+        uploads = []
+
+        async def create(model, file, language):
+            uploads.append(file.name)
+            if len(uploads) == 1:
+                # The first caller's client goes away and its run is deleted
+                os.remove(file.name)
+                raise rate_limited
+            return Mock(text="Shared")
+
+        mock_client = Mock(spec=AsyncOpenAI)
+        mock_client.audio = Mock()
+        mock_client.audio.transcriptions.create = create
+        paths = []
+        for name in ("a.mp3", "b.mp3"):
+            path = tmp_path / name
+            path.write_bytes(b"same audio")
+            paths.append(str(path))
+        content_hash = hashlib.sha256(b"same audio").hexdigest()
+
+        policy = RetryPolicy(base_delay=0.0, max_delay=0.0)
+        with (
+            patch("src.app.transcription.retry_policy", policy),
+            patch("src.app.transcription.transcript_cache") as mock_cache,
+        ):
+            mock_cache.get.return_value = None
+            mock_cache.make_key.return_value = f"{content_hash}:en:whisper-1"
+            results = await asyncio.gather(
+                *(
+                    transcribe_file(mock_client, path, "en", content_hash)
+                    for path in paths
+                ),
+                return_exceptions=True,
+            )
+
+        removed = paths.index(uploads[0])
+        assert isinstance(results[removed], FileNotFoundError)
+        assert results[1 - removed] == "Shared"
+        assert uploads[-1] == paths[1 - removed]
+
+    @pytest.mark.asyncio
+    async def test_save_file_streams_in_chunks(self, tmp_path):
+        """Test that save_file peak memory stays flat regardless of file size."""
+        chunk_size = 64 * 1024
+        # Warm up the thread pool so its one-off allocations are not measured
+        await _peak_memory_for_save(tmp_path, 1024 * 1024, chunk_size)
+
+        small_peak = await _peak_memory_for_save(tmp_path, 2 * 1024 * 1024, chunk_size)
+        large_peak = await _peak_memory_for_save(tmp_path, 32 * 1024 * 1024, chunk_size)
+
+        assert large_peak < 8 * chunk_size
+        assert large_peak < small_peak + 2 * chunk_size
+
+    @pytest.mark.asyncio
+    async def test_process_files_pipelines_save_and_transcribe(self, tmp_path):
+        """Test that a fast file is transcribed without waiting for a slow save."""
+        events = {}
+
+        async def fake_save(file, run_path, index):
+            # The first file takes much longer to save than the second
+            await asyncio.sleep(0.2 if index == 0 else 0.01)
+            events[f"saved_{index}"] = time.monotonic()
+            return SavedFile(f"{run_path}/{index}.mp3", index, f"{index}.txt", "", 1)
+
+        async def fake_transcribe(client, file_path, language, content_hash):
+            index = os.path.basename(file_path).split(".")[0]
+            events[f"transcribing_{index}"] = time.monotonic()
+            return f"text {index}"
+
+        files = [Mock(filename="slow.mp3"), Mock(filename="fast.mp3")]
+        with (
+            patch("src.app.transcription.validate_file", return_value=None),
+            patch("src.app.transcription.save_file", side_effect=fake_save),
+            patch("src.app.transcription.transcribe_file", side_effect=fake_transcribe),
+        ):
+            results, output_filenames, errors = await process_files(
+                files, str(tmp_path), Mock(), "en"
+            )
+
+        assert results == {0: "text 0", 1: "text 1"}
+        assert output_filenames == {0: "0.txt", 1: "1.txt"}
+        assert errors == []
+        assert events["transcribing_1"] < events["saved_0"]
+
+    @pytest.mark.asyncio
+    async def test_iter_results_yields_in_completion_order(self):
+        """Test that ZIP entries are produced as soon as each transcription finishes."""
+
+        async def transcribe(delay, text):
+            await asyncio.sleep(delay)
+            if text is None:
+                raise RuntimeError("boom")
+            return text
+
+        tasks = {
+            0: asyncio.create_task(transcribe(0.1, "slow")),
+            1: asyncio.create_task(transcribe(0.01, "fast")),
+            2: asyncio.create_task(transcribe(0.05, None)),
+        }
+        output_filenames = {0: "slow.txt", 1: "fast.txt", 2: "bad.txt"}
+
+        entries = [entry async for entry in iter_results(tasks, output_filenames)]
+
+        assert entries == [
+            ("fast.txt", b"fast"),
+            ("bad.txt", b"Error transcribing file: boom\n"),
+            ("slow.txt", b"slow"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_handle_transcription_missing_language(self):
+        """Test handle_transcription without a language."""
         # Create a proper Request object
         mock_scope = {
             "type": "http",
@@ -65,18 +344,18 @@ class TestTranscription:
             "headers": [],
         }
         mock_request = Request(mock_scope)
-        mock_files = []
+        mock_files = [Mock()]
 
         with pytest.raises(HTTPException) as exc_info:
             await handle_transcription(
                 request=mock_request,
-                language="es",  # Spanish is not supported
+                language="",
                 authorization="Bearer test-key",
                 files=mock_files,
             )
 
         assert exc_info.value.status_code == 400
-        assert "Unsupported language" in str(exc_info.value.detail)
+        assert "Language parameter is required" in str(exc_info.value.detail)
 
     @pytest.mark.asyncio
     async def test_handle_transcription_missing_auth_header(self):
@@ -90,7 +369,7 @@ class TestTranscription:
             "headers": [],
         }
         mock_request = Request(mock_scope)
-        mock_files = []
+        mock_files = [Mock()]
 
         with pytest.raises(HTTPException) as exc_info:
             await handle_transcription(
@@ -101,7 +380,9 @@ class TestTranscription:
             )
 
         assert exc_info.value.status_code == 400
-        assert "API key must be provided" in str(exc_info.value.detail)
+        assert "Authorization header with Bearer token is required" in str(
+            exc_info.value.detail
+        )
 
     @pytest.mark.asyncio
     async def test_handle_transcription_invalid_auth_header(self):
@@ -115,7 +396,7 @@ class TestTranscription:
             "headers": [],
         }
         mock_request = Request(mock_scope)
-        mock_files = []
+        mock_files = [Mock()]
 
         with pytest.raises(HTTPException) as exc_info:
             await handle_transcription(
@@ -126,11 +407,11 @@ class TestTranscription:
             )
 
         assert exc_info.value.status_code == 400
-        assert "API key must be provided" in str(exc_info.value.detail)
+        assert "must start with 'Bearer '" in str(exc_info.value.detail)
 
     @pytest.mark.asyncio
-    async def test_handle_transcription_too_many_files(self):
-        """Test handle_transcription with too many files."""
+    async def test_handle_transcription_no_files(self):
+        """Test handle_transcription without any files."""
         # Create a proper Request object
         mock_scope = {
             "type": "http",
@@ -140,8 +421,7 @@ class TestTranscription:
             "headers": [],
         }
         mock_request = Request(mock_scope)
-        # Create more files than the limit
-        mock_files = [Mock() for _ in range(MAX_FILES_LIMIT + 1)]
+        mock_files = []
 
         with pytest.raises(HTTPException) as exc_info:
             await handle_transcription(
@@ -152,4 +432,4 @@ class TestTranscription:
             )
 
         assert exc_info.value.status_code == 400
-        assert f"A maximum of {MAX_FILES_LIMIT} files" in str(exc_info.value.detail)
+        assert "No files provided" in str(exc_info.value.detail)
@@ -0,0 +1,157 @@
+import asyncio
+import os
+from unittest.mock import patch
+
+import pytest
+
+from src.app.artifacts import LocalArtifactStore, artifact_store, result_key
+from src.app.backends import MockBackend
+from src.app.jobqueue import JobQueue
+from src.app.worker import process_job, run_worker
+
+
+@pytest.fixture
+def queue(tmp_path):
+    """A job queue in a temporary database."""
+    job_queue = JobQueue(str(tmp_path / "jobs.sqlite3"))
+    yield job_queue
+    job_queue.close()
+
+
+@pytest.fixture(autouse=True)
+def local_store(tmp_path):
+    """Keep the local artifact store in the test's temporary directory."""
+    with patch.object(artifact_store, "root", str(tmp_path)):
+        yield artifact_store
+
+
+@pytest.fixture
+def mock_backend():
+    """Serve the mock backend with a fixed transcript and no transcript cache."""
+    backend = MockBackend(text="hello")
+    with (
+        patch.dict("src.app.backends._shared_backends", {"mock": backend}),
+        patch("src.app.transcription.transcript_cache") as mock_cache,
+    ):
+        mock_cache.get.return_value = None
+        yield backend
+
+
+def enqueue_saved_job(queue, tmp_path, job_id="job-1", count=1):
+    """Save `count` files into a run directory and enqueue them for the mock backend."""
+    run_path = tmp_path / job_id
+    run_path.mkdir()
+    files = []
+    for index in range(count):
+        path = run_path / f"{index}.mp3"
+        path.write_bytes(b"\xff\xfb" * 100)
+        files.append(
+            {
+                "index": index,
+                "filename": path.name,
+                "status": "saved",
+                "output_filename": f"{index}.txt",
+                "error": None,
+                "path": str(path),
+                "key": f"{job_id}/{path.name}",
+                "sha256": f"hash-{index}",
+            }
+        )
+    queue.enqueue(job_id, str(run_path), "en", "mock", None, files)
+    return str(run_path)
+
+
+class TestWorker:
+    """Test cases for the queue worker."""
+
+    @pytest.mark.asyncio
+    async def test_process_job_writes_results(self, queue, tmp_path, mock_backend):
+        """Test that a claimed job is transcribed, stored and marked done."""
+        run_path = enqueue_saved_job(queue, tmp_path, count=2)
+
+        await process_job(queue, queue.claim("worker", 60), "worker")
+
+        job = queue.get("job-1")
+        assert job["status"] == "done"
+        assert [f["status"] for f in job["files"]] == ["done", "done"]
+        for index in range(2):
+            assert artifact_store.get(result_key("job-1", index)) == b"hello"
+        # Only the transcripts are kept once the job is done
+        assert os.listdir(run_path) == ["results"]
+
+    @pytest.mark.asyncio
+    async def test_retried_job_skips_finished_files(
+        self, queue, tmp_path, mock_backend
+    ):
+        """Test that a job retried after a crash doesn't transcribe finished files again."""
+        enqueue_saved_job(queue, tmp_path, count=2)
+        job = queue.claim("worker", 60)
+        job.files[0]["status"] = "done"
+        artifact_store.put(result_key("job-1", 0), b"from the first attempt")
+
+        with patch.object(
+            mock_backend, "transcribe", wraps=mock_backend.transcribe
+        ) as spy:
+            await process_job(queue, job, "worker")
+
+        assert spy.call_count == 1
+        assert artifact_store.get(result_key("job-1", 0)) == b"from the first attempt"
+        assert queue.get("job-1")["status"] == "done"
+
+    @pytest.mark.asyncio
+    async def test_stopping_worker_returns_running_jobs(
+        self, queue, tmp_path, mock_backend
+    ):
+        """Test that jobs still running when a worker stops go back to the queue."""
+        mock_backend.latency = 10
+        enqueue_saved_job(queue, tmp_path)
+        stop = asyncio.Event()
+        worker = asyncio.create_task(
+            run_worker(queue, "worker", stop, poll_interval=0.01)
+        )
+        while not queue.get("job-1")["attempts"]:
+            await asyncio.sleep(0.01)
+
+        stop.set()
+        await asyncio.wait_for(worker, timeout=2)
+
+        job = queue.get("job-1")
+        assert job["queued"]
+        assert job["attempts"] == 0
+
+    @pytest.mark.asyncio
+    async def test_lost_lease_abandons_job(self, queue, tmp_path, mock_backend):
+        """Test that a worker whose lease was taken over stops working on the job."""
+        mock_backend.latency = 10
+        enqueue_saved_job(queue, tmp_path)
+        job = queue.claim("worker", 60)
+
+        with (
+            patch.object(queue, "extend", return_value=False),
+            patch.object(queue, "release") as mock_release,
+        ):
+            await asyncio.wait_for(process_job(queue, job, "worker", 0.03), timeout=2)
+
+        mock_release.assert_not_called()
+        assert queue.get("job-1")["status"] == "processing"
+
+    @pytest.mark.asyncio
+    async def test_process_job_with_store_elsewhere(
+        self, queue, tmp_path, mock_backend
+    ):
+        """Test that uploads are fetched from a store off this disk and only the results stay there."""
+        run_path = enqueue_saved_job(queue, tmp_path)
+        # A directory outside the run directories stands in for a remote store
+        store = LocalArtifactStore(str(tmp_path / "store"))
+        store.on_local_disk = False
+        store.upload("job-1/0.mp3", os.path.join(run_path, "0.mp3"))
+        os.remove(os.path.join(run_path, "0.mp3"))
+
+        with patch("src.app.worker.artifact_store", store):
+            await process_job(queue, queue.claim("worker", 60), "worker")
+
+        assert queue.get("job-1")["status"] == "done"
+        assert store.get(result_key("job-1", 0)) == b"hello"
+        assert not store.exists("job-1/0.mp3")
+        # The fetched copy is removed along with the run directory
+        assert not os.path.exists(run_path)
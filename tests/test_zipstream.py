@@ -0,0 +1,52 @@
+import io
+import struct
+import zipfile
+
+import pytest
+
+from src.app.zipstream import ZipStream, stream_zip
+
+# General purpose flag bit set when sizes follow the data in a data descriptor
+DATA_DESCRIPTOR_FLAG = 0x08
+
+
+class TestZipStream:
+    """Test cases for the streaming ZIP writer."""
+
+    def test_entries_are_readable(self):
+        """Test that the concatenated output is a valid archive."""
+        archive = ZipStream()
+        data = archive.add("a.txt", b"hello") + archive.add("b.txt", b"world" * 1000)
+        data += archive.close()
+
+        with zipfile.ZipFile(io.BytesIO(data)) as zip_file:
+            assert zip_file.testzip() is None
+            assert zip_file.read("a.txt") == b"hello"
+            assert zip_file.read("b.txt") == b"world" * 1000
+
+    def test_entries_use_data_descriptors(self):
+        """Test that each entry is emitted whole, with sizes after its data."""
+        archive = ZipStream()
+        entry = archive.add("a.txt", b"hello")
+
+        signature, _, flags = struct.unpack("<IHH", entry[:8])
+        assert signature == 0x04034B50
+        assert flags & DATA_DESCRIPTOR_FLAG
+        # Nothing is held back until close() except the central directory
+        assert b"\x50\x4b\x01\x02" not in entry
+        assert archive.close().startswith(b"\x50\x4b\x01\x02")
+
+    @pytest.mark.asyncio
+    async def test_stream_zip(self):
+        """Test streaming an archive from an async iterable of entries."""
+
+        async def entries():
+            yield "a.txt", b"one"
+            yield "b.txt", b"two"
+
+        chunks = [chunk async for chunk in stream_zip(entries())]
+
+        assert len(chunks) == 3
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as zip_file:
+            assert zip_file.namelist() == ["a.txt", "b.txt"]
+            assert zip_file.read("b.txt") == b"two"